@@ -0,0 +1,39 @@
+from helpers import json_codec
+from helpers.jamf_client import JamfClient
+from helpers.airtable_client import AirtableAPI
+from helpers.slack_client import SlackClient
+from helpers.reconciliation import load_and_reconcile
+from helpers.resilience import CircuitOpenError
+
+
+def main():
+    username = 'example_username'
+    password = 'example_password'
+    base_url = 'your.jamf.instance.com'
+
+    jamf = JamfClient(username, password, base_url, verify_cert=True)
+    airtable = AirtableAPI(api_key='your_airtable_api_key', base_id='your_airtable_base_id')
+    slack = SlackClient(token='your-slack-api-token')
+
+    try:
+        if not jamf.authenticate():
+            print("Authentication failed, check credentials or network settings.")
+            return
+
+        report = load_and_reconcile(jamf, airtable, slack, table_name='Assets')
+    except (RuntimeError, CircuitOpenError) as e:
+        print(f"Reconciliation failed: {e}")
+        return
+
+    for kind, count in report.summary().items():
+        print(f"{kind}: {count}")
+
+    # Write the full set of mismatches to a JSON file
+    with open('reconciliation.json', 'w') as f:
+        json_codec.dump(report.to_dict(), f, indent=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
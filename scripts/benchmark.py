@@ -0,0 +1,250 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+from helpers import json_codec
+from helpers.errors import error_result
+from helpers.jamf_client import JamfClient
+from helpers.records import IDENTIFICATION_FIELDS, IdentificationRecord, InventoryRecord
+from helpers.slack_templates import load_template
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Records per synthetic inventory page, matching the page size identification runs use.
+PAGE_SIZE = 200
+
+# Timing differences smaller than this are treated as noise, whatever the threshold.
+MIN_SECONDS_DELTA = 0.005
+
+# Metrics checked against the baseline. Time is compared relative to the reference workload.
+COMPARED_METRICS = ('relative', 'peak_bytes')
+
+MODELS = ['MacBook Pro (14-inch, 2023)', 'MacBook Air (M2, 2022)', 'iMac (24-inch, 2021)', 'Mac mini (2023)']
+
+
+def synthetic_inventory(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate `count` computers-inventory records shaped like Jamf Pro's GENERAL, HARDWARE and
+    USER_AND_LOCATION sections.
+    """
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        user = f'user{rng.randrange(count)}'
+        items.append({
+            'id': str(i + 1),
+            'udid': f'{rng.getrandbits(128):032X}',
+            'general': {
+                'name': f'{user}-mac-{i}',
+                'lastContactTime': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z',
+                'reportDate': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z',
+                'platform': 'Mac',
+                'managementId': f'{rng.getrandbits(64):016x}',
+                'remoteManagement': {'managed': True, 'managementUsername': 'jamfadmin'},
+            },
+            'hardware': {
+                'serialNumber': f'C02{i:08d}',
+                'model': rng.choice(MODELS),
+                'processorType': 'Apple M2',
+                'totalRamMegabytes': rng.choice([8192, 16384, 32768]),
+                'macAddress': ':'.join(f'{rng.randrange(256):02x}' for _ in range(6)),
+            },
+            'userAndLocation': {
+                'username': user,
+                'realname': user.title(),
+                'email': f'{user}@example.com',
+                'position': 'Engineer',
+                'departmentId': str(rng.randrange(20)),
+                'buildingId': str(rng.randrange(5)),
+            },
+        })
+    return items
+
+
+def synthetic_pages(items: List[Dict[str, Any]]) -> List[bytes]:
+    """
+    Encode inventory records as raw `/v1/computers-inventory` response pages.
+    """
+    return [json_codec.dumps({'totalCount': len(items), 'results': items[i:i + PAGE_SIZE]}).encode('utf-8')
+            for i in range(0, len(items), PAGE_SIZE)]
+
+
+class _ErrorResponse:
+    """
+    Minimal stand-in for a failed requests.Response, as seen by error_result.
+    """
+
+    def __init__(self, status_code: int, body: bytes):
+        self.status_code = status_code
+        self.reason = 'Service Unavailable'
+        self.content = body
+        self.encoding = None
+
+
+def build_cases(size: int) -> Dict[str, Callable[[], Any]]:
+    """
+    Prepare inputs for one fleet size and return a zero-argument callable per benchmark.
+    """
+    items = synthetic_inventory(size)
+    pages = synthetic_pages(items)
+    fields = frozenset(IDENTIFICATION_FIELDS)
+    records = [InventoryRecord.from_inventory(item, fields) for item in items]
+    rows = [IdentificationRecord.from_inventory_record(record).to_dict() for record in records]
+
+    export = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8')
+    with export:
+        json_codec.dump(rows, export, indent=True)
+
+    template = load_template('asset_recovery_prompt')
+    serials = [record.serial for record in records]
+    errors = [_ErrorResponse(503, b'{"httpStatus":503,"errors":[{"code":"UNAVAILABLE"}]}' * 20)] * size
+
+    from communication import read_identification_json
+
+    def parse_inventory_pages():
+        return [JamfClient._project_inventory(json_codec.loads(page)['results'], fields) for page in pages]
+
+    def identification_rows():
+        return [IdentificationRecord.from_inventory_record(record).to_dict() for record in records]
+
+    def read_export():
+        return read_identification_json(export.name)
+
+    def slack_blocks():
+        return [template.render(asset=serial) for serial in serials]
+
+    def error_dicts():
+        return [error_result(response, 'An error occurred while retrieving computer inventory.')
+                for response in errors]
+
+    cases = {
+        'parse_inventory_pages': parse_inventory_pages,
+        'identification_rows': identification_rows,
+        'read_identification_json': read_export,
+        'slack_blocks': slack_blocks,
+        'error_dicts': error_dicts,
+    }
+    cases['_cleanup'] = lambda: os.unlink(export.name)
+    return cases
+
+
+def _reference_workload():
+    """
+    Fixed CPU-bound workload timed alongside each benchmark, so results can be compared across
+    machines and noisy runs as a ratio to it.
+    """
+    return sorted(json_codec.dumps({'n': i, 's': str(i)}) for i in range(20000))
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Time `fn` and the reference workload in alternation, keeping the best of `repeat` runs of
+    each, then record the peak traced allocation of one more run of `fn`.
+    """
+    timings, references = [], []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        _reference_workload()
+        references.append(time.perf_counter() - start)
+
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': round(min(timings), 6), 'relative': round(min(timings) / min(references), 4),
+            'peak_bytes': peak}
+
+
+def run(sizes: List[int], repeat: int, only: List[str] = None) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for size in sizes:
+        cases = build_cases(size)
+        cleanup = cases.pop('_cleanup')
+        try:
+            for name, fn in cases.items():
+                if only and name not in only:
+                    continue
+                result = measure(fn, repeat)
+                results[f'{name}[{size}]'] = result
+                print(f"{name:<26}{size:>8}  {result['seconds'] * 1000:>10.2f} ms  "
+                      f"{result['peak_bytes'] / 1048576:>8.2f} MiB")
+        finally:
+            cleanup()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """
+    Return a description of every result more than `threshold` (a fraction) worse than the baseline.
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        if result['seconds'] - baseline[key]['seconds'] < MIN_SECONDS_DELTA:
+            metrics = ('peak_bytes',)
+        else:
+            metrics = COMPARED_METRICS
+        for metric in metrics:
+            previous = baseline[key].get(metric)
+            if previous and result[metric] > previous * (1 + threshold):
+                regressions.append(f"{key} {metric}: {previous} -> {result[metric]} "
+                                   f"(+{(result[metric] / previous - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Microbenchmarks for the in-process transformation paths.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Synthetic fleet sizes.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark; the best is kept.')
+    parser.add_argument('--only', nargs='+', help='Run only these benchmarks.')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results to compare against.')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='Allowed slowdown or memory growth over the baseline, as a fraction.')
+    parser.add_argument('--save-baseline', action='store_true', help='Write these results as the new baseline.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args.sizes, args.repeat, args.only)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json_codec.dump(results, f, indent=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline, 'rb') as f:
+        baseline = json_codec.load(f)
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Single entry point for the asset recovery pipeline, for the command line and serverless handlers.
+
+    python cli.py identify --source snapshot --terminated-users terminated.txt
+    python cli.py notify
+    python cli.py reclaim
+    python cli.py decommission worker --webhook-port 8080
+    python cli.py import-time
+
+Nothing beyond the standard library is imported at module level. A subcommand imports its
+script, and that script's clients, only when it runs, so a reclaim invocation never loads the
+Jamf Pro or Airtable clients.
+"""
+import base64
+import importlib
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Slack requests older than this many seconds are rejected, so captured requests can't be replayed.
+SLACK_MAX_AGE = 300
+
+# Subcommand -> (script module, client modules it needs to serve a request).
+COMMANDS = {
+    'identify': ('identification', ('helpers.jamf_client', 'helpers.airtable_client')),
+    'notify': ('communication', ('helpers.slack_client', 'helpers.airtable_client')),
+    'reclaim': ('reclamation', ('helpers.fedex_client', 'helpers.slack_client')),
+    'decommission': ('deletion', ('helpers.jamf_client',)),
+}
+
+# Cold-start import budget per subcommand, in milliseconds, including its client modules.
+# `requests` alone accounts for roughly 70 ms of each.
+IMPORT_BUDGET_MS = {
+    'identify': 200,
+    'notify': 150,
+    'reclaim': 150,
+    'decommission': 200,
+}
+
+
+def load(command: str):
+    """
+    Import and return the script module behind a subcommand.
+    """
+    return importlib.import_module(COMMANDS[command][0])
+
+
+def run(command: str, argv: List[str] = None) -> Any:
+    return load(command).main(argv or [])
+
+
+def _raw_body(event: Dict[str, Any]) -> str:
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode('utf-8')
+    return body
+
+
+def slack_payload(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the interactive-component payload from an HTTP event (API Gateway or function URL).
+
+    Slack posts it form-encoded as `payload=<json>`.
+    """
+    from helpers import json_codec
+
+    return json_codec.loads(parse_qs(_raw_body(event))['payload'][0])
+
+
+def verify_slack_signature(event: Dict[str, Any], signing_secret: str, now: Optional[float] = None) -> bool:
+    """
+    Check an HTTP event's X-Slack-Signature against the app's signing secret.
+
+    Args:
+    event (dict): The HTTP event, with its headers and raw body.
+    signing_secret (str): The Slack app's signing secret.
+    now (float, optional): Current epoch seconds, for testing.
+
+    Returns:
+    bool: True if the request was signed by Slack within the last SLACK_MAX_AGE seconds.
+    """
+    import hashlib
+    import hmac
+
+    headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+    timestamp = headers.get('x-slack-request-timestamp', '')
+    signature = headers.get('x-slack-signature', '')
+    if not timestamp.isdigit() or not signature:
+        return False
+    if abs((time.time() if now is None else now) - int(timestamp)) > SLACK_MAX_AGE:
+        return False
+
+    basestring = f'v0:{timestamp}:{_raw_body(event)}'.encode('utf-8')
+    expected = 'v0=' + hmac.new(signing_secret.encode('utf-8'), basestring, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def defer_slack_response(payload: Dict[str, Any], context: Any = None) -> None:
+    """
+    Hand a verified Slack payload to reclamation without waiting for it.
+
+    On AWS Lambda the function invokes itself asynchronously with {'slack_payload': payload},
+    since a frozen environment would stall a background thread. Elsewhere a thread runs it.
+    """
+    function_arn = getattr(context, 'invoked_function_arn', None)
+    if function_arn:
+        import boto3  # Provided by the Lambda runtime; only needed here
+        from helpers import json_codec
+
+        boto3.client('lambda').invoke(FunctionName=function_arn, InvocationType='Event',
+                                      Payload=json_codec.dumps({'slack_payload': payload}).encode('utf-8'))
+        return
+
+    import threading
+
+    threading.Thread(target=load('reclaim').handle_slack_response, args=(payload,), name='slack-response').start()
+
+
+def handler(event: Dict[str, Any], context: Any = None) -> Dict[str, Any]:
+    """
+    Serverless handler.
+
+    An event with a 'command' key runs that subcommand with the event's 'args', and one with a
+    'slack_payload' key (the handler's own deferred invocation) runs reclamation on it. Any other
+    event is treated as a Slack interactive-component request: its signature is checked against
+    SLACK_SIGNING_SECRET, and it is acknowledged at once while reclamation runs deferred, so
+    Slack's 3-second deadline never waits on FedEx.
+
+    Args:
+    event (dict): The invocation event.
+    context (Any, optional): The platform's invocation context.
+
+    Returns:
+    dict: An HTTP-style response.
+    """
+    command = event.get('command')
+    if command:
+        if command not in COMMANDS:
+            return {'statusCode': 400, 'body': f'Unknown command: {command}'}
+        run(command, event.get('args'))
+        return {'statusCode': 200, 'body': ''}
+
+    if 'slack_payload' in event:
+        load('reclaim').handle_slack_response(event['slack_payload'])
+        return {'statusCode': 200, 'body': ''}
+
+    signing_secret = os.getenv('SLACK_SIGNING_SECRET')
+    if not signing_secret:
+        return {'statusCode': 500, 'body': 'SLACK_SIGNING_SECRET is not set.'}
+    if not verify_slack_signature(event, signing_secret):
+        return {'statusCode': 401, 'body': 'Invalid Slack signature.'}
+
+    try:
+        payload = slack_payload(event)
+    except (KeyError, ValueError):
+        return {'statusCode': 400, 'body': 'Expected a Slack interactive payload.'}
+
+    defer_slack_response(payload, context)
+    return {'statusCode': 200, 'body': ''}
+
+
+def measure_import_time(command: str, repeat: int = 3) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Measure the cold-start import cost of a subcommand with -X importtime, keeping the best of
+    `repeat` fresh interpreters so a noisy host doesn't fail the budget.
+
+    Returns:
+    tuple: (total milliseconds, [(module, cumulative milliseconds)] for each top-level import).
+    """
+    import subprocess
+
+    script, clients = COMMANDS[command]
+    statement = '; '.join(f'import {module}' for module in ('cli', script) + clients)
+
+    best = None
+    for _ in range(repeat):
+        # Run beside the scripts so `import cli` resolves from any working directory.
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                                capture_output=True, text=True, check=True, cwd=SCRIPTS_DIR)
+
+        # Interpreter start-up imports come first and end with `site`; everything after is ours.
+        imports = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative, name = line.split('|')
+            if not name.startswith('  ') and cumulative.strip().isdigit():
+                name = name.strip()
+                if name == 'site':
+                    imports = []
+                else:
+                    imports.append((name, int(cumulative) / 1000))
+
+        total = sum(ms for _, ms in imports)
+        if best is None or total < best[0]:
+            best = (total, sorted(imports, key=lambda item: -item[1]))
+
+    return best
+
+
+def check_import_budget(commands: List[str] = None) -> int:
+    """
+    Print each subcommand's import time against its budget.
+
+    Returns:
+    int: 0 if every subcommand is within budget, 1 otherwise.
+    """
+    over = 0
+    for command in commands or COMMANDS:
+        total, imports = measure_import_time(command)
+        budget = IMPORT_BUDGET_MS[command]
+        status = 'ok' if total <= budget else 'OVER BUDGET'
+        over += total > budget
+        top = ', '.join(f'{name} {ms:.0f}ms' for name, ms in imports[:3])
+        print(f"{command:<14}{total:>8.1f} ms / {budget} ms  {status}  ({top})")
+    return 1 if over else 0
+
+
+def main(argv: List[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] in COMMANDS:
+        run(argv[0], argv[1:])
+        return 0
+    if argv and argv[0] == 'import-time':
+        return check_import_budget(argv[1:])
+
+    print(f"usage: cli.py {{{','.join(COMMANDS)},import-time}} [args...]")
+    return 0 if argv[:1] in (['-h'], ['--help']) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
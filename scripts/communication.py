@@ -1,5 +1,50 @@
-import json
+import argparse
+from helpers import json_codec
+from helpers.airtable_buffer import AirtableWriteBuffer
+from helpers.airtable_client import AirtableAPI
+from helpers.profiling import add_profile_argument, profiling, stage
 from helpers.slack_client import SlackClient
+from helpers.slack_templates import load_template
+
+
+# Airtable table that tracks identified assets, and the field marking that the user was asked.
+AIRTABLE_TABLE = 'Assets'
+NOTIFIED_FIELD = 'Notified'
+
+
+def _user_entry(item: dict) -> dict:
+    """
+    Extract the email and serial number from either a raw inventory record or an identification.py row,
+    plus the Airtable record ID if the row has one.
+    """
+    if 'userAndLocation' in item:
+        return {'email': item['userAndLocation']['email'], 'serial_number': item['hardware']['serialNumber']}
+    entry = {'email': item['user_email'], 'serial_number': item['asset_serial']}
+    if item.get('airtable_record_id'):
+        entry['airtable_record_id'] = item['airtable_record_id']
+    return entry
+
+
+def iter_identification_json(file_path: str):
+    """
+    Lazily read user emails and system serial numbers from an identification export.
+
+    The file may be a JSON array or NDJSON (one record per line). Records are parsed and yielded
+    one at a time, so memory stays flat regardless of file size and the first message can be
+    sent before the whole file has been read.
+
+    Args:
+        file_path (str): The path to the JSON or NDJSON file.
+
+    Yields:
+        dict: A dictionary containing an email and serial number.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            for item in json_codec.iter_records(file):
+                yield _user_entry(item)
+    except Exception as e:
+        print(f"Error reading or parsing JSON file: {e}")
 
 
 def read_identification_json(file_path: str):
@@ -12,23 +57,10 @@ def read_identification_json(file_path: str):
     Returns:
         list of dict: A list of dictionaries containing emails and serial numbers.
     """
-    try:
-        with open(file_path, 'r') as file:
-            data = json.load(file)
-            user_data = [
-                {
-                    'email': item['userAndLocation']['email'],
-                    'serial_number': item['hardware']['serialNumber']
-                }
-                for item in data
-            ]
-            return user_data
-    except Exception as e:
-        print(f"Error reading or parsing JSON file: {e}")
-        return []
+    return list(iter_identification_json(file_path))
 
 
-def send_direct_message(slack_token: str, email: str, serial_number: str):
+def send_direct_message(slack_token: str, email: str, serial_number: str, slack: SlackClient = None):
     """
     Send a direct message to a user's email via Slack with a given system serial number using Slack blocks.
 
@@ -36,73 +68,20 @@ def send_direct_message(slack_token: str, email: str, serial_number: str):
         slack_token (str): Authentication token for Slack.
         email (str): User email to send message to.
         serial_number (str): System serial number to include in the message.
+        slack (SlackClient, optional): An existing client to reuse across messages.
     """
-    slack = SlackClient(token=slack_token)
+    slack = slack or SlackClient(token=slack_token)
 
     # Slack blocks with the serial number embedded in the message
-    blocks = [
-            {
-                "type": "header",
-                "block_id": "asset_recovery_header",
-                "text": {
-                    "type": "plain_text",
-                    "text": "This is a header block",
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "block_id": "asset_recovery_question",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "Hello, our records indicate asset {asset} hasn't checked into Jamf in a while. "
-                    "Do you still have this system?"
-                }
-            },
-            {
-                "type": "actions",
-                "block_id": "asset_recovery_response",
-                "elements": [
-                    {
-                        "type": "static_select",
-                        "placeholder": {
-                            "type": "plain_text",
-                            "text": "Select an item",
-                            "emoji": True
-                        },
-                        "options": [
-                            {
-                                "text": {
-                                    "type": "plain_text",
-                                    "text": "I no longer have this system"
-                                },
-                                "value": "not_in_possession"
-                            },
-                            {
-                                "text": {
-                                    "type": "plain_text",
-                                    "text": "I want to send this system back"
-                                },
-                                "value": "send_asset_back"
-                            },
-                            {
-                                "text": {
-                                    "type": "plain_text",
-                                    "text": "I don't recognize this system"
-                                },
-                                "value": "asset_unrecognized"
-                            }
-                        ],
-                        "action_id": "asset_recovery_initial"
-                    }
-                ]
-            }
-        ]
+    with stage('transform'):
+        blocks = load_template('asset_recovery_prompt').render(asset=serial_number)
 
     # Find user ID by email
-    user_id = slack.find_user_by_email(email)
+    with stage('fetch', what='slack_user'):
+        user_id = slack.find_user_by_email(email)
     if user_id:
-        success = slack.send_message(channel_id=user_id, blocks=blocks)
+        with stage('notify'):
+            success = slack.send_message(channel_id=user_id, blocks=blocks)
         if success:
             print(f"Message successfully sent to {email}")
             return True
@@ -114,15 +93,33 @@ def send_direct_message(slack_token: str, email: str, serial_number: str):
         return False
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Ask users about their assets via Slack.')
+    add_profile_argument(parser, 'communication')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     slack_token = 'your-slack-api-token'  # Replace with your actual Slack token
-    user_data = read_identification_json('identification.json')
 
-    # Loop through each user and send a direct message
-    for user in user_data:
-        email = user['email']
-        serial_number = user['serial_number']
-        send_direct_message(slack_token, email, serial_number)
+    with profiling('communication', args.profile):
+        slack = SlackClient(token=slack_token)
+        airtable = AirtableAPI(api_key='your_airtable_api_key', base_id='your_airtable_base_id')
+
+        # Stream each user from the export and send a direct message as soon as it's read. Notified
+        # flags are written behind in batches instead of one PATCH per user.
+        with AirtableWriteBuffer(airtable, AIRTABLE_TABLE) as statuses:
+            for user in iter_identification_json('identification.json'):
+                email = user['email']
+                serial_number = user['serial_number']
+                sent = send_direct_message(slack_token, email, serial_number, slack=slack)
+                if sent and 'airtable_record_id' in user:
+                    statuses.update(user['airtable_record_id'], {NOTIFIED_FIELD: True})
+
+        if statuses.errors:
+            print(f"Failed to record {statuses.stats()['failed']} Notified flag(s) in Airtable.")
 
 
 if __name__ == "__main__":
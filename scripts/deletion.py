@@ -1,81 +1,172 @@
-import time
+import argparse
 import os
+import signal
+import time
+from datetime import datetime
 from helpers.jamf_client import JamfClient
-
-
-def main():
+from helpers.profiling import add_profile_argument, profiling, stage
+from helpers.resilience import CircuitOpenError
+from helpers.webhooks import WebhookReceiver
+from helpers.decommission_queue import (DecommissionQueue, DecommissionWorker, FINAL_STATES,
+                                        PRIORITY_DEFAULT, PRIORITY_TERMINATED)
+
+
+def parse_deadline(value: str) -> float:
+    """
+    Parse an ISO 8601 deadline into epoch seconds.
+    """
+    return datetime.fromisoformat(value).timestamp()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Erase and delete decommissioned devices.')
+    parser.add_argument('--queue', default=os.getenv('DECOMMISSION_QUEUE', 'decommission.db'),
+                        help='Path of the SQLite job queue.')
+    add_profile_argument(parser, 'deletion')
+    subparsers = parser.add_subparsers(dest='command')
+
+    enqueue = subparsers.add_parser('enqueue', help='Queue devices for decommissioning.')
+    enqueue.add_argument('serials', nargs='+', help='Device serial numbers.')
+    enqueue.add_argument('--priority', type=int, default=PRIORITY_DEFAULT,
+                         help='Job priority; lower runs first.')
+    enqueue.add_argument('--terminated', action='store_true',
+                         help=f'Device belongs to a terminated user (priority {PRIORITY_TERMINATED}).')
+    enqueue.add_argument('--deadline', type=parse_deadline, help='ISO 8601 time the wipe should be done by.')
+
+    worker = subparsers.add_parser('worker', help='Run the long-lived decommission worker.')
+    worker.add_argument('--workers', type=int, default=8, help='Steps executed concurrently.')
+    worker.add_argument('--poll-interval', type=float,
+                        help='Seconds between command status checks (default 60, or 600 with --webhook-port).')
+    worker.add_argument('--webhook-port', type=int,
+                        help='Receive Jamf Pro webhooks on this port; polling becomes a slow fallback.')
+    worker.add_argument('--webhook-host', default=os.getenv('WEBHOOK_HOST', '127.0.0.1'),
+                        help='Interface to receive webhooks on; anything but loopback requires a token.')
+    worker.add_argument('--webhook-token', default=os.getenv('WEBHOOK_TOKEN'),
+                        help='Bearer token webhook requests must present.')
+
+    subparsers.add_parser('status', help='Show job counts by state.')
+    return parser.parse_args(argv)
+
+
+def connect() -> JamfClient:
     # Define your Jamf Pro credentials and base URL
     username = os.getenv('JAMF_USERNAME', 'your_username')
     password = os.getenv('JAMF_PASSWORD', 'your_password')
     base_url = os.getenv('JAMF_BASE_URL', 'yourServer.jamfcloud.com')
 
-    # Device serial number and passcode, fetched from environment variables
-    serial_number = os.getenv('DEVICE_SERIAL_NUMBER', 'your_device_serial')
-    passcode = os.getenv('DEVICE_PASSCODE', 'your_device_passcode')
-
-    # Ensure serial_number and passcode are set
-    if not serial_number or not passcode:
-        print("Error: Serial number and passcode must be provided.")
-        return
-
-    # Instantiate the JamfClient
+    # Instantiate and authenticate the JamfClient
     jamf_client = JamfClient(username=username, password=password, base_url=base_url)
 
-    # Authenticate the JamfClient
-    if not jamf_client.authenticate():
+    with stage('auth'):
+        try:
+            authenticated = jamf_client.authenticate()
+        except CircuitOpenError as e:
+            print(f"Authentication failed: {e}")
+            authenticated = False
+
+    if not authenticated:
         print("Failed to authenticate. Exiting.")
-        return
+        return None
 
-    # Step 1: Find the computer by serial number
-    computer = jamf_client.find_asset_by_serial(serial_number)
+    return jamf_client
 
-    if not computer:
-        print(f"Computer with serial number {serial_number} not found.")
-        return
 
-    computer_id = computer['id']
-    print(f"Found computer with ID: {computer_id}")
+def run_worker(queue: DecommissionQueue, workers: int = 8, poll_interval: float = None, until_job: int = None,
+               webhook_port: int = None, webhook_token: str = None, webhook_host: str = '127.0.0.1'):
+    """
+    Process queued jobs until interrupted, or until `until_job` reaches a final state.
 
-    # Step 2: Send the EraseDevice command to the computer
-    erase_response = jamf_client.erase_device(computer_id, passcode)
+    With `webhook_port`, Jamf Pro webhook events wake jobs as soon as their device checks in or
+    a relay reports their erase command completed, so status polling only runs every 10 minutes as a fallback.
+    """
+    if poll_interval is None:
+        poll_interval = 600 if webhook_port else 60
 
-    if not erase_response['success']:
-        print(f"Failed to send EraseDevice command: {erase_response['message']}")
+    passcode = os.getenv('DEVICE_PASSCODE', 'your_device_passcode')
+    if not passcode:
+        print("Error: Passcode must be provided.")
         return
 
-    # Retrieve the status UUID from the response
-    status_uuid = erase_response['data']['computer_command']['command']['command_uuid']
-    print(f"EraseDevice command sent successfully. Status UUID: {status_uuid}")
-
-    # Step 3: Loop and wait for the command to be 'Acknowledged'
-    print("Waiting for the EraseDevice command to be acknowledged...")
-
-    check_counter = 0
-    while check_counter < 10:
-        check_counter += 1
-        status_response = jamf_client.check_mdm_command_status(status_uuid)
+    jamf_client = connect()
+    if not jamf_client:
+        return
 
-        if status_response['success']:
-            status = status_response['data']['computer_command']['status']
-            print(f"Current status: {status}")
+    worker = DecommissionWorker(jamf_client, queue, passcode, max_workers=workers, poll_interval=poll_interval)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
 
-            if status == 'Acknowledged':
-                print(f"Command acknowledged for computer ID: {computer_id}")
-                break
-        else:
-            print(f"Failed to check command status: {status_response['message']}")
+    receiver = None
+    if webhook_port:
+        try:
+            receiver = WebhookReceiver(queue, host=webhook_host, port=webhook_port, token=webhook_token,
+                                       on_match=worker.wake)
+        except ValueError as e:
+            print(f"Error: {e}")
             return
+        receiver.start()
+        print(f"Listening for Jamf Pro webhooks on {webhook_host}:{webhook_port}")
+
+    if until_job is None:
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            worker.stop()
+        finally:
+            if receiver:
+                receiver.stop()
+        return
 
-        # Wait for a minute before checking again
-        time.sleep(60)
-
-    # Step 4: Delete the computer from Jamf Pro
-    delete_response = jamf_client.delete_device(computer_id)
-
-    if delete_response['success']:
-        print(f"Computer with ID {computer_id} deleted successfully.")
-    else:
-        print(f"Failed to delete computer: {delete_response['message']}")
+    # One-shot mode: drive a single job through the scheduler, leaving other queued jobs to the worker.
+    while True:
+        worker.run_once(until_job)
+        job = queue.get(until_job)
+        if job['state'] in FINAL_STATES:
+            if job['last_error']:
+                print(job['last_error'])
+            return
+        time.sleep(1)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    with profiling('deletion', args.profile):
+        run(args)
+
+
+def run(args):
+    queue = DecommissionQueue(args.queue)
+
+    try:
+        if args.command == 'enqueue':
+            priority = PRIORITY_TERMINATED if args.terminated else args.priority
+            for serial_number in args.serials:
+                job_id = queue.enqueue(serial_number, priority=priority, deadline=args.deadline)
+                if job_id is None:
+                    print(f"Device {serial_number} already has a decommission job in progress.")
+                else:
+                    print(f"Queued device {serial_number} as job {job_id}.")
+        elif args.command == 'worker':
+            run_worker(queue, args.workers, args.poll_interval,
+                       webhook_port=args.webhook_port, webhook_token=args.webhook_token,
+                       webhook_host=args.webhook_host)
+        elif args.command == 'status':
+            for state, count in sorted(queue.counts().items()):
+                print(f"{state}: {count}")
+        else:
+            # Device serial number, fetched from environment variables
+            serial_number = os.getenv('DEVICE_SERIAL_NUMBER', 'your_device_serial')
+            if not serial_number:
+                print("Error: Serial number must be provided.")
+                return
+
+            job_id = queue.enqueue(serial_number)
+            if job_id is None:
+                print(f"Device {serial_number} already has a decommission job in progress; "
+                      f"run the worker to finish it.")
+                return
+            run_worker(queue, until_job=job_id)
+    finally:
+        queue.close()
 
 
 if __name__ == "__main__":
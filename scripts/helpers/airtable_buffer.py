@@ -0,0 +1,215 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from helpers.airtable_client import MAX_BATCH_SIZE
+from helpers.concurrency import RateLimiter
+
+
+# Stands in for the current value of a field on a record the buffer knows nothing about.
+_UNKNOWN = object()
+
+
+def _is_empty(value: Any) -> bool:
+    # Airtable omits empty fields from record responses, so these all read back as "no value".
+    return value is None or value is False or value == '' or value == []
+
+
+def _same(old: Any, new: Any) -> bool:
+    if _is_empty(old) and _is_empty(new):
+        return True
+    return old == new
+
+
+class AirtableWriteBuffer:
+    """
+    Write-behind buffer for Airtable field updates.
+
+    Keeps the last known field values of each record and queues only fields that actually
+    change; updates to records it has no values for are always queued. Several updates to the same record before a flush are merged into one, and an update
+    that puts a field back to its known value cancels the pending change. Pending changes are
+    sent as batched PATCH requests of up to 10 records, when the buffer fills or on a timer,
+    rate-limited to stay under Airtable's 5 requests per second per base.
+    """
+
+    def __init__(self, airtable, table_name: str, max_batch: int = MAX_BATCH_SIZE, max_pending: int = 100,
+                 flush_interval: float = 5.0, requests_per_second: float = 5):
+        """
+        Args:
+        airtable (AirtableAPI): Client used to send the updates.
+        table_name (str): The table the records belong to.
+        max_batch (int, optional): Records per PATCH request, at most 10.
+        max_pending (int, optional): Flush as soon as this many records have pending changes.
+        flush_interval (float, optional): Seconds between timed flushes once start() is called.
+        requests_per_second (float, optional): Upper bound on PATCH requests sent.
+        """
+        self.airtable = airtable
+        self.table_name = table_name
+        self.max_batch = min(max_batch, MAX_BATCH_SIZE)
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.limiter = RateLimiter(requests_per_second, burst=int(max(1, requests_per_second)))
+        self.errors: List[Dict[str, Any]] = []
+
+        self._known: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # Changes in requests sent by a running flush, which Airtable will hold once they return.
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'updates': 0, 'skipped': 0, 'merged': 0, 'requests': 0, 'records_sent': 0, 'failed': 0}
+
+    def prime(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Record the current field values of records, e.g. the 'data' of list_all_records().
+        """
+        with self._lock:
+            for record in records:
+                self._known[record['id']] = dict(record.get('fields', {}))
+
+    def update(self, record_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a field update for a record.
+
+        Args:
+        record_id (str): The ID of the record to update.
+        fields (dict): Field names and their new values.
+
+        Returns:
+        dict: The fields still pending for the record after this update.
+        """
+        with self._lock:
+            self._stats['updates'] += 1
+            known = self._known.get(record_id)
+            in_flight = self._in_flight.get(record_id, {})
+            pending = self._pending.get(record_id, {})
+            if pending:
+                self._stats['merged'] += 1
+
+            changed = False
+            for name, value in fields.items():
+                if name in in_flight:
+                    current = in_flight[name]
+                elif known is not None:
+                    current = known.get(name)
+                else:
+                    # Nothing is known about this record, so even clearing a field is a change.
+                    current = _UNKNOWN
+                if current is not _UNKNOWN and _same(current, value):
+                    if name in pending:
+                        del pending[name]
+                        changed = True
+                elif name not in pending or not _same(pending[name], value):
+                    pending[name] = value
+                    changed = True
+
+            if not changed:
+                self._stats['skipped'] += 1
+
+            if pending:
+                self._pending[record_id] = pending
+            else:
+                self._pending.pop(record_id, None)
+
+            full = len(self._pending) >= self.max_pending
+            result = dict(pending)
+
+        if full:
+            self.flush()
+        return result
+
+    def pending(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {record_id: dict(fields) for record_id, fields in self._pending.items()}
+
+    def flush(self) -> int:
+        """
+        Send every pending change in batches.
+
+        Updates made while a request is in flight are compared with the values it is sending.
+        Changes from a failed request are queued again, unless the record was updated in the
+        meantime, in which case the newer values win. If a request raises, it and every batch
+        after it are queued again for the next flush. Failures are kept in `errors`.
+
+        Returns:
+        int: The number of records successfully updated.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+
+            items = list(batch.items())
+            sent = 0
+            for i in range(0, len(items), self.max_batch):
+                chunk = items[i:i + self.max_batch]
+                self.limiter.wait()
+                with self._lock:
+                    self._in_flight = dict(chunk)
+                try:
+                    result = self.airtable.update_records(
+                        self.table_name, [{'id': record_id, 'fields': fields} for record_id, fields in chunk])
+                except Exception as e:
+                    with self._lock:
+                        self._in_flight = {}
+                        self._stats['requests'] += 1
+                        self._stats['failed'] += len(chunk)
+                        self.errors.append({'success': False, 'message': f'Request raised an exception: {e}'})
+                        self._requeue(items[i:])
+                    break
+
+                with self._lock:
+                    self._in_flight = {}
+                    self._stats['requests'] += 1
+                    if result.get('success'):
+                        self._stats['records_sent'] += len(chunk)
+                        sent += len(chunk)
+                        for record in result['data'].get('records', []):
+                            self._known[record['id']] = dict(record.get('fields', {}))
+                    else:
+                        self._stats['failed'] += len(chunk)
+                        self.errors.append(result)
+                        self._requeue(chunk)
+            return sent
+
+    def _requeue(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        # Called with the lock held. Values queued since the flush began are newer and win.
+        for record_id, fields in items:
+            self._pending[record_id] = {**fields, **self._pending.get(record_id, {})}
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def start(self) -> 'AirtableWriteBuffer':
+        """
+        Flush every `flush_interval` seconds on a background thread until close().
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='airtable-write-buffer', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> int:
+        """
+        Stop the timer thread and flush whatever is still pending.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+        dict: {'updates', 'skipped', 'merged', 'requests', 'records_sent', 'failed', 'pending'}.
+        """
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending))
+
+    def __enter__(self) -> 'AirtableWriteBuffer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
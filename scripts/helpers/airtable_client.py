@@ -1,6 +1,14 @@
 import requests
-import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from helpers.concurrency import AdaptiveAdapter
+from helpers.errors import error_result
+from helpers.json_codec import dumps, response_json
+from helpers.record_replay import install_from_env
+from helpers.single_flight import single_flight
+
+
+# Most records Airtable accepts in one create/update/delete request.
+MAX_BATCH_SIZE = 10
 
 
 class AirtableAPI:
@@ -19,6 +27,8 @@ class AirtableAPI:
             'Content-Type': 'application/json'
         }
         self.session = requests.Session()
+        self.session.mount('https://', AdaptiveAdapter())
+        install_from_env(self.session)
 
     def list_records(self, table_name: str, view: Optional[str] = None, fields: Optional[list] = None,
                      filter_by_formula: Optional[str] = None) -> Dict[str, Any]:
@@ -45,19 +55,55 @@ class AirtableAPI:
         response = self.session.get(f'{self.base_url}/{table_name}', headers=self.headers, params=params)
 
         if response.status_code == 200:
-            return {'success': True, 'data': response.json()}
+            return {'success': True, 'data': response_json(response)}
         else:
-            return {
-                'success': False,
-                'status_code': response.status_code,
-                'reason': response.reason,
-                'message': "An error occurred with your Airtable request.",
-                'details': response.text
-            }
+            return error_result(response, "An error occurred with your Airtable request.")
+
+    def list_all_records(self, table_name: str, view: Optional[str] = None, fields: Optional[list] = None,
+                         filter_by_formula: Optional[str] = None, page_size: int = 100) -> Dict[str, Any]:
+        """
+        List every record in a table, following Airtable's `offset` pagination.
+
+        Args:
+        table_name (str): The name of the table to retrieve records from.
+        view (str, optional): The name of the view in the table to filter records.
+        fields (list, optional): A list of field names to return in the results.
+        filter_by_formula (str, optional): A formula used to filter records.
+        page_size (int, optional): Records per request, at most 100.
+
+        Returns:
+        dict: API response containing the full list of records or error details.
+        """
+        params = {'pageSize': page_size}
+        if view:
+            params['view'] = view
+        if fields:
+            params['fields[]'] = fields
+        if filter_by_formula:
+            params['filterByFormula'] = filter_by_formula
+
+        records = []
+
+        while True:
+            response = self.session.get(f'{self.base_url}/{table_name}', headers=self.headers, params=params)
+
+            if response.status_code != 200:
+                return error_result(response, "An error occurred while listing records from Airtable.")
+
+            data = response_json(response)
+            if not isinstance(data, dict):
+                return error_result(response, "The Airtable response was empty or not valid JSON.")
+            records += data.get('records', [])
+
+            if not data.get('offset'):
+                return {'success': True, 'data': records}
 
+            params['offset'] = data['offset']
+
+    @single_flight
     def get_record(self, table_name: str, record_id: str) -> Dict[str, Any]:
         """
-        Retrieve a specific record from a table.
+        Retrieve a specific record from a table. Concurrent reads of the same record share one request.
 
         Args:
         table_name (str): The name of the table from which to retrieve the record.
@@ -70,15 +116,29 @@ class AirtableAPI:
         response = self.session.get(url, headers=self.headers)
 
         if response.status_code == 200:
-            return {'success': True, 'data': response.json()}
+            return {'success': True, 'data': response_json(response)}
+        else:
+            return error_result(response, "An error occurred while retrieving the record from Airtable.")
+
+    def create_record(self, table_name: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a new record in a table.
+
+        Args:
+        table_name (str): The name of the table to create the record in.
+        fields (dict): Dictionary of field names and their values.
+
+        Returns:
+        dict: API response containing the created record or error details.
+        """
+        url = f'{self.base_url}/{table_name}'
+        payload = dumps({'fields': fields})
+        response = self.session.post(url, headers=self.headers, data=payload)
+
+        if response.status_code == 200:
+            return {'success': True, 'data': response_json(response)}
         else:
-            return {
-                'success': False,
-                'status_code': response.status_code,
-                'reason': response.reason,
-                'message': "An error occurred while retrieving the record from Airtable.",
-                'details': response.text
-            }
+            return error_result(response, "An error occurred while creating the record in Airtable.")
 
     def update_record(self, table_name: str, record_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -93,19 +153,36 @@ class AirtableAPI:
         dict: API response containing the updated record or error details.
         """
         url = f'{self.base_url}/{table_name}/{record_id}'
-        payload = json.dumps({'fields': fields})
+        payload = dumps({'fields': fields})
+        response = self.session.patch(url, headers=self.headers, data=payload)
+
+        if response.status_code == 200:
+            return {'success': True, 'data': response_json(response)}
+        else:
+            return error_result(response, "An error occurred while updating the record in Airtable.")
+
+    def update_records(self, table_name: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Update up to 10 records in a table with a single request.
+
+        Args:
+        table_name (str): The name of the table containing the records.
+        records (list): Up to 10 dicts of the form {'id': record_id, 'fields': {...}}.
+
+        Returns:
+        dict: API response containing the updated records or error details.
+        """
+        if len(records) > MAX_BATCH_SIZE:
+            raise ValueError(f'Airtable accepts at most {MAX_BATCH_SIZE} records per request.')
+
+        url = f'{self.base_url}/{table_name}'
+        payload = dumps({'records': records})
         response = self.session.patch(url, headers=self.headers, data=payload)
 
         if response.status_code == 200:
-            return {'success': True, 'data': response.json()}
+            return {'success': True, 'data': response_json(response)}
         else:
-            return {
-                'success': False,
-                'status_code': response.status_code,
-                'reason': response.reason,
-                'message': "An error occurred while updating the record in Airtable.",
-                'details': response.text
-            }
+            return error_result(response, "An error occurred while updating records in Airtable.")
 
     def delete_record(self, table_name: str, record_id: str) -> Dict[str, Any]:
         """
@@ -122,12 +199,6 @@ class AirtableAPI:
         response = self.session.delete(url, headers=self.headers)
 
         if response.status_code == 200:
-            return {'success': True, 'data': response.json()}
+            return {'success': True, 'data': response_json(response)}
         else:
-            return {
-                'success': False,
-                'status_code': response.status_code,
-                'reason': response.reason,
-                'message': "An error occurred while deleting the record from Airtable.",
-                'details': response.text
-            }
+            return error_result(response, "An error occurred while deleting the record from Airtable.")
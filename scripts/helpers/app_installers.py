@@ -0,0 +1,193 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+# Installation-summary keys read for each deployment.
+SUMMARY_KEYS = {
+    'total': 'totalInstallations',
+    'installed': 'totalInstalled',
+    'failed': 'totalFailed',
+    'pending': 'totalPending',
+}
+
+
+class DeploymentStatus:
+    """
+    Tracked state for a single App Installer deployment.
+    """
+
+    __slots__ = ('title_id', 'name', 'deployment_id', 'error', 'total', 'installed', 'failed', 'pending',
+                 'retries', 'reported_failed')
+
+    def __init__(self, title_id: str, name: str):
+        self.title_id = title_id
+        self.name = name
+        self.deployment_id = None
+        self.error = None
+        self.total = 0
+        self.installed = 0
+        self.failed = 0
+        self.pending = 0
+        self.retries = 0
+        # Failed count from the latest installation summary; None until the first one arrives.
+        self.reported_failed = None
+
+    @property
+    def finished(self) -> bool:
+        # A summary with nothing pending is final, including one for a deployment to an empty group.
+        return self.error is not None or (self.reported_failed is not None and self.pending == 0)
+
+    def update(self, summary: Dict[str, Any]) -> bool:
+        """
+        Apply an installation summary. Returns True if any count changed.
+        """
+        counts = {field: int(summary.get(key) or 0) for field, key in SUMMARY_KEYS.items()}
+        changed = any(getattr(self, field) != value for field, value in counts.items())
+        for field, value in counts.items():
+            setattr(self, field, value)
+        self.reported_failed = self.failed
+        return changed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class BulkDeploymentManager:
+    """
+    Create many App Installer deployments concurrently and poll them in one loop.
+
+    Installation summaries for every outstanding deployment are fetched concurrently each round.
+    The interval between rounds resets to `min_interval` whenever any deployment makes progress
+    and backs off towards `max_interval` while nothing changes. Deployments with failed
+    installations are retried up to `max_retries` times.
+    """
+
+    def __init__(self, jamf, max_workers: int = 8, min_interval: float = 10, max_interval: float = 120,
+                 backoff: float = 1.5, max_retries: int = 2):
+        """
+        Args:
+        jamf (JamfClient): An authenticated Jamf Pro client.
+        max_workers (int, optional): Concurrent requests to Jamf Pro.
+        min_interval (float, optional): Seconds between polling rounds while deployments progress.
+        max_interval (float, optional): Upper bound on the polling interval while nothing changes.
+        backoff (float, optional): Interval multiplier applied after a round without progress.
+        max_retries (int, optional): Automatic retries per deployment with failed installations.
+        """
+        self.jamf = jamf
+        self.max_workers = max_workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_retries = max_retries
+
+    def deploy(self, titles: Iterable[Dict[str, str]], smart_group_id: str, **options: Any) -> List[DeploymentStatus]:
+        """
+        Create a deployment for each App Installer title concurrently.
+
+        Args:
+        titles (iterable): Dicts with the title's 'id' and 'name', e.g. entries from get_all_app_installers.
+        smart_group_id (str): The smart group to deploy to.
+        options: Extra keyword arguments for JamfClient.deploy_app_installer.
+
+        Returns:
+        list of DeploymentStatus: One entry per title, with either a deployment ID or an error.
+        """
+        statuses = [DeploymentStatus(title['id'], title['name']) for title in titles]
+
+        def create(status: DeploymentStatus) -> None:
+            response = self.jamf.deploy_app_installer(status.name, status.title_id, smart_group_id, **options)
+            if response and 'id' in response:
+                status.deployment_id = response['id']
+            else:
+                status.error = (response or {}).get('Error', 'App Installer deployment failed!')
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(create, statuses))
+
+        return statuses
+
+    def poll(self, statuses: List[DeploymentStatus], timeout: Optional[float] = 3600,
+             on_progress: Optional[Callable[[Dict[str, int]], None]] = None) -> List[DeploymentStatus]:
+        """
+        Poll installation summaries until every deployment finishes or `timeout` elapses.
+
+        Args:
+        statuses (list): DeploymentStatus objects returned by deploy().
+        timeout (float, optional): Seconds to keep polling. None polls until finished.
+        on_progress (callable, optional): Called with aggregate counts after each round. Prints by default.
+
+        Returns:
+        list of DeploymentStatus: The same objects, updated with their latest counts.
+        """
+        on_progress = on_progress or self._print_progress
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = self.min_interval
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                outstanding = [s for s in statuses if s.deployment_id and not s.finished]
+                if not outstanding:
+                    break
+
+                progressed = any(list(executor.map(self._refresh, outstanding)))
+                on_progress(self.progress(statuses))
+
+                if all(s.finished or not s.deployment_id for s in statuses):
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    print('Timed out waiting for App Installer deployments.')
+                    break
+
+                interval = self.min_interval if progressed else min(self.max_interval, interval * self.backoff)
+                time.sleep(interval)
+
+        return statuses
+
+    def run(self, titles: Iterable[Dict[str, str]], smart_group_id: str, timeout: Optional[float] = 3600,
+            **options: Any) -> List[DeploymentStatus]:
+        """
+        Deploy every title, then poll until they all finish.
+        """
+        return self.poll(self.deploy(titles, smart_group_id, **options), timeout=timeout)
+
+    def _refresh(self, status: DeploymentStatus) -> bool:
+        summary = self.jamf.get_installation_summary(status.deployment_id)
+        if summary is None:
+            return False
+
+        # Compare with the previous summary, not the local counts a retry adjusts, so a failure the
+        # server keeps reporting is only retried once.
+        failed_before = status.reported_failed or 0
+        changed = status.update(summary)
+
+        if status.failed > failed_before and status.retries < self.max_retries:
+            if self.jamf.retry_failed_deployment(status.deployment_id):
+                status.retries += 1
+                # Retried installations move back to pending; keep polling.
+                status.pending += status.failed
+                status.failed = 0
+
+        return changed
+
+    @staticmethod
+    def progress(statuses: Iterable[DeploymentStatus]) -> Dict[str, int]:
+        """
+        Aggregate counts across deployments.
+        """
+        statuses = list(statuses)
+        totals = {
+            'deployments': len(statuses),
+            'finished': sum(1 for s in statuses if s.finished),
+            'errors': sum(1 for s in statuses if s.error is not None),
+            'retries': sum(s.retries for s in statuses),
+        }
+        for field in SUMMARY_KEYS:
+            totals[field] = sum(getattr(s, field) for s in statuses)
+        return totals
+
+    @staticmethod
+    def _print_progress(totals: Dict[str, int]) -> None:
+        print(f"Deployments finished: {totals['finished']}/{totals['deployments']} | "
+              f"installed {totals['installed']}/{totals['total']}, failed {totals['failed']}, "
+              f"pending {totals['pending']}, retries {totals['retries']}")
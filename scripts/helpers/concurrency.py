@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+
+# Status codes treated as "the upstream is telling us to slow down".
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for a single upstream.
+
+    The limit grows additively (about +1 per `limit` saturated successful requests) while the windowed
+    p95 latency stays within `latency_tolerance` of the best p95 seen, and is cut
+    multiplicatively on 429/503, connection failures, or a p95 above that tolerance. Cuts are
+    rate-limited so that a burst of throttled responses counts as a single congestion signal.
+    """
+
+    def __init__(self, name: str, initial: float = 4, min_limit: float = 1, max_limit: float = 64,
+                 window: int = 50, latency_tolerance: float = 1.5, backoff: float = 0.5):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.successes = 0
+        self.throttled = 0
+        self.p95 = None
+        self.baseline_p95 = None
+
+        self._latencies = deque(maxlen=window)
+        self._since_p95 = 0
+        self._last_cut = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until an in-flight slot is available.
+
+        Returns:
+        bool: True once a slot was taken, False if `timeout` elapsed first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: float, status: Optional[int] = None) -> None:
+        """
+        Return a slot and feed the outcome of the request into the limit.
+
+        Args:
+        latency (float): Request latency in seconds.
+        status (int, optional): HTTP status code, or None if the request failed without a response.
+        """
+        with self._condition:
+            self.in_flight -= 1
+
+            if status is None or status in THROTTLE_STATUSES:
+                self.throttled += 1
+                self._cut()
+            else:
+                self.successes += 1
+                self._record_latency(latency)
+                if self.p95 is not None and self.p95 > self.baseline_p95 * self.latency_tolerance:
+                    self._cut()
+                elif self.in_flight + 1 >= int(self.limit):
+                    # Only grow while the current limit is actually being used.
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+            self._condition.notify_all()
+
+    def _record_latency(self, latency: float) -> None:
+        self._latencies.append(latency)
+        self._since_p95 += 1
+
+        if len(self._latencies) < self._latencies.maxlen // 2 or self._since_p95 < self._latencies.maxlen // 5:
+            return
+
+        ordered = sorted(self._latencies)
+        self.p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        self.baseline_p95 = self.p95 if self.baseline_p95 is None else min(self.baseline_p95, self.p95)
+        self._since_p95 = 0
+
+    def _cut(self) -> None:
+        now = time.monotonic()
+        if now - self._last_cut < (self.p95 or self.baseline_p95 or 1.0):
+            return
+        self._last_cut = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        # Latency measured at the old concurrency no longer reflects the new limit.
+        self._latencies.clear()
+        self._since_p95 = 0
+        self.p95 = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'p95': self.p95,
+                'baseline_p95': self.baseline_p95,
+                'successes': self.successes,
+                'throttled': self.throttled
+            }
+
+
+class LimiterRegistry:
+    """
+    One AdaptiveLimiter per upstream host, created on first use.
+    """
+
+    def __init__(self, **defaults: Any):
+        self.defaults = defaults
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> AdaptiveLimiter:
+        with self._lock:
+            limiter = self._limiters.get(name)
+            if limiter is None:
+                limiter = self._limiters[name] = AdaptiveLimiter(name, **self.defaults)
+            return limiter
+
+    def limits(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the current state of every upstream's limiter, keyed by host.
+        """
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.name: limiter.snapshot() for limiter in limiters}
+
+
+LIMITERS = LimiterRegistry()
+
+
+def current_limits() -> Dict[str, Dict[str, Any]]:
+    """
+    Return the current concurrency limits of every upstream the helper clients have talked to.
+    """
+    return LIMITERS.limits()
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` operations per second, with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """
+        Block until a token is available, then take it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class AdaptiveAdapter(BaseAdapter):
+    """
+    Transport adapter that gates every request through its upstream host's AdaptiveLimiter.
+
+    Wraps another adapter (a plain HTTPAdapter by default), so it can be layered with other
+    transport adapters.
+    """
+
+    def __init__(self, registry: LimiterRegistry = None, base: BaseAdapter = None):
+        super().__init__()
+        self.registry = registry or LIMITERS
+        self.base = base or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        limiter = self.registry.get(urlparse(request.url).hostname)
+        limiter.acquire()
+
+        start = time.monotonic()
+        status = None
+        try:
+            response = self.base.send(request, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            limiter.release(time.monotonic() - start, status)
+
+    def close(self):
+        self.base.close()
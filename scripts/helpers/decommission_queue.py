@@ -0,0 +1,361 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from helpers.profiling import stage
+from helpers.resilience import CircuitOpenError
+
+
+# Lower numbers run first.
+PRIORITY_TERMINATED = 0
+PRIORITY_DEFAULT = 10
+
+# Job states. A job moves pending -> erase_sending -> erase_sent -> acknowledged -> deleted.
+PENDING = 'pending'
+ERASE_SENDING = 'erase_sending'
+ERASE_SENT = 'erase_sent'
+ACKNOWLEDGED = 'acknowledged'
+DELETED = 'deleted'
+FAILED = 'failed'
+NEEDS_REVIEW = 'needs_review'
+
+# Seconds a job may stay in erase_sending before it counts as interrupted. Far longer than any
+# single EraseDevice request, including the client's retries.
+ERASE_SENDING_TIMEOUT = 900
+
+ACTIVE_STATES = (PENDING, ERASE_SENT, ACKNOWLEDGED)
+FINAL_STATES = (DELETED, FAILED, NEEDS_REVIEW)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    serial TEXT NOT NULL,
+    computer_id TEXT,
+    priority INTEGER NOT NULL DEFAULT 10,
+    deadline REAL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    command_uuid TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status_checks INTEGER NOT NULL DEFAULT 0,
+    next_run_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_open_serial ON jobs(serial)
+    WHERE state NOT IN ('deleted', 'failed', 'needs_review');
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs(state, next_run_at);
+"""
+
+
+def is_rejection(status_code: Optional[int]) -> bool:
+    """
+    True for a 4xx response, which Jamf Pro sends before acting on a command. 408 is excluded:
+    the request may have been processed while the connection timed out.
+    """
+    return status_code is not None and 400 <= status_code < 500 and status_code != 408
+
+
+class DecommissionQueue:
+    """
+    Durable, prioritized queue of device decommission jobs backed by SQLite.
+
+    Every state change is committed before the worker acts on it. In particular a job is
+    marked `erase_sending` before its EraseDevice command goes out, so a job still in that
+    state long after a crash or an error mid-send is parked for review instead of being wiped
+    a second time. Several workers may share one queue.
+    """
+
+    def __init__(self, path: str = 'decommission.db'):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.executescript(SCHEMA)
+
+    def enqueue(self, serial: str, priority: int = PRIORITY_DEFAULT, deadline: Optional[float] = None,
+                computer_id: Optional[str] = None) -> Optional[int]:
+        """
+        Add a decommission job, unless the device already has one in progress.
+
+        Args:
+        serial (str): Device serial number.
+        priority (int, optional): Lower runs first, e.g. PRIORITY_TERMINATED.
+        deadline (float, optional): Epoch seconds by which the job should be done; earlier deadlines run first.
+        computer_id (str, optional): Jamf Pro computer ID, if already known.
+
+        Returns:
+        int: The job ID, or None if an open job for this serial already exists.
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                cursor = self._db.execute(
+                    'INSERT INTO jobs (serial, computer_id, priority, deadline, next_run_at, created_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (serial, computer_id, priority, deadline, now, now, now))
+                return cursor.lastrowid
+            except sqlite3.IntegrityError:
+                return None
+
+    def due(self, limit: int = 50, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Return active jobs whose next step is due, most urgent first.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM jobs WHERE state IN ({','.join('?' * len(ACTIVE_STATES))}) AND next_run_at <= ? "
+                "ORDER BY priority, deadline IS NULL, deadline, next_run_at LIMIT ?",
+                (*ACTIVE_STATES, now, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def update(self, job_id: int, **fields: Any) -> None:
+        """
+        Commit changes to a job.
+        """
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._lock:
+            self._db.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_command(self, command_uuid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute('SELECT * FROM jobs WHERE command_uuid = ? AND state = ?',
+                                   (command_uuid, ERASE_SENT)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_computer(self, computer_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute('SELECT * FROM jobs WHERE computer_id = ? AND state = ?',
+                                   (str(computer_id), ERASE_SENT)).fetchone()
+        return dict(row) if row else None
+
+    def transition(self, job_id: int, from_state: str, to_state: str) -> bool:
+        """
+        Atomically move a job from one state to another.
+
+        Returns:
+        bool: False if the job was no longer in `from_state`, e.g. another worker claimed it.
+        """
+        with self._lock:
+            cursor = self._db.execute('UPDATE jobs SET state = ?, updated_at = ? WHERE id = ? AND state = ?',
+                                      (to_state, time.time(), job_id, from_state))
+            return cursor.rowcount == 1
+
+    def recover(self, stale_after: float = ERASE_SENDING_TIMEOUT) -> int:
+        """
+        Park jobs interrupted mid-erase for manual review.
+
+        Only jobs that have been sending for longer than `stale_after` seconds are parked, so
+        jobs another worker on the same queue is sending right now are left alone.
+
+        Returns:
+        int: The number of jobs parked.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET state = ?, last_error = ?, updated_at = ? WHERE state = ? AND updated_at < ?",
+                (NEEDS_REVIEW, 'Interrupted while sending EraseDevice; verify in Jamf Pro before retrying.',
+                 time.time(), ERASE_SENDING, time.time() - stale_after))
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class DecommissionWorker:
+    """
+    Scheduler that interleaves erase, status and delete steps for many devices.
+
+    Each pass runs the due step of every ready job on a small thread pool; jobs waiting on an
+    MDM acknowledgment simply get a later `next_run_at`, so no thread blocks per device.
+    """
+
+    def __init__(self, jamf, queue: DecommissionQueue, passcode: str, max_workers: int = 8,
+                 poll_interval: float = 60, max_status_checks: int = 10, max_attempts: int = 5,
+                 delete_unacknowledged: bool = True):
+        """
+        Args:
+        jamf (JamfClient): An authenticated Jamf Pro client.
+        queue (DecommissionQueue): The job queue.
+        passcode (str): Passcode for EraseDevice commands.
+        max_workers (int, optional): Steps executed concurrently.
+        poll_interval (float, optional): Seconds between command status checks.
+        max_status_checks (int, optional): Status checks before giving up on an acknowledgment.
+        max_attempts (int, optional): Attempts per step before a job fails.
+        delete_unacknowledged (bool, optional): Delete the record even if the erase was never
+            acknowledged after max_status_checks, as the one-shot script always has.
+        """
+        self.jamf = jamf
+        self.queue = queue
+        self.passcode = passcode
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.max_status_checks = max_status_checks
+        self.max_attempts = max_attempts
+        self.delete_unacknowledged = delete_unacknowledged
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self, *_) -> None:
+        """
+        Run the next pass now instead of after the idle sleep, e.g. when a webhook made a job due.
+        """
+        self._wake.set()
+
+    def run_once(self, job_id: int = None) -> int:
+        """
+        Run every due step once, or only the step of `job_id` if it is due.
+
+        Returns:
+        int: The number of steps run.
+        """
+        if job_id is None:
+            jobs = self.queue.due(limit=self.max_workers * 4)
+        else:
+            job = self.queue.get(job_id)
+            jobs = [job] if job and job['state'] in ACTIVE_STATES and job['next_run_at'] <= time.time() else []
+        if jobs:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(self.step, jobs))
+        return len(jobs)
+
+    def run_forever(self, idle_sleep: float = 5) -> None:
+        """
+        Process jobs until stop() is called.
+        """
+        while not self._stop.is_set():
+            parked = self.queue.recover()
+            if parked:
+                print(f"{parked} job(s) were interrupted mid-erase and need review.")
+            if not self.run_once():
+                self._wake.wait(idle_sleep)
+            self._wake.clear()
+
+    def step(self, job: Dict[str, Any]) -> None:
+        """
+        Run the next step for a single job.
+        """
+        try:
+            if job['state'] == PENDING:
+                self._erase(job)
+            elif job['state'] == ERASE_SENT:
+                self._check_status(job)
+            elif job['state'] == ACKNOWLEDGED:
+                self._delete(job)
+        except Exception as e:
+            current = self.queue.get(job['id'])
+            if current and current['state'] == ERASE_SENDING:
+                # The EraseDevice command may already have reached Jamf Pro; never send it again.
+                self._park(job['id'], f'Error after sending EraseDevice ({e}); verify in Jamf Pro before retrying.')
+            else:
+                self._retry(job, str(e))
+
+    def _park(self, job_id: int, error: str) -> None:
+        print(f"Decommission job {job_id} needs review: {error}")
+        self.queue.update(job_id, state=NEEDS_REVIEW, last_error=error)
+
+    def _retry(self, job: Dict[str, Any], error: str, state: str = None) -> None:
+        attempts = job['attempts'] + 1
+        if attempts >= self.max_attempts:
+            print(f"Decommission of {job['serial']} failed: {error}")
+            self.queue.update(job['id'], state=FAILED, attempts=attempts, last_error=error)
+        else:
+            self.queue.update(job['id'], state=state or job['state'], attempts=attempts, last_error=error,
+                              next_run_at=time.time() + min(600, 30 * 2 ** attempts))
+
+    def _erase(self, job: Dict[str, Any]) -> None:
+        computer_id = job['computer_id']
+        if not computer_id:
+            with stage('fetch', serial=job['serial']):
+                computer = self.jamf.get_computer_by_serial(job['serial'])
+            if not computer:
+                self._retry(job, f"Computer with serial number {job['serial']} not found.")
+                return
+            computer_id = str(computer['general']['id'] if 'general' in computer else computer['id'])
+            self.queue.update(job['id'], computer_id=computer_id)
+
+        # Commit intent before sending so a crash can never lead to a second wipe. The claim fails
+        # if another worker sharing the queue got to the job first.
+        if not self.queue.transition(job['id'], PENDING, ERASE_SENDING):
+            return
+        try:
+            with stage('erase', computer_id=computer_id):
+                erase_response = self.jamf.erase_device(computer_id, self.passcode)
+        except CircuitOpenError as e:
+            # Raised before the request is sent, so the erase is safe to retry.
+            self._retry(dict(job, computer_id=computer_id), str(e), state=PENDING)
+            return
+
+        if not erase_response['success']:
+            error = f"Failed to send EraseDevice command: {erase_response['message']}"
+            if is_rejection(erase_response.get('status_code')):
+                self._retry(dict(job, computer_id=computer_id), error, state=PENDING)
+            else:
+                # A 5xx, gateway timeout or garbled 201 may still have queued the command in Jamf Pro.
+                self._park(job['id'], f"{error} ({erase_response.get('status_code')}); verify in Jamf Pro "
+                                      f"before retrying.")
+            return
+
+        status_uuid = erase_response['data']['computer_command']['command']['command_uuid']
+        print(f"EraseDevice command sent to computer ID {computer_id}. Status UUID: {status_uuid}")
+        self.queue.update(job['id'], state=ERASE_SENT, command_uuid=status_uuid, attempts=0,
+                          next_run_at=time.time() + self.poll_interval)
+
+    def _check_status(self, job: Dict[str, Any]) -> None:
+        with stage('status', computer_id=job['computer_id']):
+            status_response = self.jamf.check_mdm_command_status(job['command_uuid'])
+
+        if not status_response['success']:
+            self._retry(job, f"Failed to check command status: {status_response['message']}")
+            return
+
+        status = status_response['data']['computer_command']['status']
+        checks = job['status_checks'] + 1
+
+        if status == 'Acknowledged':
+            print(f"Command acknowledged for computer ID: {job['computer_id']}")
+            self.acknowledge(job['id'])
+        elif checks >= self.max_status_checks:
+            if self.delete_unacknowledged:
+                self.queue.update(job['id'], state=ACKNOWLEDGED, status_checks=checks, next_run_at=time.time())
+            else:
+                self.queue.update(job['id'], state=FAILED, status_checks=checks,
+                                  last_error=f'EraseDevice not acknowledged (last status: {status}).')
+        else:
+            self.queue.update(job['id'], status_checks=checks, next_run_at=time.time() + self.poll_interval)
+
+    def acknowledge(self, job_id: int) -> None:
+        """
+        Mark a job's erase as acknowledged so its delete step runs next.
+        """
+        self.queue.update(job_id, state=ACKNOWLEDGED, next_run_at=time.time())
+
+    def _delete(self, job: Dict[str, Any]) -> None:
+        with stage('delete', computer_id=job['computer_id']):
+            delete_response = self.jamf.delete_device(job['computer_id'])
+
+        if delete_response['success']:
+            print(f"Computer with ID {job['computer_id']} deleted successfully.")
+            self.queue.update(job['id'], state=DELETED, last_error=None)
+        else:
+            self._retry(job, f"Failed to delete computer: {delete_response['message']}")
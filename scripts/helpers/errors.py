@@ -0,0 +1,34 @@
+from typing import Any, Dict
+
+
+def response_text(response) -> str:
+    """
+    Return a response body as text without charset sniffing.
+
+    `response.text` runs charset detection over the whole body when the server sends no
+    charset, which is slow for large error pages. API error bodies are UTF-8 in practice.
+    """
+    content = response.content
+    if not content:
+        return ''
+    return content.decode(response.encoding or 'utf-8', errors='replace')
+
+
+def error_result(response, message: str) -> Dict[str, Any]:
+    """
+    Build the standard error dict returned by the API clients for an unsuccessful response.
+
+    Args:
+    response (requests.Response): The failed response.
+    message (str): A human-readable description of what failed.
+
+    Returns:
+    dict: {'success': False, 'status_code', 'reason', 'message', 'details'}.
+    """
+    return {
+        'success': False,
+        'status_code': response.status_code,
+        'reason': response.reason,
+        'message': message,
+        'details': response_text(response)
+    }
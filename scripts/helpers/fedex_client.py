@@ -1,5 +1,9 @@
 import requests
 from typing import Dict, Any, Union
+from helpers.concurrency import AdaptiveAdapter
+from helpers.errors import error_result
+from helpers.json_codec import response_json
+from helpers.record_replay import install_from_env
 
 
 class FedExAPI:
@@ -14,6 +18,8 @@ class FedExAPI:
         self.api_key = api_key
         self.base_url = 'https://apis-sandbox.fedex.com' if environment == 'sandbox' else 'https://apis.fedex.com'
         self.client = requests.session()
+        self.client.mount('https://', AdaptiveAdapter())
+        install_from_env(self.client)
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
@@ -47,15 +53,10 @@ class FedExAPI:
         response = self.client.request(method, url, headers=headers, **kwargs)
 
         if response.status_code == 200:
-            return {'success': True, 'data': response.json()}
-
-        error_details = {
-            'success': False,
-            'status_code': response.status_code,
-            'reason': response.reason,
-            'message': self.ERROR_DICT.get(response.status_code, "An error occurred with your request."),
-            'details': response.text
-        }
+            return {'success': True, 'data': response_json(response)}
+
+        error_details = error_result(response, self.ERROR_DICT.get(response.status_code,
+                                                                   "An error occurred with your request."))
 
         return error_details
 
@@ -0,0 +1,215 @@
+import numpy as np
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from helpers.records import InventoryRecord
+
+
+# InventoryRecord fields loaded into a FleetSnapshot.
+FLEET_FIELDS = ['jamf_id', 'name', 'serial', 'model', 'department', 'user_name', 'user_email',
+                'last_contact_time', 'report_date']
+
+STRING_COLUMNS = ['jamf_id', 'name', 'serial', 'model', 'department', 'user_name', 'user_email', 'tenant']
+TIME_COLUMNS = ['last_contact_time', 'report_date']
+
+Rule = Callable[['FleetSnapshot'], np.ndarray]
+
+
+def _to_datetime64(values: Iterable[Optional[str]]) -> np.ndarray:
+    """
+    Convert Jamf Pro ISO-8601 timestamps (e.g. '2024-09-30T17:04:12.345Z') to datetime64[s].
+
+    Missing values become NaT. Timestamps are UTC, so the zone designator is simply dropped.
+    """
+    return np.array([value[:19] if value else 'NaT' for value in values], dtype='datetime64[s]')
+
+
+class FleetSnapshot:
+    """
+    Columnar, NumPy-backed snapshot of computer inventory.
+
+    Each column is a 1-D array of equal length; row `i` across all columns describes one computer.
+    Rules operate on whole columns at once and return boolean masks.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], taken_at: Optional[datetime] = None):
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('All snapshot columns must have the same length.')
+
+        self.columns = columns
+        self.taken_at = taken_at or datetime.now(timezone.utc)
+
+    @classmethod
+    def from_records(cls, records: Iterable[InventoryRecord]) -> 'FleetSnapshot':
+        """
+        Build a snapshot from InventoryRecord objects projected with at least FLEET_FIELDS.
+
+        Args:
+        records (iterable): InventoryRecord objects, e.g. from get_computer_inventory(fields=FLEET_FIELDS).
+
+        Returns:
+        FleetSnapshot: The columnar snapshot.
+        """
+        records = list(records)
+        columns = {}
+
+        for field in STRING_COLUMNS:
+            columns[field] = np.array([str(getattr(r, field) or '') for r in records], dtype=str)
+
+        for field in TIME_COLUMNS:
+            columns[field] = _to_datetime64(getattr(r, field) for r in records)
+
+        columns['user_email'] = np.char.lower(columns['user_email'])
+        return cls(columns)
+
+    @classmethod
+    def from_jamf(cls, jamf, page_size: int = 100) -> 'FleetSnapshot':
+        """
+        Fetch the full computer inventory from Jamf Pro and build a snapshot.
+
+        Args:
+        jamf (JamfClient or MultiJamfClient): An authenticated Jamf Pro client. With a
+            MultiJamfClient every tenant is fetched in parallel and the `tenant` column is filled in.
+        page_size (int, optional): Inventory page size.
+
+        Returns:
+        FleetSnapshot: The columnar snapshot.
+        """
+        if hasattr(jamf, 'iter_computer_inventory'):
+            # Stream pages so raw inventory is discarded as soon as each record is projected
+            return cls.from_records(jamf.iter_computer_inventory(page_size=page_size, fields=FLEET_FIELDS))
+
+        records = jamf.get_computer_inventory(page_size=page_size, fields=FLEET_FIELDS)
+
+        if records and isinstance(records[0], dict) and 'Error' in records[0]:
+            raise RuntimeError(records[0]['Error'])
+
+        return cls.from_records(records)
+
+    def __len__(self) -> int:
+        return len(self.columns['jamf_id'])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def evaluate(self, rule: Rule) -> np.ndarray:
+        """
+        Evaluate a rule and return the indices of matching rows.
+
+        Args:
+        rule (callable): A rule taking this snapshot and returning a boolean mask.
+
+        Returns:
+        numpy.ndarray: Indices of rows flagged by the rule.
+        """
+        return np.flatnonzero(rule(self))
+
+    def rows(self, indices: Iterable[int]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield selected rows as dicts of plain Python values.
+
+        Args:
+        indices (iterable): Row indices, e.g. the output of evaluate().
+        """
+        for i in indices:
+            yield {name: column[i].item() if column.dtype.kind == 'M' else str(column[i])
+                   for name, column in self.columns.items()}
+
+
+def inactive_for(days: int, now: Optional[datetime] = None) -> Rule:
+    """
+    Flag computers that haven't contacted Jamf Pro for more than `days` days.
+
+    Computers that have never checked in (no lastContactTime) are treated as inactive.
+    """
+    def rule(snapshot: FleetSnapshot) -> np.ndarray:
+        reference = (now or snapshot.taken_at).astimezone(timezone.utc).replace(tzinfo=None)
+        cutoff = np.datetime64(reference, 's') - np.timedelta64(days, 'D')
+        last_contact = snapshot['last_contact_time']
+        return np.isnat(last_contact) | (last_contact < cutoff)
+    return rule
+
+
+def not_reported_for(days: int, now: Optional[datetime] = None) -> Rule:
+    """
+    Flag computers that haven't submitted inventory for more than `days` days.
+    """
+    def rule(snapshot: FleetSnapshot) -> np.ndarray:
+        reference = (now or snapshot.taken_at).astimezone(timezone.utc).replace(tzinfo=None)
+        cutoff = np.datetime64(reference, 's') - np.timedelta64(days, 'D')
+        report_date = snapshot['report_date']
+        return np.isnat(report_date) | (report_date < cutoff)
+    return rule
+
+
+def user_in(emails: Iterable[str]) -> Rule:
+    """
+    Flag computers assigned to any of the given users, e.g. a list of terminated employees.
+    """
+    emails = np.array(sorted({email.strip().lower() for email in emails if email}), dtype=str)
+
+    def rule(snapshot: FleetSnapshot) -> np.ndarray:
+        return np.isin(snapshot['user_email'], emails)
+    return rule
+
+
+def unassigned() -> Rule:
+    """
+    Flag computers with no assigned user.
+    """
+    def rule(snapshot: FleetSnapshot) -> np.ndarray:
+        return snapshot['user_email'] == ''
+    return rule
+
+
+def column_in(column: str, values: Iterable[str]) -> Rule:
+    """
+    Flag computers whose `column` exactly matches one of `values`, e.g. a model or department.
+    """
+    values = np.array(sorted(set(values)), dtype=str)
+
+    def rule(snapshot: FleetSnapshot) -> np.ndarray:
+        return np.isin(snapshot[column], values)
+    return rule
+
+
+def all_of(*rules: Rule) -> Rule:
+    """
+    Combine rules so that a computer is flagged only if every rule flags it.
+    """
+    def rule(snapshot: FleetSnapshot) -> np.ndarray:
+        return np.logical_and.reduce([r(snapshot) for r in rules])
+    return rule
+
+
+def any_of(*rules: Rule) -> Rule:
+    """
+    Combine rules so that a computer is flagged if any rule flags it.
+    """
+    def rule(snapshot: FleetSnapshot) -> np.ndarray:
+        return np.logical_or.reduce([r(snapshot) for r in rules])
+    return rule
+
+
+def negate(inner: Rule) -> Rule:
+    """
+    Invert a rule.
+    """
+    def rule(snapshot: FleetSnapshot) -> np.ndarray:
+        return ~inner(snapshot)
+    return rule
+
+
+def recovery_candidates(terminated_emails: Iterable[str], inactive_days: int = 30) -> Rule:
+    """
+    Default recovery rule: inactive for more than `inactive_days` days and assigned to a terminated user.
+    """
+    return all_of(inactive_for(inactive_days), user_in(terminated_emails))
+
+
+def load_emails(file_path: str) -> List[str]:
+    """
+    Read a list of email addresses, one per line, ignoring blank lines and '#' comments.
+    """
+    with open(file_path, 'r') as file:
+        return [line.strip() for line in file if line.strip() and not line.startswith('#')]
@@ -0,0 +1,62 @@
+import os
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Set, Tuple
+from helpers import json_codec
+
+
+def state_path(state_dir: str, computer_group_id: int) -> str:
+    """
+    Return the path of the membership snapshot for a computer group.
+    """
+    return os.path.join(state_dir, f'group_{computer_group_id}_members.json')
+
+
+def load_members(path: str) -> Optional[Set[int]]:
+    """
+    Load the member IDs recorded by the previous run.
+
+    Returns:
+    set: The previous member IDs, or None if there is no previous snapshot.
+    """
+    try:
+        with open(path, 'rb') as file:
+            return set(json_codec.load(file)['members'])
+    except FileNotFoundError:
+        return None
+
+
+def save_members(path: str, members: Iterable[int]) -> None:
+    """
+    Atomically write a membership snapshot.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as file:
+        json_codec.dump({'taken_at': datetime.now(timezone.utc).isoformat(), 'members': sorted(members)}, file)
+    os.replace(tmp_path, path)
+
+
+def diff_members(previous: Optional[Set[int]], current: Iterable[int]) -> Tuple[List[int], List[int]]:
+    """
+    Compare group membership against the previous run.
+
+    Args:
+    previous (set): Member IDs from the previous run, or None on the first run.
+    current (iterable): Member IDs now.
+
+    Returns:
+    tuple: (added, removed) member IDs, each sorted. On the first run every member is added.
+    """
+    current = set(current)
+    previous = previous or set()
+    return sorted(current - previous), sorted(previous - current)
+
+
+def next_members(previous: Optional[Set[int]], current: Iterable[int], processed: Iterable[int]) -> Set[int]:
+    """
+    Work out the membership to record for the next run.
+
+    Members still in the group that were already known are kept, and newly added members are
+    recorded only once they have been processed, so failed ones are retried next run.
+    """
+    return (set(previous or ()) & set(current)) | set(processed)
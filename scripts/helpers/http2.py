@@ -0,0 +1,209 @@
+import threading
+from typing import Any, Dict
+from urllib.parse import urlparse
+from requests import Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+from requests.structures import CaseInsensitiveDict
+from requests.utils import select_proxy
+
+try:
+    import h2  # noqa: F401 - httpx needs it for http2=True
+    import httpx
+except ImportError:  # pragma: no cover - httpx[http2] is optional
+    httpx = None
+
+
+AVAILABLE = httpx is not None
+
+# Response headers that describe the wire encoding; httpx hands back decoded bodies.
+_WIRE_HEADERS = frozenset({'content-encoding', 'transfer-encoding', 'content-length'})
+
+
+def _translate(error, request):
+    """
+    Map an httpx exception to the requests exception callers and ResilientAdapter handle.
+    """
+    if isinstance(error, httpx.ConnectTimeout):
+        return ConnectTimeout(error, request=request)
+    if isinstance(error, httpx.TimeoutException):
+        return ReadTimeout(error, request=request)
+    return ConnectionError(error, request=request)
+
+
+class _RawStream:
+    """
+    Minimal file-like `response.raw` over a streamed httpx response, for `iter_content()`.
+    """
+
+    def __init__(self, response, request, on_close):
+        self._response = response
+        self._request = request
+        self._chunks = response.iter_bytes()
+        self._pending = b''
+        self._on_close = on_close
+        self.closed = False
+
+    def read(self, amt: int = None, **kwargs) -> bytes:
+        while amt is None or len(self._pending) < amt:
+            try:
+                chunk = next(self._chunks, None)
+            except httpx.HTTPError as e:
+                raise _translate(e, self._request) from e
+            if chunk is None:
+                break
+            self._pending += chunk
+
+        if amt is None:
+            amt = len(self._pending)
+        data, self._pending = self._pending[:amt], self._pending[amt:]
+        return data
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._response.close()
+            self._on_close()
+
+    def release_conn(self) -> None:
+        self.close()
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Transport adapter that sends requests through an httpx client with HTTP/2 enabled, so many
+    in-flight requests to a host share a few multiplexed connections.
+
+    Servers that don't offer h2 during the TLS handshake are spoken to over HTTP/1.1 by the same
+    client. Without httpx and h2 installed every request goes through a plain HTTPAdapter, as do
+    requests that have a proxy configured (e.g. through HTTPS_PROXY). httpx errors are raised as
+    the equivalent requests exceptions.
+    """
+
+    def __init__(self, max_connections: int = 10, fallback: BaseAdapter = None):
+        """
+        Args:
+        max_connections (int, optional): Connections per httpx client; each carries many streams.
+        fallback (BaseAdapter, optional): Used when httpx is unavailable. Defaults to HTTPAdapter.
+        """
+        super().__init__()
+        self.max_connections = max_connections
+        self.fallback = None if AVAILABLE else (fallback or HTTPAdapter())
+        self._proxied = None
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._connections: Dict[int, Dict[str, Any]] = {}
+        self._totals = {'requests': 0, 'in_flight': 0, 'max_in_flight': 0, 'HTTP/2': 0, 'HTTP/1.1': 0}
+
+    def _client(self, verify, cert):
+        key = (verify if isinstance(verify, (bool, str)) else True, cert if isinstance(cert, (str, tuple)) else None)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = httpx.Client(
+                    http2=True, verify=key[0], cert=key[1], follow_redirects=False,
+                    limits=httpx.Limits(max_connections=self.max_connections,
+                                        max_keepalive_connections=self.max_connections))
+            return self._clients[key]
+
+    @staticmethod
+    def _timeout(timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(None, connect=connect, read=read)
+        return httpx.Timeout(timeout)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self.fallback is not None:
+            return self.fallback.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                      proxies=proxies)
+        if proxies and select_proxy(request.url, proxies):
+            return self._proxy_adapter().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                              proxies=proxies)
+
+        client = self._client(verify, cert)
+        outgoing = client.build_request(request.method, request.url, headers=dict(request.headers),
+                                        content=request.body, timeout=self._timeout(timeout))
+
+        with self._lock:
+            self._totals['requests'] += 1
+            self._totals['in_flight'] += 1
+            self._totals['max_in_flight'] = max(self._totals['max_in_flight'], self._totals['in_flight'])
+
+        try:
+            upstream = client.send(outgoing, stream=True)
+        except httpx.HTTPError as e:
+            self._finished(None)
+            raise _translate(e, request) from e
+
+        connection = self._opened(upstream, request.url)
+        response = self._build_response(request, upstream, lambda: self._finished(connection))
+
+        if not stream:
+            try:
+                response._content = upstream.read()
+            except httpx.HTTPError as e:
+                raise _translate(e, request) from e
+            finally:
+                response.raw.close()
+
+        return response
+
+    def _proxy_adapter(self) -> HTTPAdapter:
+        with self._lock:
+            if self._proxied is None:
+                self._proxied = HTTPAdapter()
+            return self._proxied
+
+    def _opened(self, upstream, url: str) -> int:
+        network_stream = upstream.extensions.get('network_stream')
+        connection = id(network_stream) if network_stream is not None else id(upstream)
+        with self._lock:
+            self._totals[upstream.http_version] = self._totals.get(upstream.http_version, 0) + 1
+            stats = self._connections.setdefault(connection, {
+                'host': urlparse(url).hostname, 'http_version': upstream.http_version,
+                'streams': 0, 'active': 0, 'max_active': 0})
+            stats['streams'] += 1
+            stats['active'] += 1
+            stats['max_active'] = max(stats['max_active'], stats['active'])
+        return connection
+
+    def _finished(self, connection) -> None:
+        with self._lock:
+            self._totals['in_flight'] -= 1
+            if connection in self._connections:
+                self._connections[connection]['active'] -= 1
+
+    def _build_response(self, request, upstream, on_close) -> Response:
+        response = Response()
+        response.status_code = upstream.status_code
+        response.reason = upstream.reason_phrase
+        response.headers = CaseInsensitiveDict(
+            {k: v for k, v in upstream.headers.items() if k.lower() not in _WIRE_HEADERS})
+        response.encoding = upstream.encoding
+        response.url = str(upstream.url)
+        response.request = request
+        response.connection = self
+        response.raw = _RawStream(upstream, request, on_close)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return request totals by protocol and per-connection stream counts.
+
+        Returns:
+        dict: {'available', 'requests', 'in_flight', 'max_in_flight', 'HTTP/2', 'HTTP/1.1',
+        'connections': [{'host', 'http_version', 'streams', 'active', 'max_active'}, ...]}.
+        """
+        with self._lock:
+            return dict(self._totals, available=AVAILABLE,
+                        connections=[dict(stats) for stats in self._connections.values()])
+
+    def close(self):
+        if self.fallback is not None:
+            self.fallback.close()
+        if self._proxied is not None:
+            self._proxied.close()
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from helpers import json_codec
+
+
+# Path fragment -> seconds a cached response is served without revalidation.
+DEFAULT_TTLS = {
+    '/v1/app-installers/titles': 12 * 60 * 60,
+    '/v1/computer-groups': 5 * 60,
+    '/computergroups': 5 * 60,
+    '/JSSResource/computers': 5 * 60,
+}
+
+
+class CacheEntry:
+    __slots__ = ('body', 'etag', 'last_modified', 'stored_at', 'ttl')
+
+    def __init__(self, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 stored_at: Optional[float] = None, ttl: float = 0):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.time() if stored_at is None else stored_at
+        self.ttl = ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() - self.stored_at < self.ttl
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'body': self.body.decode('utf-8'), 'etag': self.etag, 'last_modified': self.last_modified,
+                'stored_at': self.stored_at, 'ttl': self.ttl}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CacheEntry':
+        return cls(data['body'].encode('utf-8'), data.get('etag'), data.get('last_modified'),
+                   data.get('stored_at'), data.get('ttl', 0))
+
+
+class ResponseCache:
+    """
+    Two-tier (memory + optional disk) cache for GET response bodies.
+
+    Entries are served locally while younger than their endpoint's TTL. Expired entries that
+    carry an ETag or Last-Modified validator are revalidated with a conditional GET; a 304
+    response refreshes the entry without re-downloading the body. Both tiers are LRU-bounded.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 256, max_disk_entries: int = 1024,
+                 ttls: Optional[Dict[str, float]] = None, default_ttl: float = 0):
+        """
+        Args:
+        directory (str, optional): Directory for the on-disk tier. Memory-only when omitted.
+        max_entries (int, optional): Maximum entries held in memory.
+        max_disk_entries (int, optional): Maximum entry files kept on disk.
+        ttls (dict, optional): Path fragment -> TTL in seconds. Defaults to DEFAULT_TTLS.
+        default_ttl (float, optional): TTL for URLs matching no fragment. 0 always revalidates.
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, params: Any = None, body: Any = None) -> str:
+        """
+        Build a cache key from a URL and any query parameters or JSON body sent with the GET.
+        """
+        parts = [url]
+        if params:
+            parts.append(json_codec.dumps(sorted((k, v) for k, v in dict(params).items() if v is not None)))
+        if body is not None:
+            parts.append(json_codec.dumps(body))
+        return '|'.join(parts)
+
+    def ttl_for(self, url: str) -> float:
+        """
+        Return the TTL for a URL, using the longest matching path fragment.
+        """
+        matches = [fragment for fragment in self.ttls if fragment in url]
+        return self.ttls[max(matches, key=len)] if matches else self.default_ttl
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def touch(self, key: str, entry: CacheEntry) -> None:
+        """
+        Mark an entry as freshly revalidated.
+        """
+        entry.stored_at = time.time()
+        self.put(key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _read_disk(self, key: str) -> Optional[CacheEntry]:
+        if not self.directory:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                entry = CacheEntry.from_dict(json_codec.load(file))
+            os.utime(path)  # LRU order on disk follows access time via mtime
+            return entry
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, entry: CacheEntry) -> None:
+        if not self.directory:
+            return
+
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w') as file:
+                json_codec.dump(entry.to_dict(), file)
+            os.replace(tmp_path, path)
+        except (OSError, UnicodeDecodeError):
+            return
+
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        try:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                     if name.endswith('.json')]
+            if len(paths) <= self.max_disk_entries:
+                return
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:len(paths) - self.max_disk_entries]:
+                os.remove(path)
+        except OSError:
+            pass
@@ -1,5 +1,23 @@
+import queue
+import threading
 import requests
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Iterator
+from urllib3.util.request import ACCEPT_ENCODING
+from helpers.concurrency import AdaptiveAdapter
+from helpers.errors import error_result
+from helpers.http2 import HTTP2Adapter
+from helpers.http_cache import CacheEntry, ResponseCache
+from helpers.json_codec import ChunkReader, iter_object_array, response_json
+from helpers.patch_titles import render_patch_title
+from helpers.record_replay import install_from_env
+from helpers.records import InventoryRecord, sections_for
+from helpers.resilience import ResilientAdapter
+from helpers.single_flight import single_flight
+
+
+# (connect, read) seconds for requests sent without a timeout. A call that hangs longer raises
+# ReadTimeout, which counts against its endpoint's circuit breaker.
+DEFAULT_TIMEOUT = (10, 30)
 
 
 class JamfClient:
@@ -7,15 +25,82 @@ class JamfClient:
     def __init__(self, username: str,
                  password: str,
                  base_url: str,
-                 verify_cert: bool = True):
+                 verify_cert: bool = True,
+                 cache: ResponseCache = None,
+                 hedge_after: float = None,
+                 http2: bool = False,
+                 timeout: Any = DEFAULT_TIMEOUT):
 
         self.base_url = f'https://{base_url}/api'
         self.base_url_classic = f'https://{base_url}/JSSResource'
         self.username = username
         self.password = password
         self.session = requests.session()
-        self.session.headers = {'Accept': 'application/json'}
+        # gzip/deflate, plus br and zstd when brotli or zstandard is installed
+        self.session.headers = {'Accept': 'application/json', 'Accept-Encoding': ACCEPT_ENCODING}
         self.session.verify = verify_cert
+        # Per-endpoint circuit breakers (and optional hedged GETs) on top of adaptive concurrency
+        # With http2, requests are multiplexed over a few connections (HTTP/1.1 if h2 isn't offered)
+        self.http2 = HTTP2Adapter() if http2 else None
+        self.transport = ResilientAdapter(base=AdaptiveAdapter(base=self.http2), hedge_after=hedge_after,
+                                          timeout=timeout)
+        self.session.mount('https://', self.transport)
+        install_from_env(self.session)
+        self.cache = cache
+
+    def _cached_get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET a slow-changing resource through the response cache, if one was supplied.
+
+        Fresh entries are served without a request. Expired entries are revalidated with
+        If-None-Match / If-Modified-Since, and a 304 response is served from the cache.
+        """
+
+        if self.cache is None:
+            return self.session.get(url, **kwargs)
+
+        key = self.cache.key(url, kwargs.get('params'), kwargs.get('json'))
+        entry = self.cache.get(key)
+
+        if entry is not None and entry.fresh:
+            return self._cached_response(url, entry)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        response = self.session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key, entry)
+            return self._cached_response(url, entry)
+
+        if response.status_code == 200:
+            entry = CacheEntry(response.content,
+                               etag=response.headers.get('ETag'),
+                               last_modified=response.headers.get('Last-Modified'),
+                               ttl=self.cache.ttl_for(url))
+            if entry.ttl or entry.revalidatable:
+                self.cache.put(key, entry)
+
+        return response
+
+    @staticmethod
+    def _cached_response(url: str, entry: CacheEntry) -> requests.Response:
+        """
+        Build a 200 response around a cached body.
+        """
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = url
+        response._content = entry.body
+        response.headers['X-Cache'] = 'HIT'
+        return response
 
     def authenticate(self) -> str:
         """
@@ -25,8 +110,10 @@ class JamfClient:
         response = self.session.post(f'{self.base_url}/v1/auth/token',
                                      auth=(self.username, self.password))
 
-        if response.status_code == 200:
-            self.session.headers['Authorization'] = f'Bearer {response.json()["token"]}'
+        data = response_json(response) if response.status_code == 200 else None
+
+        if isinstance(data, dict) and data.get('token'):
+            self.session.headers['Authorization'] = f'Bearer {data["token"]}'
             return True
         else:
             print('Authentication failed!')
@@ -46,8 +133,10 @@ class JamfClient:
         response = self.session.post(f'{self.base_url}/oauth/token',
                                      json=payload)
 
-        if response.status_code == 200:
-            self.session.headers['Authorization'] = f'Bearer {response.json()["access_token"]}'
+        data = response_json(response) if response.status_code == 200 else None
+
+        if isinstance(data, dict) and data.get('access_token'):
+            self.session.headers['Authorization'] = f'Bearer {data["access_token"]}'
             return True
         else:
             print('Authentication failed!')
@@ -58,11 +147,11 @@ class JamfClient:
         Retrieve a full List of App Installers from the Jamf Pro Catalog.
         """
 
-        response = self.session.get(f'{self.base_url}/v1/app-installers/titles',
+        response = self._cached_get(f'{self.base_url}/v1/app-installers/titles',
                                     json={'page-size': 999})
 
         if response.status_code == 200:
-            return response.json()
+            return response_json(response)
 
         else:
             print("Error retrieving App Installers", response.status_code, response.content)
@@ -75,7 +164,7 @@ class JamfClient:
         response = self.session.get(f'{self.base_url}/v1/app-installers/deployments', json={'page-size': 999})
 
         if response.status_code == 200:
-            return response.json()
+            return response_json(response)
 
         else:
             print("Error retrieving deployed App Installers", response.status_code, response.content)
@@ -88,7 +177,7 @@ class JamfClient:
         response = self.session.get(f'{self.base_url}/v1/app-installers/titles/{app_installer_id}')
 
         if response.status_code == 200:
-            return response.json()
+            return response_json(response)
 
         else:
             print("Error retrieving App Installers",
@@ -105,7 +194,7 @@ class JamfClient:
         response = self.session.get(f'{self.base_url}{deployment_uri}')
 
         if response.status_code == 200:
-            return response.json()
+            return response_json(response)
 
         else:
             print("Error retrieving deployments",
@@ -122,7 +211,7 @@ class JamfClient:
         response = self.session.get(f'{self.base_url}{deployment_uri}')
 
         if response.status_code == 200:
-            return response.json()
+            return response_json(response)
 
         else:
             print("Error retrieving deployments",
@@ -134,10 +223,10 @@ class JamfClient:
         Retrieve systems registered with Jamf Pro.
         """
 
-        response = self.session.get(f'{self.base_url_classic}/computers')
+        response = self._cached_get(f'{self.base_url_classic}/computers')
 
         if response.status_code == 200:
-            return response.json()
+            return response_json(response)
 
         else:
             print("Error retrieving Jamf systems",
@@ -145,68 +234,203 @@ class JamfClient:
                   response.content)
 
     def get_computer_inventory(self, sections: List = None, page_size: int = 100,
-                               sort: List = None, filter: str = None) -> List:
+                               sort: List = None, filter: str = None, fields: List[str] = None) -> List:
         """
         Returns List of computer inventory records.
+
+        When `fields` is supplied, each page is projected into InventoryRecord objects as it is
+        parsed and the raw nested dicts are discarded. `sections` defaults to the sections
+        those fields need.
+        """
+
+        try:
+            results = list(self.iter_computer_inventory(sections, page_size, sort, filter, fields))
+        except RuntimeError as e:
+            print('Failed to retrieve records')
+            return [{'Error': str(e)}]
+
+        print(len(results))
+        return results
+
+    def iter_computer_inventory(self, sections: List = None, page_size: int = 100, sort: List = None,
+                                filter: str = None, fields: List[str] = None,
+                                prefetch_pages: int = 2) -> Iterator:
+        """
+        Stream computer inventory records across all pages.
+
+        Each page is downloaded compressed and parsed record by record as it arrives, on a
+        background thread that runs up to `prefetch_pages` pages ahead of the consumer. Only
+        those buffered records, never a whole raw page, are held in memory.
+
+        Args:
+        sections (list, optional): Inventory sections to include.
+        page_size (int, optional): Records per page.
+        sort (list, optional): Sort criteria, e.g. ['general.name:asc'].
+        filter (str, optional): RSQL filter expression.
+        fields (list, optional): InventoryRecord fields to project each record onto.
+        prefetch_pages (int, optional): Pages the download may run ahead of processing.
+
+        Yields:
+        dict or InventoryRecord: Each inventory record.
+
+        Raises:
+        RuntimeError: If a page could not be retrieved.
+        """
+
+        if fields:
+            fields = frozenset(fields)
+            sections = sections or sections_for(fields)
+
+        batch_size = min(page_size, 50)
+        batches = queue.Queue(maxsize=max(1, prefetch_pages * page_size // batch_size))
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            try:
+                page = 0
+                while True:
+                    meta = {}
+                    count = 0
+                    batch = []
+                    for item in self._stream_inventory_page(page, page_size, sections, sort, filter, meta):
+                        batch.append(InventoryRecord.from_inventory(item, fields) if fields else item)
+                        if len(batch) == batch_size:
+                            count += len(batch)
+                            if not put(batch):
+                                return
+                            batch = []
+                    if batch:
+                        count += len(batch)
+                        if not put(batch):
+                            return
+
+                    page += 1
+                    if not count or page * page_size >= meta.get('totalCount', 0):
+                        break
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        producer = threading.Thread(target=produce, name='jamf-inventory-prefetch', daemon=True)
+        producer.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is done:
+                    return
+                if isinstance(batch, Exception):
+                    raise RuntimeError(f'Failed to retrieve records - {batch}') from batch
+                yield from batch
+        finally:
+            stop.set()
+
+    def _stream_inventory_page(self, page: int, page_size: int, sections: List, sort: List, filter: str,
+                               meta: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the raw records of one inventory page as they are decompressed and parsed.
+
+        The page's other members (e.g. 'totalCount') are stored in `meta`.
         """
 
-        page = 0
-        params = {'page-size': page_size}
+        response = self.session.get(f'{self.base_url}/v1/computers-inventory',
+                                    params=self._inventory_params(page, page_size, sections, sort, filter),
+                                    stream=True)
+        try:
+            if response.status_code != 200:
+                raise RuntimeError(f'page {page}: {response.status_code} {response.reason}')
+            yield from iter_object_array(ChunkReader(response.iter_content(64 * 1024)), 'results', meta)
+        finally:
+            response.close()
+
+    @staticmethod
+    def _inventory_params(page: int, page_size: int, sections: List, sort: List, filter: str) -> Dict[str, Any]:
+        params = {'page': page, 'page-size': page_size}
         params['sort'] = ','.join(sort) if sort else None
         params['section'] = sections if sections else None
+        params['filter'] = filter
+        return params
 
-        response = self.session.get(f'{self.base_url}/v1/computers-inventory',
-                                    params=params)
+    def get_computer_inventory_page(self, page: int = 0, page_size: int = 100, sections: List = None,
+                                    sort: List = None, filter: str = None,
+                                    fields: List[str] = None) -> Dict[str, Any]:
+        """
+        Retrieve a single page of computer inventory records.
 
-        if response.status_code == 200:
-            results = response.json()['results']
-            print(len(results))
-            total = response.json()['totalCount']
-            total_pages = (total//page_size)
+        Args:
+        page (int, optional): Zero-based page number.
+        page_size (int, optional): Records per page.
+        sections (list, optional): Inventory sections to include.
+        sort (list, optional): Sort criteria, e.g. ['general.name:asc'].
+        filter (str, optional): RSQL filter expression.
+        fields (list, optional): InventoryRecord fields to project each record onto.
+
+        Returns:
+        dict: API response with the page's records in 'data' and the fleet-wide 'total', or error details.
+        """
 
-            while page != total_pages:
-                page += 1
-                params['page'] = page
-                response = self.session.get(f'{self.base_url}/v1/computers-inventory',
-                                            params=params)
+        if fields:
+            fields = frozenset(fields)
+            sections = sections or sections_for(fields)
 
-                if response.status_code == 200:
-                    results += response.json()['results']
-                    print(len(results))
+        response = self.session.get(f'{self.base_url}/v1/computers-inventory',
+                                    params=self._inventory_params(page, page_size, sections, sort, filter))
 
-                else:
-                    print('Failed iteration')
-                    return [{'Error': f'Failed iteration - {response.status_code}'}]
+        if response.status_code != 200:
+            return error_result(response, "An error occurred while retrieving computer inventory.")
 
-            return results
+        data = response_json(response)
+        if not isinstance(data, dict) or 'results' not in data:
+            return error_result(response, "The computer inventory response was empty or not valid JSON.")
+        return {'success': True,
+                'data': self._project_inventory(data['results'], fields),
+                'total': data.get('totalCount', 0)}
 
-        else:
-            print('Failed to retrieve records')
-            return [{'Error': f'Failed to retrieve records - {response.status_code}'}]
+    @staticmethod
+    def _project_inventory(items: List[Dict[str, Any]], fields: frozenset = None) -> List:
+        """
+        Project raw inventory dicts into InventoryRecord objects, or pass them through unchanged.
+        """
+
+        if not fields:
+            return items
+
+        return [InventoryRecord.from_inventory(item, fields) for item in items]
 
-    def get_computer_inventory_details(self, computer_id: str) -> Dict[str, Any]:
+    def get_computer_inventory_details(self, computer_id: str, fields: List[str] = None) -> Dict[str, Any]:
         """
         Retrieve detailed inventory information for a specific computer.
 
         Args:
         computer_id (str): The unique identifier for the computer.
+        fields (list, optional): InventoryRecord fields to project the response onto.
 
         Returns:
-        dict: API response containing detailed computer inventory or error details.
+        dict: API response containing detailed computer inventory (an InventoryRecord when
+        `fields` is supplied) or error details.
         """
-        endpoint = f'/v1/computers-inventory/detail/{computer_id}'
-        response = self.session.get(f'{self.base_url}{endpoint}', headers=self.headers)
+        endpoint = f'/v1/computers-inventory-detail/{computer_id}'
+        response = self.session.get(f'{self.base_url}{endpoint}')
 
-        if response.status_code == 200:
-            return {'success': True, 'data': response.json()}
-        else:
-            return {
-                'success': False,
-                'status_code': response.status_code,
-                'reason': response.reason,
-                'message': "An error occurred while retrieving computer inventory details.",
-                'details': response.text
-            }
+        if response.status_code != 200:
+            return error_result(response, "An error occurred while retrieving computer inventory details.")
+
+        data = response_json(response)
+        if not isinstance(data, dict):
+            return error_result(response, "The computer inventory details response was empty or not valid JSON.")
+        if fields:
+            data = InventoryRecord.from_inventory(data, frozenset(fields))
+        return {'success': True, 'data': data}
 
     def get_computer_group(self, name: str = None, id: int = None):
         """
@@ -220,10 +444,10 @@ class JamfClient:
         else:
             return None
 
-        response = self.session.get(f'{self.base_url_classic}/computergroups/{uri}')
+        response = self._cached_get(f'{self.base_url_classic}/computergroups/{uri}')
 
         if response.status_code == 200:
-            return response.json()
+            return response_json(response)
         else:
             print('Computer gruop retrieval failed!')
             return {'Error': f'Failed to retrieve computer group - {response.status_code}'}
@@ -233,10 +457,10 @@ class JamfClient:
         Return a list of all computer groups.
         """
 
-        response = self.session.get(f'{self.base_url}/v1/computer-groups')
+        response = self._cached_get(f'{self.base_url}/v1/computer-groups')
 
         if response.status_code == 200:
-            return response.json()
+            return response_json(response)
         else:
             print('Computer group retrieval failed!')
             return {'Error': 'Computer group retrieval failed!'}
@@ -250,7 +474,7 @@ class JamfClient:
                                      data=xml_config)
 
         if response.status_code == 200:
-            return response.json()
+            return response_json(response)
         else:
             print('Computer group creation failed!')
             return {'Error': 'Computer group creation failed!'}
@@ -301,8 +525,8 @@ class JamfClient:
         response = self.session.post(f'{self.base_url}/v1/app-installers/deployments',
                                      json=payload)
 
-        if response.status_code == 200:
-            return response.json()
+        if response.status_code in (200, 201):
+            return response_json(response)
         else:
             print('App Installer deployment failed!')
             return {'Error': 'App Installer deployment failed!'}
@@ -312,45 +536,33 @@ class JamfClient:
         Retry failed App Installer deployments.
         """
 
-        retry_uri = f'/api/v1/app-installers/deployments/{deployment_id}/computers/installation-retry'
+        retry_uri = f'/v1/app-installers/deployments/{deployment_id}/computers/installation-retry'
 
         response = self.session.post(f'{self.base_url}{retry_uri}')
 
-        if response.status_code == 200:
-            return response.json()
+        if response.status_code in (200, 204):
+            return True
 
         else:
-            print("Error retrieving App Installers",
+            print("Error retrying App Installer deployment",
                   response.status_code,
                   response.content)
+            return False
 
-    def add_patch_title(self, title_name: str, title_id: str) -> Dict:
+    def add_patch_title(self, title_name: str, title_id: str) -> requests.Response:
         """
         Add a Patch Title to Jamf Pro's Patch Management module
         """
 
-        title_config = f"""
-        <patch_software_title>
-            <name>{title_name}</name>
-            <name_id>{title_id}</name_id>
-            <source_id>1</source_id>
-            <notifications>
-                <web_notification>true</web_notification>
-                <email_notification>true</email_notification>
-            </notifications>
-            <category>
-                <id>12</id>
-                <name>Automatically Configured</name>
-            </category>
-        </patch_software_title>
-        """
+        title_config = render_patch_title(title_name, title_id)
 
         response = self.session.post(f"{self.base_url_classic}/patchsoftwaretitles/id/-1",
-                                     data=title_config)
+                                     data=title_config,
+                                     headers={'Content-Type': 'application/xml'})
 
         return response
 
-    def add_patch_title_dashboard(self, patch_title_id: str) -> Dict:
+    def add_patch_title_dashboard(self, patch_title_id: str) -> bool:
         """
         Add a Patch Software Title to the Jamf Pro Dashboard.
         """
@@ -360,16 +572,18 @@ class JamfClient:
         response = self.session.post(f"{self.base_url}{uri}")
 
         if response.status_code == 204:
-            return response.json()
+            return True
 
         else:
-            print("Error retrieving App Installers",
+            print("Error adding Patch Title to dashboard",
                   response.status_code,
                   response.content)
+            return False
 
+    @single_flight
     def get_computer_by_serial(self, serial_number: str) -> Any:
         """
-        Find a computer by its serial number.
+        Find a computer by its serial number. Concurrent lookups of the same serial share one request.
 
         Args:
         serial_number (str): The serial number of the computer.
@@ -378,10 +592,10 @@ class JamfClient:
         dict: API response containing computer details or error details.
         """
         url = f'{self.base_url_classic}/computers/serialnumber/{serial_number}'
-        response = self.session.get(url, headers=self.headers)
+        response = self.session.get(url)
 
         if response.status_code == 200:
-            computer = response.json()
+            computer = response_json(response)
             return computer.get('computer', None)  # Returns computer object if found
         else:
             print(f"Failed to find computer by serial number: {serial_number}")
@@ -406,15 +620,9 @@ class JamfClient:
 
         # Check for the correct success status code: 201 (Created)
         if response.status_code == 201:
-            return {'success': True, 'data': response.json()}
+            return {'success': True, 'data': response_json(response)}
         else:
-            return {
-                'success': False,
-                'status_code': response.status_code,
-                'reason': response.reason,
-                'message': "An error occurred while sending the erase command.",
-                'details': response.text
-            }
+            return error_result(response, "An error occurred while sending the erase command.")
 
     def check_mdm_command_status(self, statusuuid: str) -> Dict[str, Any]:
         """
@@ -434,15 +642,9 @@ class JamfClient:
 
         # Check for success status code: 200 (OK)
         if response.status_code == 200:
-            return {'success': True, 'data': response.json()}
+            return {'success': True, 'data': response_json(response)}
         else:
-            return {
-                'success': False,
-                'status_code': response.status_code,
-                'reason': response.reason,
-                'message': f'Failed to retrieve status for command with UUID {statusuuid}.',
-                'details': response.text
-            }
+            return error_result(response, f'Failed to retrieve status for command with UUID {statusuuid}.')
 
     def delete_device(self, computer_id: str) -> Dict[str, Any]:
         """
@@ -464,10 +666,4 @@ class JamfClient:
         if response.status_code == 200:
             return {'success': True, 'message': f'Computer with ID {computer_id} deleted successfully.'}
         else:
-            return {
-                'success': False,
-                'status_code': response.status_code,
-                'reason': response.reason,
-                'message': f'Failed to delete computer with ID {computer_id}.',
-                'details': response.text
-            }
+            return error_result(response, f'Failed to delete computer with ID {computer_id}.')
@@ -0,0 +1,331 @@
+import codecs
+import json
+import re
+from typing import Any, IO, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+BACKEND = 'orjson' if orjson else 'json'
+
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+# A fraction or exponent cut off at the end of the buffer, e.g. the '.' of '-2.5'.
+_NUMBER_TAIL = re.compile(r'(?:\.|[eE][+-]?)\Z')
+
+
+def loads(data: Any) -> Any:
+    """
+    Decode a JSON document using the fastest available backend.
+
+    Args:
+    data (bytes or str): The raw JSON document.
+
+    Returns:
+    Any: The decoded Python object.
+    """
+    if orjson:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode('utf-8')
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Encode a Python object as a JSON string using the fastest available backend.
+
+    Args:
+    obj (Any): The object to encode.
+    indent (bool, optional): Pretty-print with a two-space indent.
+
+    Returns:
+    str: The encoded JSON document.
+    """
+    if orjson:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None, separators=None if indent else (',', ':'))
+
+
+def load(fp: IO) -> Any:
+    """
+    Decode a JSON document from an open file.
+
+    Args:
+    fp (file): A file object opened for reading, in text or binary mode.
+
+    Returns:
+    Any: The decoded Python object.
+    """
+    return loads(fp.read())
+
+
+def dump(obj: Any, fp: IO, indent: bool = False) -> None:
+    """
+    Encode a Python object as JSON and write it to an open text file.
+
+    Args:
+    obj (Any): The object to encode.
+    fp (file): A file object opened for writing in text mode.
+    indent (bool, optional): Pretty-print with a two-space indent.
+    """
+    fp.write(dumps(obj, indent=indent))
+
+
+def iter_ndjson(fp: IO) -> Iterator[Any]:
+    """
+    Lazily decode newline-delimited JSON, one document per non-blank line.
+
+    Args:
+    fp (file): A file object opened for reading, in text or binary mode.
+
+    Yields:
+    Any: Each decoded document.
+    """
+    for line in fp:
+        if line.strip():
+            yield loads(line)
+
+
+class _Scanner:
+    """
+    Incremental reader over a text stream for the streaming decoders below.
+
+    Holds one read chunk plus whatever part of the current value is still incomplete.
+    """
+
+    def __init__(self, fp: IO, chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer, self.pos = self.buffer[self.pos:] + chunk, 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Return the next significant character without consuming it.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON document.')
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in JSON document.")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """
+        Decode and consume the next complete JSON value.
+        """
+        self.peek()
+        raw_decode = self.decoder.raw_decode
+        while True:
+            try:
+                value, end = raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                end = None
+
+            # A value ending at the end of the buffer, or a number followed only by the start of
+            # a fraction or exponent, may have been cut off by the chunk boundary; read on.
+            truncated = (end is None or end == len(self.buffer)
+                         or (value.__class__ in (int, float) and _NUMBER_TAIL.match(self.buffer, end)))
+            if truncated and self._fill():
+                continue
+            if end is None:
+                raise ValueError('Invalid JSON value in document.')
+
+            self.pos = end
+            return value
+
+    def elements(self) -> Iterator[Any]:
+        """
+        Yield the elements of the array whose opening bracket was just consumed.
+        """
+        if self.peek() == ']':
+            self.pos += 1
+            return
+
+        value, peek = self.value, self.peek
+        while True:
+            yield value()
+            char = peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError('Expected \',\' or \']\' in JSON array.')
+
+
+def iter_array(fp: IO, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Lazily decode the elements of a top-level JSON array without reading the whole file.
+
+    Only the current element and one read chunk are held in memory at a time.
+
+    Args:
+    fp (file): A file object opened for reading in text mode.
+    chunk_size (int, optional): Characters read per chunk.
+
+    Yields:
+    Any: Each element of the array.
+    """
+    scanner = _Scanner(fp, chunk_size)
+    if scanner.peek() != '[':
+        raise ValueError('Expected a JSON array.')
+    scanner.pos += 1
+    yield from scanner.elements()
+
+
+def iter_object_array(fp: IO, field: str, meta: dict = None, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Lazily decode the elements of one array member of a top-level JSON object, e.g. the
+    'results' of a paged API response.
+
+    Other members are decoded whole and stored in `meta` as they are passed; members after
+    the array are only available once the generator is exhausted.
+
+    Args:
+    fp (file): A file object opened for reading in text mode.
+    field (str): Name of the array member to stream.
+    meta (dict, optional): Receives the object's other members.
+    chunk_size (int, optional): Characters read per chunk.
+
+    Yields:
+    Any: Each element of the array.
+    """
+    scanner = _Scanner(fp, chunk_size)
+    scanner.expect('{')
+    if scanner.peek() == '}':
+        return
+
+    while True:
+        key = scanner.value()
+        scanner.expect(':')
+        if key == field:
+            scanner.expect('[')
+            yield from scanner.elements()
+        else:
+            value = scanner.value()
+            if meta is not None:
+                meta[key] = value
+
+        char = scanner.peek()
+        scanner.pos += 1
+        if char == '}':
+            return
+        if char != ',':
+            raise ValueError("Expected ',' or '}' in JSON object.")
+
+
+class ChunkReader:
+    """
+    Text file-like view over an iterable of byte chunks, e.g. `response.iter_content()`,
+    decoding UTF-8 incrementally so a streamed body can be fed to the decoders above.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._pending = ''
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._pending += self._decoder.decode(b'', final=True)
+                break
+            self._pending += self._decoder.decode(chunk)
+
+        if size < 0:
+            size = len(self._pending)
+        text, self._pending = self._pending[:size], self._pending[size:]
+        return text
+
+
+def iter_records(fp: IO) -> Iterator[Any]:
+    """
+    Lazily decode either a JSON array or NDJSON, depending on the first significant character.
+
+    Args:
+    fp (file): A file object opened for reading in text mode.
+
+    Yields:
+    Any: Each array element or NDJSON document.
+    """
+    first = fp.read(1)
+    while first and first.isspace():
+        first = fp.read(1)
+
+    if not first:
+        return
+
+    rest = _Prefixed(first, fp)
+    if first == '[':
+        yield from iter_array(rest)
+    else:
+        yield from iter_ndjson(rest)
+
+
+class _Prefixed:
+    """
+    File-like wrapper that replays already-consumed characters before the rest of a file.
+    """
+
+    def __init__(self, prefix: str, fp: IO):
+        self.prefix = prefix
+        self.fp = fp
+
+    def read(self, size: int = -1) -> str:
+        prefix, self.prefix = self.prefix, ''
+        if size is None or size < 0:
+            return prefix + self.fp.read()
+        return prefix + self.fp.read(max(0, size - len(prefix))) if size > len(prefix) else prefix
+
+    def __iter__(self):
+        prefix, self.prefix = self.prefix, ''
+        first_line = prefix + self.fp.readline()
+        if first_line:
+            yield first_line
+        yield from self.fp
+
+
+def response_json(response) -> Any:
+    """
+    Decode the body of an HTTP response exactly once.
+
+    The decoded body is memoised on the response object, so repeated calls
+    (e.g. a success check followed by an error print) do not re-parse it.
+
+    Args:
+    response (requests.Response): The response to decode.
+
+    Returns:
+    Any: The decoded body, or None if the body is empty or not valid JSON.
+    """
+    try:
+        return response._decoded_json
+    except AttributeError:
+        pass
+
+    try:
+        decoded = loads(response.content) if response.content else None
+    except ValueError:
+        decoded = None
+
+    response._decoded_json = decoded
+    return decoded
@@ -0,0 +1,181 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from helpers.jamf_client import JamfClient
+from helpers.records import InventoryRecord
+
+
+class MultiJamfClient:
+    """
+    Fan operations out across several Jamf Pro instances in parallel.
+
+    Holds one authenticated JamfClient per tenant. Read operations run against every tenant at
+    once and merge their results with a tenant tag, so a global sweep takes as long as the
+    slowest tenant rather than the sum of all of them. Per-tenant failures from the most recent
+    call are kept in `errors` instead of aborting the whole sweep.
+    """
+
+    def __init__(self, clients: Dict[str, JamfClient], max_workers: Optional[int] = None):
+        """
+        Args:
+        clients (dict): Tenant name -> JamfClient.
+        max_workers (int, optional): Tenants queried concurrently. Defaults to one per tenant.
+        """
+        self.clients = clients
+        self.max_workers = max_workers or max(1, len(clients))
+        self.errors = {}
+
+    @classmethod
+    def from_config(cls, tenants: Dict[str, Dict[str, Any]], **client_kwargs: Any) -> 'MultiJamfClient':
+        """
+        Build a client from per-tenant settings.
+
+        Args:
+        tenants (dict): Tenant name -> dict with 'username', 'password' and 'base_url' (plus any other
+            JamfClient arguments).
+        client_kwargs: JamfClient arguments shared by every tenant, e.g. verify_cert or cache.
+
+        Returns:
+        MultiJamfClient: The multi-tenant client.
+        """
+        return cls({name: JamfClient(**dict(client_kwargs, **settings)) for name, settings in tenants.items()})
+
+    def fan_out(self, method: str, *args: Any, tenants: Optional[Iterable[str]] = None,
+                **kwargs: Any) -> Dict[str, Any]:
+        """
+        Call the same JamfClient method on every tenant in parallel.
+
+        Args:
+        method (str): JamfClient method name.
+        tenants (iterable, optional): Limit the call to these tenants.
+
+        Returns:
+        dict: Tenant name -> result. Tenants whose call raised are omitted and recorded in `errors`.
+        """
+        names = list(tenants) if tenants is not None else list(self.clients)
+        return self._run([(name, method, args, kwargs) for name in names])
+
+    def run_each(self, calls: Iterable[Tuple[str, str, tuple, dict]]) -> List[Any]:
+        """
+        Run a batch of tenant-specific calls in parallel, e.g. MDM commands for devices on different tenants.
+
+        Args:
+        calls (iterable): (tenant, method, args, kwargs) tuples.
+
+        Returns:
+        list: Results in input order; None where the call raised (see `errors`).
+        """
+        calls = list(calls)
+        self.errors = {}
+
+        def call(index_and_call):
+            index, (name, method, args, kwargs) = index_and_call
+            try:
+                return getattr(self.clients[name], method)(*args, **kwargs)
+            except Exception as e:
+                self.errors[f'{name}[{index}]'] = str(e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(call, enumerate(calls)))
+
+    def _run(self, calls: List[Tuple[str, str, tuple, dict]]) -> Dict[str, Any]:
+        self.errors = {}
+
+        def call(name, method, args, kwargs):
+            try:
+                return getattr(self.clients[name], method)(*args, **kwargs)
+            except Exception as e:
+                self.errors[name] = str(e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {name: executor.submit(call, name, method, args, kwargs) for name, method, args, kwargs in calls}
+            results = {name: future.result() for name, future in futures.items()}
+
+        return {name: result for name, result in results.items() if name not in self.errors}
+
+    def authenticate(self, api_client: bool = False) -> Dict[str, bool]:
+        """
+        Authenticate every tenant in parallel.
+
+        Args:
+        api_client (bool, optional): Use API client credentials instead of a username and password.
+
+        Returns:
+        dict: Tenant name -> whether authentication succeeded.
+        """
+        results = self.fan_out('authenticate_api_client' if api_client else 'authenticate')
+        return {name: bool(results.get(name)) for name in self.clients}
+
+    def get_computer_inventory(self, **kwargs: Any) -> List:
+        """
+        Fetch computer inventory from every tenant and merge it, tagging each record with its tenant.
+
+        Accepts the same keyword arguments as JamfClient.get_computer_inventory. InventoryRecord
+        results get their `tenant` attribute set; raw dicts get a 'tenant' key.
+        """
+        merged = []
+        for name, results in self.fan_out('get_computer_inventory', **kwargs).items():
+            if results and isinstance(results[0], dict) and 'Error' in results[0]:
+                self.errors[name] = results[0]['Error']
+                print(f"Inventory retrieval failed for tenant {name}: {results[0]['Error']}")
+                continue
+            merged += self._tag(results, name)
+        return merged
+
+    def get_computer_groups(self) -> List[Dict[str, Any]]:
+        """
+        Return every tenant's computer groups, tagged with their tenant.
+        """
+        merged = []
+        for name, groups in self.fan_out('get_computer_groups').items():
+            if isinstance(groups, dict) and 'Error' in groups:
+                self.errors[name] = groups['Error']
+                continue
+            merged += self._tag(groups, name)
+        return merged
+
+    def get_computer_group(self, name: str = None, id: int = None) -> Dict[str, Any]:
+        """
+        Retrieve the same computer group (by name or ID) from every tenant.
+
+        Returns:
+        dict: Tenant name -> computer group response.
+        """
+        return self.fan_out('get_computer_group', name=name, id=id)
+
+    def find_computer_by_serial(self, serial_number: str) -> List[Dict[str, Any]]:
+        """
+        Look a serial number up on every tenant at once.
+
+        Returns:
+        list of dict: Matching computer objects, each tagged with its tenant.
+        """
+        results = self.fan_out('get_computer_by_serial', serial_number)
+        return [dict(computer, tenant=name) for name, computer in results.items() if computer]
+
+    def erase_devices(self, targets: Iterable[Tuple[str, str]], passcode: str) -> List[Dict[str, Any]]:
+        """
+        Send EraseDevice commands to devices spread across tenants, in parallel.
+
+        Args:
+        targets (iterable): (tenant, computer_id) pairs.
+        passcode (str): Passcode for the erase command.
+
+        Returns:
+        list of dict: erase_device responses in input order, each tagged with its tenant.
+        """
+        targets = list(targets)
+        responses = self.run_each((tenant, 'erase_device', (computer_id, passcode), {})
+                                  for tenant, computer_id in targets)
+        return [dict(response or {'success': False, 'message': 'Request raised an exception.'}, tenant=tenant)
+                for (tenant, _), response in zip(targets, responses)]
+
+    @staticmethod
+    def _tag(items: List, tenant: str) -> List:
+        for item in items:
+            if isinstance(item, InventoryRecord):
+                item.tenant = tenant
+            elif isinstance(item, dict):
+                item['tenant'] = tenant
+        return items
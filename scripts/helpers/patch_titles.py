@@ -0,0 +1,136 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+from typing import Any, Dict, Iterable, List
+from xml.sax.saxutils import escape
+from helpers.concurrency import RateLimiter
+
+
+# Classic API patch software title, compiled once and filled per title.
+PATCH_TITLE_TEMPLATE = Template("""<patch_software_title>
+    <name>$name</name>
+    <name_id>$name_id</name_id>
+    <source_id>$source_id</source_id>
+    <notifications>
+        <web_notification>true</web_notification>
+        <email_notification>true</email_notification>
+    </notifications>
+    <category>
+        <id>$category_id</id>
+        <name>$category_name</name>
+    </category>
+</patch_software_title>""")
+
+_CREATED_ID = re.compile(r'<id>(\d+)</id>')
+
+
+def render_patch_title(title_name: str, title_id: str, source_id: int = 1, category_id: int = 12,
+                       category_name: str = 'Automatically Configured') -> str:
+    """
+    Render the patch software title XML for a single title, escaping every value.
+
+    Args:
+    title_name (str): Display name for the title.
+    title_id (str): The patch source's name_id for the title.
+    source_id (int, optional): Patch source ID; 1 is the Jamf Pro built-in source.
+    category_id (int, optional): Category ID.
+    category_name (str, optional): Category name.
+
+    Returns:
+    str: The XML document.
+    """
+    return PATCH_TITLE_TEMPLATE.substitute(name=escape(str(title_name)), name_id=escape(str(title_id)),
+                                           source_id=int(source_id), category_id=int(category_id),
+                                           category_name=escape(category_name))
+
+
+def created_id(response) -> str:
+    """
+    Extract the new object's ID from a Classic API create response.
+    """
+    match = _CREATED_ID.search(response.text or '')
+    return match.group(1) if match else None
+
+
+class PatchTitleOnboarder:
+    """
+    Onboard many patch software titles concurrently under a request rate limit.
+
+    Each title is created through the Classic API and, as soon as that succeeds, registered on
+    the Patch Management dashboard. Every title gets a result entry whether or not it succeeded.
+    """
+
+    def __init__(self, jamf, max_workers: int = 8, requests_per_second: float = 5, dashboard: bool = True):
+        """
+        Args:
+        jamf (JamfClient): An authenticated Jamf Pro client.
+        max_workers (int, optional): Titles onboarded concurrently.
+        requests_per_second (float, optional): Upper bound on requests sent to Jamf Pro.
+        dashboard (bool, optional): Register each created title on the dashboard.
+        """
+        self.jamf = jamf
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(requests_per_second, burst=max_workers)
+        self.dashboard = dashboard
+
+    def onboard(self, titles: Iterable[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Onboard every title.
+
+        Args:
+        titles (iterable): Dicts with 'name' and 'name_id' keys.
+
+        Returns:
+        list of dict: One result per title, in input order, with 'success', 'patch_title_id',
+        'dashboard' and 'error' keys.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._onboard_title, titles))
+
+    def _onboard_title(self, title: Dict[str, str]) -> Dict[str, Any]:
+        result = {'name': title['name'], 'name_id': title['name_id'], 'success': False,
+                  'patch_title_id': None, 'dashboard': False, 'error': None}
+
+        self.limiter.wait()
+        try:
+            response = self.jamf.add_patch_title(title['name'], title['name_id'])
+        except Exception as e:
+            result['error'] = str(e)
+            return result
+
+        if response.status_code not in (200, 201):
+            result['error'] = f'Patch title creation failed - {response.status_code}'
+            return result
+
+        result['patch_title_id'] = created_id(response)
+        result['success'] = True
+
+        if not result['patch_title_id']:
+            # Created, but without its ID the title can't be registered on the dashboard.
+            result['error'] = 'Patch title created, but no ID was found in the response'
+            return result
+
+        if self.dashboard:
+            self.limiter.wait()
+            try:
+                result['dashboard'] = self.jamf.add_patch_title_dashboard(result['patch_title_id'])
+            except Exception as e:
+                result['error'] = f'Dashboard registration failed - {e}'
+                return result
+            if not result['dashboard']:
+                result['error'] = 'Dashboard registration failed'
+
+        return result
+
+    @staticmethod
+    def summary(results: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Count created titles, dashboard registrations and failures.
+        """
+        results = list(results)
+        return {
+            'titles': len(results),
+            'created': sum(1 for r in results if r['success']),
+            'dashboard': sum(1 for r in results if r['dashboard']),
+            'failed': sum(1 for r in results if not r['success']),
+        }
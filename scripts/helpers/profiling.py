@@ -0,0 +1,157 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from helpers import json_codec
+
+
+# The profiler of the current --profile run, if any. stage() is a no-op while this is None.
+_active = None
+
+_DISABLED = nullcontext()
+
+
+class Profiler:
+    """
+    Collects a span timeline and a cProfile of one script run, and writes both as a single
+    JSON artifact together with per-stage totals.
+
+    cProfile only sees the main thread; spans are recorded from every thread. cProfile and pstats
+    are imported on first use, so scripts run without --profile don't pay for them at start-up.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._cprofile = None
+        self._started_at = None
+        self._origin = None
+        self._wall = None
+
+    def start(self) -> None:
+        import cProfile
+
+        self._cprofile = cProfile.Profile()
+        self._started_at = datetime.now(timezone.utc)
+        self._origin = time.perf_counter()
+        self._cprofile.enable()
+
+    def stop(self) -> None:
+        self._cprofile.disable()
+        self._wall = time.perf_counter() - self._origin
+
+    @contextmanager
+    def stage(self, name: str, **attrs: Any) -> Iterator[None]:
+        """
+        Record the enclosed block as a span of stage `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            span = {'stage': name, 'start': round(start - self._origin, 6), 'duration': round(end - start, 6),
+                    'thread': threading.current_thread().name}
+            if attrs:
+                span['attrs'] = attrs
+            with self._lock:
+                self.spans.append(span)
+
+    def stages(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarise spans per stage. Totals are inclusive, so nested stages are counted in both.
+        """
+        summary = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            entry = summary.setdefault(span['stage'], {'count': 0, 'total': 0.0, 'max': 0.0})
+            entry['count'] += 1
+            entry['total'] += span['duration']
+            entry['max'] = max(entry['max'], span['duration'])
+        for entry in summary.values():
+            entry['total'] = round(entry['total'], 6)
+            entry['mean'] = round(entry['total'] / entry['count'], 6)
+        return dict(sorted(summary.items(), key=lambda item: -item[1]['total']))
+
+    def functions(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Return the `limit` functions with the highest cumulative time.
+        """
+        import pstats
+
+        stats = pstats.Stats(self._cprofile).stats
+        rows = []
+        for (filename, line, function), (primitive, calls, tottime, cumtime, _) in stats.items():
+            rows.append({'function': function, 'location': f'{filename}:{line}', 'calls': calls,
+                         'primitive_calls': primitive, 'tottime': round(tottime, 6), 'cumtime': round(cumtime, 6)})
+        rows.sort(key=lambda row: -row['cumtime'])
+        return rows[:limit]
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'script': self.name,
+            'started_at': self._started_at.isoformat() if self._started_at else None,
+            'wall_seconds': round(self._wall, 6) if self._wall is not None else None,
+            'stages': self.stages(),
+            'spans': sorted(self.spans, key=lambda span: span['start']),
+            'functions': self.functions(),
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json_codec.dump(self.report(), f, indent=True)
+
+
+def stage(name: str, **attrs: Any):
+    """
+    Context manager marking a pipeline stage (e.g. 'auth', 'fetch', 'transform', 'write', 'notify').
+
+    Costs next to nothing unless a --profile run is active.
+    """
+    profiler = _active
+    return profiler.stage(name, **attrs) if profiler else _DISABLED
+
+
+@contextmanager
+def profiling(name: str, path: Optional[str]) -> Iterator[Optional[Profiler]]:
+    """
+    Profile the enclosed block and write the artifact to `path`. Does nothing if `path` is None.
+
+    Args:
+    name (str): Script name recorded in the artifact.
+    path (str): Where to write the JSON artifact, or None to disable profiling.
+
+    Yields:
+    Profiler: The active profiler, or None when disabled.
+    """
+    global _active
+
+    if not path:
+        yield None
+        return
+
+    profiler = Profiler(name)
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = None
+        profiler.write(path)
+
+        print(f"Profile written to {path}")
+        for stage_name, entry in profiler.stages().items():
+            print(f"  {stage_name:<12}{entry['count']:>6} x  {entry['total']:>10.3f}s total  {entry['max']:>8.3f}s max")
+
+
+def add_profile_argument(parser, script: str) -> None:
+    """
+    Add the shared --profile option to a script's argument parser.
+    """
+    parser.add_argument('--profile', nargs='?', const=f'{script}-profile.json', metavar='PATH',
+                        help=f'Write a cProfile, per-stage timing and span timeline artifact '
+                             f'(default {script}-profile.json).')
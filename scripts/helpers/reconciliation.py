@@ -0,0 +1,163 @@
+from typing import Any, Dict, Iterable, List, Optional
+from helpers.records import InventoryRecord
+
+
+# InventoryRecord fields needed to reconcile Jamf Pro against Airtable and Slack.
+RECONCILIATION_FIELDS = ['jamf_id', 'serial', 'name', 'user_email']
+
+
+def _normalize_serial(serial: Any) -> str:
+    return str(serial).strip().upper() if serial else ''
+
+
+def _normalize_email(email: Any) -> str:
+    return str(email).strip().lower() if email else ''
+
+
+class ReconciliationReport:
+    """
+    Mismatches found by reconcile(), grouped by kind.
+
+    Attributes:
+    missing_from_airtable (list): Jamf Pro computers with no Airtable row for their serial.
+    orphaned_airtable_rows (list): Airtable rows whose serial doesn't exist in Jamf Pro.
+    duplicate_airtable_serials (list): Serials that appear on more than one Airtable row.
+    email_mismatches (list): Assets whose Airtable user email differs from the Jamf Pro assignment.
+    users_without_slack (list): Assigned users with no active Slack account.
+    """
+
+    KINDS = ('missing_from_airtable', 'orphaned_airtable_rows', 'duplicate_airtable_serials',
+             'email_mismatches', 'users_without_slack')
+
+    def __init__(self):
+        for kind in self.KINDS:
+            setattr(self, kind, [])
+        self.matched = 0
+
+    def summary(self) -> Dict[str, int]:
+        summary = {kind: len(getattr(self, kind)) for kind in self.KINDS}
+        summary['matched'] = self.matched
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {kind: getattr(self, kind) for kind in self.KINDS}
+        data['summary'] = self.summary()
+        return data
+
+
+def index_slack_users(members: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Build a lowercased-email -> Slack user ID index, skipping deactivated users and bots.
+    """
+    index = {}
+    for member in members:
+        if member.get('deleted') or member.get('is_bot'):
+            continue
+        email = _normalize_email(member.get('profile', {}).get('email'))
+        if email:
+            index[email] = member['id']
+    return index
+
+
+def reconcile(inventory: Iterable[InventoryRecord], airtable_records: Iterable[Dict[str, Any]],
+              slack_users: Iterable[Dict[str, Any]], serial_field: str = 'asset_serial',
+              email_field: str = 'user_email') -> ReconciliationReport:
+    """
+    Join Jamf Pro inventory, Airtable rows and Slack users in memory and report mismatches.
+
+    Each source is indexed once (serial for Jamf Pro and Airtable, lowercased email for Slack),
+    so the join is linear in the size of the inputs.
+
+    Args:
+    inventory (iterable): InventoryRecord objects projected with at least RECONCILIATION_FIELDS.
+    airtable_records (iterable): Airtable record objects, as returned by AirtableAPI.list_all_records.
+    slack_users (iterable): Slack user objects, as returned by SlackClient.list_users.
+    serial_field (str, optional): Airtable field holding the asset serial.
+    email_field (str, optional): Airtable field holding the assigned user's email.
+
+    Returns:
+    ReconciliationReport: The mismatches found.
+    """
+    report = ReconciliationReport()
+    slack_index = index_slack_users(slack_users)
+
+    airtable_index = {}
+    for row in airtable_records:
+        serial = _normalize_serial(row.get('fields', {}).get(serial_field))
+        if not serial:
+            continue
+        if serial in airtable_index:
+            report.duplicate_airtable_serials.append({'serial': serial, 'airtable_record_id': row.get('id')})
+            continue
+        airtable_index[serial] = row
+
+    jamf_serials = set()
+    missing_slack = set()
+
+    for computer in inventory:
+        serial = _normalize_serial(computer.serial)
+        if not serial:
+            continue
+        jamf_serials.add(serial)
+        email = _normalize_email(computer.user_email)
+
+        row = airtable_index.get(serial)
+        if row is None:
+            report.missing_from_airtable.append({'serial': serial, 'jamf_id': computer.jamf_id,
+                                                 'name': computer.name, 'user_email': email})
+        else:
+            report.matched += 1
+            airtable_email = _normalize_email(row.get('fields', {}).get(email_field))
+            if airtable_email != email:
+                report.email_mismatches.append({'serial': serial, 'jamf_id': computer.jamf_id,
+                                                'airtable_record_id': row.get('id'),
+                                                'jamf_email': email, 'airtable_email': airtable_email})
+
+        if email and email not in slack_index and email not in missing_slack:
+            missing_slack.add(email)
+            report.users_without_slack.append({'user_email': email, 'serial': serial})
+
+    for serial, row in airtable_index.items():
+        if serial not in jamf_serials:
+            report.orphaned_airtable_rows.append({'serial': serial, 'airtable_record_id': row.get('id')})
+
+    return report
+
+
+def load_and_reconcile(jamf, airtable, slack, table_name: str, view: Optional[str] = None,
+                       serial_field: str = 'asset_serial', email_field: str = 'user_email') -> ReconciliationReport:
+    """
+    Bulk-load Jamf Pro inventory, an Airtable table and the Slack user directory, then reconcile them.
+
+    Args:
+    jamf (JamfClient): An authenticated Jamf Pro client.
+    airtable (AirtableAPI): Airtable client.
+    slack (SlackClient): Slack client.
+    table_name (str): The Airtable table tracking assets.
+    view (str, optional): Airtable view to read.
+    serial_field (str, optional): Airtable field holding the asset serial.
+    email_field (str, optional): Airtable field holding the assigned user's email.
+
+    Returns:
+    ReconciliationReport: The mismatches found.
+    """
+    inventory = jamf.get_computer_inventory(fields=RECONCILIATION_FIELDS)
+    if inventory and isinstance(inventory[0], dict) and 'Error' in inventory[0]:
+        raise RuntimeError(inventory[0]['Error'])
+
+    airtable_response = airtable.list_all_records(table_name, view=view, fields=[serial_field, email_field])
+    if not airtable_response['success']:
+        raise RuntimeError(airtable_response['message'])
+
+    slack_users = slack.list_users()
+    if slack_users is None:
+        raise RuntimeError('Failed to list Slack users.')
+
+    return reconcile(inventory, airtable_response['data'], slack_users, serial_field, email_field)
+
+
+def report_rows(report: ReconciliationReport) -> List[Dict[str, Any]]:
+    """
+    Flatten a report into one row per mismatch, tagged with its kind.
+    """
+    return [dict(row, kind=kind) for kind in ReconciliationReport.KINDS for row in getattr(report, kind)]
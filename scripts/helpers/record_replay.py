@@ -0,0 +1,283 @@
+import base64
+import io
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from requests import Response, Session
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from helpers import json_codec
+
+
+REDACTED = '[REDACTED]'
+
+# Headers and body/query keys whose values never reach a cassette.
+SECRET_HEADERS = frozenset({'authorization', 'cookie', 'set-cookie', 'x-api-key', 'proxy-authorization'})
+SECRET_KEYS = frozenset({'token', 'access_token', 'refresh_token', 'id_token', 'client_secret', 'client_id',
+                         'password', 'api_key', 'apikey', 'secret', 'passcode'})
+
+# Response headers that describe the wire encoding; the recorded body is already decoded.
+_WIRE_HEADERS = frozenset({'content-encoding', 'transfer-encoding', 'content-length'})
+
+_SECRET_KEY = '|'.join(sorted(SECRET_KEYS))
+_JSON_SECRET = re.compile(rf'("(?:{_SECRET_KEY})"\s*:\s*)"[^"]*"', re.IGNORECASE)
+
+
+class CassetteMiss(ConnectionError):
+    """
+    Raised when a replayed request has no matching exchange left in the cassette.
+    """
+
+
+def redact_url(url: str) -> str:
+    """
+    Replace secret query values and path segments that follow a secret key name, e.g. the
+    passcode in /computercommands/command/EraseDevice/passcode/<passcode>/id/42.
+    """
+    parts = urlsplit(url)
+
+    segments = parts.path.split('/')
+    for i in range(1, len(segments)):
+        if segments[i] and segments[i - 1].lower() in SECRET_KEYS:
+            segments[i] = REDACTED
+    parts = parts._replace(path='/'.join(segments))
+
+    if parts.query:
+        query = [(k, REDACTED if k.lower() in SECRET_KEYS else v)
+                 for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+        parts = parts._replace(query=urlencode(query))
+    return urlunsplit(parts)
+
+
+def redact_headers(headers) -> Dict[str, str]:
+    return {k: REDACTED if k.lower() in SECRET_HEADERS else v for k, v in (headers or {}).items()}
+
+
+def redact_body(body: Any) -> Optional[str]:
+    """
+    Return a request or response body as text with secret JSON or form fields replaced.
+    """
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        try:
+            body = body.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+    if not isinstance(body, str):
+        return None
+
+    stripped = body.lstrip()
+    if stripped.startswith(('{', '[')):
+        return _JSON_SECRET.sub(rf'\1"{REDACTED}"', body)
+    if '=' in body and not stripped.startswith('<'):
+        pairs = parse_qsl(body, keep_blank_values=True)
+        if pairs:
+            return urlencode([(k, REDACTED if k.lower() in SECRET_KEYS else v) for k, v in pairs])
+    return body
+
+
+def exchange_key(method: str, url: str) -> Tuple[str, str]:
+    return method.upper(), redact_url(url)
+
+
+class Cassette:
+    """
+    A compact NDJSON file of HTTP exchanges, one redacted request/response pair per line.
+
+    One cassette can be shared by the sessions of several clients; appends are serialised.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._started = None
+
+    def append(self, exchange: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._started is None:
+                self._started = exchange['started']
+            exchange['offset'] = round(exchange.pop('started') - self._started, 6)
+            with open(self.path, 'a') as file:
+                file.write(json_codec.dumps(exchange) + '\n')
+
+    def load(self) -> Dict[Tuple[str, str], Deque[Dict[str, Any]]]:
+        """
+        Read the exchanges, queued per (method, url) in recorded order.
+        """
+        exchanges = defaultdict(deque)
+        with open(self.path) as file:
+            for exchange in json_codec.iter_ndjson(file):
+                exchanges[(exchange['method'], exchange['url'])].append(exchange)
+        return exchanges
+
+
+class RecordingAdapter(BaseAdapter):
+    """
+    Transport adapter that sends through `base` and appends every exchange to a cassette.
+    """
+
+    def __init__(self, cassette: Cassette, base: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.base = base
+
+    def send(self, request, **kwargs):
+        started = time.time()
+        response = self.base.send(request, **kwargs)
+        elapsed = time.time() - started
+
+        content = response.content
+        exchange = {
+            'method': request.method.upper(),
+            'url': redact_url(request.url),
+            'request_headers': redact_headers(request.headers),
+            'request_body': redact_body(request.body),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in redact_headers(response.headers).items() if k.lower() not in _WIRE_HEADERS},
+            'elapsed': round(elapsed, 6),
+            'started': started,
+        }
+        body = redact_body(content)
+        if body is None and content:
+            exchange['body_b64'] = base64.b64encode(content).decode('ascii')
+        else:
+            exchange['body'] = body
+        self.cassette.append(exchange)
+        return response
+
+    def close(self):
+        self.base.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter that answers requests from a cassette without touching the network.
+
+    Exchanges are matched on method and redacted URL, in recorded order. With timing='recorded'
+    each response is delayed by its recorded latency; with timing='fast' it is returned at once.
+    """
+
+    def __init__(self, cassette: Cassette, timing: str = 'fast'):
+        super().__init__()
+        if timing not in ('fast', 'recorded'):
+            raise ValueError("timing must be 'fast' or 'recorded'")
+        self.timing = timing
+        self._exchanges = cassette.load()
+        self._lock = threading.Lock()
+
+    def remaining(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._exchanges.values())
+
+    def send(self, request, **kwargs):
+        key = exchange_key(request.method, request.url)
+        with self._lock:
+            queue = self._exchanges.get(key)
+            if not queue:
+                raise CassetteMiss(f'No recorded exchange for {key[0]} {key[1]}', request=request)
+            exchange = queue.popleft()
+
+        if self.timing == 'recorded':
+            time.sleep(exchange['elapsed'])
+
+        response = Response()
+        response.status_code = exchange['status']
+        response.reason = exchange.get('reason')
+        response.headers = CaseInsensitiveDict(exchange['headers'])
+        if 'body_b64' in exchange:
+            body = base64.b64decode(exchange['body_b64'])
+        else:
+            body = (exchange.get('body') or '').encode('utf-8')
+        # Serve stream=True callers too: iter_content() slices the body and close() has a raw to close.
+        response._content = body
+        response._content_consumed = True
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def _install(session: Session, wrap) -> None:
+    """
+    Replace the innermost transport of a session's https:// adapter chain with `wrap(innermost)`.
+
+    Wrapper adapters (AdaptiveAdapter, ResilientAdapter) stay in place, so recordings capture
+    every wire exchange and replays still exercise limiting and scheduling.
+    """
+    outer = session.get_adapter('https://')
+    if not hasattr(outer, 'base'):
+        adapter = wrap(outer)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return
+
+    parent = outer
+    while hasattr(parent.base, 'base'):
+        parent = parent.base
+    parent.base = wrap(parent.base)
+
+
+def record(cassette: Cassette, *sessions: Session) -> None:
+    """
+    Record every exchange made by the given sessions, e.g. jamf.session, slack.session,
+    airtable.session and fedex.client.
+    """
+    for session in sessions:
+        _install(session, lambda base: RecordingAdapter(cassette, base))
+
+
+def replay(cassette: Cassette, *sessions: Session, timing: str = 'fast') -> ReplayAdapter:
+    """
+    Serve the given sessions from a cassette. All sessions share one replay queue.
+
+    Returns:
+    ReplayAdapter: The adapter, e.g. to check `remaining()` after a run.
+    """
+    adapter = ReplayAdapter(cassette, timing)
+    for session in sessions:
+        _install(session, lambda base: adapter)
+    return adapter
+
+
+_ENV_CASSETTES: Dict[str, Any] = {}
+_ENV_LOCK = threading.Lock()
+
+
+def install_from_env(session: Session) -> None:
+    """
+    Record or replay a session's traffic when HTTP_CASSETTE is set.
+
+    HTTP_CASSETTE_MODE selects 'record', 'replay' (as fast as possible, the default) or
+    'replay-timed' (at recorded latency). Clients call this on construction, so whole scripts
+    can be recorded and replayed without code changes.
+    """
+    path = os.getenv('HTTP_CASSETTE')
+    if not path:
+        return
+
+    mode = os.getenv('HTTP_CASSETTE_MODE', 'replay')
+    with _ENV_LOCK:
+        if path not in _ENV_CASSETTES:
+            cassette = Cassette(path)
+            if mode == 'record':
+                _ENV_CASSETTES[path] = cassette
+            else:
+                _ENV_CASSETTES[path] = ReplayAdapter(cassette, 'recorded' if mode == 'replay-timed' else 'fast')
+        target = _ENV_CASSETTES[path]
+
+    if isinstance(target, Cassette):
+        record(target, session)
+    else:
+        _install(session, lambda base: target)
@@ -0,0 +1,143 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Record attribute -> path into a Jamf Pro computers-inventory record.
+INVENTORY_FIELDS = {
+    'jamf_id': ('id',),
+    'udid': ('udid',),
+    'name': ('general', 'name'),
+    'last_contact_time': ('general', 'lastContactTime'),
+    'report_date': ('general', 'reportDate'),
+    'serial': ('hardware', 'serialNumber'),
+    'model': ('hardware', 'model'),
+    'user_name': ('userAndLocation', 'username'),
+    'user_email': ('userAndLocation', 'email'),
+    'department': ('userAndLocation', 'departmentId'),
+}
+
+# Inventory response key -> `section` query parameter value.
+INVENTORY_SECTIONS = {
+    'general': 'GENERAL',
+    'hardware': 'HARDWARE',
+    'userAndLocation': 'USER_AND_LOCATION',
+}
+
+# The fields identification.py actually keeps.
+IDENTIFICATION_FIELDS = ['jamf_id', 'serial', 'name', 'model', 'user_name', 'user_email']
+
+
+def sections_for(fields: Iterable[str]) -> List[str]:
+    """
+    Return the inventory sections required to populate the given record fields.
+
+    Args:
+    fields (iterable): InventoryRecord attribute names.
+
+    Returns:
+    list: `section` query parameter values, e.g. ['GENERAL', 'HARDWARE'].
+    """
+    sections = []
+    for field in fields:
+        path = INVENTORY_FIELDS[field]
+        section = INVENTORY_SECTIONS.get(path[0]) if len(path) > 1 else None
+        if section and section not in sections:
+            sections.append(section)
+    return sections
+
+
+class InventoryRecord:
+    """
+    Compact, slotted view of a single computers-inventory record.
+
+    Only the projected fields are extracted; the rest of the nested response is
+    discarded during parsing so large fleet snapshots stay small in memory.
+    """
+
+    __slots__ = tuple(INVENTORY_FIELDS) + ('tenant',)
+
+    def __init__(self, **values: Any):
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    @classmethod
+    def from_inventory(cls, item: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> 'InventoryRecord':
+        """
+        Build a record from a raw inventory dict, keeping only the projected fields.
+
+        Args:
+        item (dict): A single computers-inventory record as returned by Jamf Pro.
+        fields (iterable, optional): Attribute names to keep. Defaults to all known fields.
+
+        Returns:
+        InventoryRecord: The projected record.
+        """
+        record = cls.__new__(cls)
+        record.tenant = None
+        wanted = INVENTORY_FIELDS if fields is None else fields
+
+        for field in INVENTORY_FIELDS:
+            value = None
+            if field in wanted:
+                value = item
+                for key in INVENTORY_FIELDS[field]:
+                    value = value.get(key) if value else None
+            setattr(record, field, value)
+
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f'InventoryRecord(jamf_id={self.jamf_id!r}, serial={self.serial!r}, name={self.name!r})'
+
+
+class IdentificationRecord:
+    """
+    A single row of identification output, as written to identification.json and Airtable.
+    """
+
+    __slots__ = ('jamf_id', 'asset_serial', 'asset_name', 'asset_model', 'user_name', 'user_email',
+                 'airtable_record_id')
+
+    def __init__(self, jamf_id: Any, asset_serial: str = None, asset_name: str = None, asset_model: str = None,
+                 user_name: str = None, user_email: str = None, airtable_record_id: str = None):
+        self.jamf_id = jamf_id
+        self.asset_serial = asset_serial
+        self.asset_name = asset_name
+        self.asset_model = asset_model
+        self.user_name = user_name
+        self.user_email = user_email
+        self.airtable_record_id = airtable_record_id
+
+    @classmethod
+    def from_inventory_record(cls, record: InventoryRecord) -> 'IdentificationRecord':
+        """
+        Shape an InventoryRecord into an identification row.
+
+        Args:
+        record (InventoryRecord): A record projected with at least IDENTIFICATION_FIELDS.
+
+        Returns:
+        IdentificationRecord: The identification row.
+        """
+        return cls(record.jamf_id, record.serial, record.name, record.model, record.user_name, record.user_email)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the row as a dict, omitting the Airtable record ID until one has been assigned.
+        """
+        data = {
+            'jamf_id': self.jamf_id,
+            'asset_serial': self.asset_serial,
+            'asset_name': self.asset_name,
+            'asset_model': self.asset_model,
+            'user_name': self.user_name,
+            'user_email': self.user_email
+        }
+        if self.airtable_record_id:
+            data['airtable_record_id'] = self.airtable_record_id
+        return data
+
+    def __repr__(self) -> str:
+        return f'IdentificationRecord(jamf_id={self.jamf_id!r}, asset_serial={self.asset_serial!r})'
@@ -0,0 +1,193 @@
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError
+
+
+# Path segments that precede a resource identifier in Jamf Pro URLs, e.g. /computers/id/42.
+IDENTIFIER_KEYS = frozenset({'id', 'name', 'serialnumber', 'udid', 'status', 'passcode', 'macaddress'})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+_IDENTIFIER = re.compile(r'^(\d+|[0-9a-fA-F-]{16,})$')
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    Raised instead of sending a request to an endpoint whose circuit breaker is open.
+    """
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """
+    Collapse a request URL to its endpoint template, e.g. 'GET /JSSResource/computers/id/*'.
+    """
+    segments = urlparse(url).path.split('/')
+    for i, segment in enumerate(segments):
+        if _IDENTIFIER.match(segment) or (i and segments[i - 1].lower() in IDENTIFIER_KEYS):
+            segments[i] = '*'
+    return f"{method} {'/'.join(segments)}"
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for a single endpoint.
+
+    After `failure_threshold` consecutive failures the breaker opens and rejects calls for
+    `reset_timeout` seconds. It then lets a single trial call through (half-open); success
+    closes the breaker, failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures}
+
+
+class ResilientAdapter(BaseAdapter):
+    """
+    Transport adapter adding per-endpoint circuit breakers and optional hedged requests.
+
+    A response counts as a failure when the request raises or returns a 5xx status, and, if
+    `slow_call_threshold` is set, when it takes longer than that many seconds. Slow-call counting
+    is off by default, since large inventory pages are slow without being unhealthy; `timeout`
+    instead bounds requests sent without one, so a hung call raises and counts as a failure.
+    With `hedge_after` set, an idempotent request that hasn't completed after that many seconds
+    is sent a second time, and whichever copy finishes first wins.
+    """
+
+    def __init__(self, base: BaseAdapter = None, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 slow_call_threshold: Optional[float] = None, hedge_after: Optional[float] = None,
+                 hedge_workers: int = 32, timeout: Any = None):
+        super().__init__()
+        self.base = base or HTTPAdapter()
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_threshold = slow_call_threshold
+        self.hedge_after = hedge_after
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=hedge_workers) if hedge_after else None
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the state of every endpoint's breaker, keyed by endpoint template.
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.snapshot() for key, breaker in breakers.items()}
+
+    def send(self, request, **kwargs):
+        key = endpoint_key(request.method, request.url)
+        breaker = self.breaker(key)
+
+        if not breaker.allow():
+            raise CircuitOpenError(f'Circuit open for {key}; failing fast.', request=request)
+
+        if kwargs.get('timeout') is None and self.timeout is not None:
+            kwargs['timeout'] = self.timeout
+
+        start = time.monotonic()
+        try:
+            if self._executor and request.method in IDEMPOTENT_METHODS:
+                response = self._hedged_send(request, **kwargs)
+            else:
+                response = self.base.send(request, **kwargs)
+        except Exception:
+            # Any error, not only RequestException, must release a half-open breaker's trial.
+            breaker.record_failure()
+            raise
+
+        slow = self.slow_call_threshold is not None and time.monotonic() - start > self.slow_call_threshold
+        if response.status_code >= 500 or slow:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        return response
+
+    def _hedged_send(self, request, **kwargs):
+        primary = self._executor.submit(self.base.send, request, **kwargs)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedged += 1
+        hedge = self._executor.submit(self.base.send, request.copy(), **kwargs)
+        pending = {primary, hedge}
+        error = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in (pending | done) - {future}:
+                    loser.add_done_callback(_close_response)
+                if future is hedge:
+                    self.hedge_wins += 1
+                return future.result()
+
+        raise error
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        self.base.close()
+
+
+def _close_response(future) -> None:
+    if future.exception() is None:
+        future.result().close()
@@ -0,0 +1,41 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, List, Sequence
+
+
+def page_shards(total: int, page_size: int) -> List[int]:
+    """
+    Return the page numbers needed to cover `total` records at `page_size` records per page.
+    """
+    return list(range(max(1, -(-total // page_size))))
+
+
+def chunk_shards(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    """
+    Split a sequence (e.g. computer IDs sorted into ranges) into consecutive chunks of at most `size`.
+    """
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_sharded(task: Callable[[Any], Iterable[Any]], shards: Iterable[Any], workers: int,
+                initializer: Callable = None, initargs: tuple = ()) -> Iterator[Any]:
+    """
+    Run `task` over each shard in a process pool and stream the rows back as shards complete.
+
+    `task` and `initializer` must be importable top-level functions. `initializer` runs once per
+    worker process, which is where per-process state such as an authenticated client belongs.
+    Rows are yielded in completion order, not shard order.
+
+    Args:
+    task (callable): Called with one shard; returns an iterable of picklable rows.
+    shards (iterable): Shard descriptors, e.g. page numbers or chunks of IDs.
+    workers (int): Number of worker processes.
+    initializer (callable, optional): Per-process setup function.
+    initargs (tuple, optional): Arguments for `initializer`.
+
+    Yields:
+    Any: Rows produced by the workers.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        futures = [pool.submit(task, shard) for shard in shards]
+        for future in as_completed(futures):
+            yield from future.result()
@@ -0,0 +1,80 @@
+import functools
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls so that only one of them does the work.
+
+    The first caller for a key runs the function; callers arriving with the same key while it is
+    in flight block and receive the same result (or exception). Nothing is cached once the call
+    completes. Callers share the returned object, so they must not mutate it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)`, or wait for an in-flight call with the same key.
+
+        Args:
+        key (hashable): Identifies identical calls.
+        fn (callable): The function to run.
+
+        Returns:
+        Any: The result of the single underlying call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+def single_flight(method: Callable) -> Callable:
+    """
+    Method decorator that coalesces concurrent calls with identical arguments on the same instance.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        flight = self.__dict__.get('_single_flight')
+        if flight is None:
+            flight = self.__dict__.setdefault('_single_flight', SingleFlight())
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        return flight.do(key, method, self, *args, **kwargs)
+
+    return wrapper
@@ -1,19 +1,31 @@
 import requests
-from typing import List
+from typing import List, Union
+from helpers.concurrency import AdaptiveAdapter
+from helpers.http2 import HTTP2Adapter
+from helpers.json_codec import response_json
+from helpers.record_replay import install_from_env
+from helpers.single_flight import single_flight
+from helpers.slack_templates import message_payload
 
 
 class SlackClient:
 
     def __init__(self, token: str,
-                 verify_cert: bool = True):
+                 verify_cert: bool = True,
+                 http2: bool = False):
 
         self.base_url = "https://slack.com/api"
         self.session = requests.session()
         self.session.headers = {"Authorization": f"Bearer {token}",
                                 "Content-Type": "application/json"}
         self.session.verify = verify_cert
+        # With http2, requests are multiplexed over a few connections (HTTP/1.1 if h2 isn't offered)
+        self.http2 = HTTP2Adapter() if http2 else None
+        self.session.mount('https://', AdaptiveAdapter(base=self.http2))
+        install_from_env(self.session)
 
-    def send_message(self, channel_id: str, attachments: List = None, text: str = None, blocks: List = None) -> bool:
+    def send_message(self, channel_id: str, attachments: List = None, text: str = None,
+                     blocks: Union[List, str] = None) -> bool:
         """
         Post a message to a Slack channel or user.
 
@@ -21,14 +33,19 @@ class SlackClient:
             channel_id (str): The ID of the Slack channel or user to send the message to.
             attachments (list, optional): Optional attachments for the message.
             text (str, optional): Optional plain text for the message.
-            blocks (list, optional): Optional Slack block elements for rich messaging.
+            blocks (list or str, optional): Optional Slack block elements for rich messaging, either as a list
+                or pre-serialized JSON from a BlockTemplate.
 
         Returns:
             bool: True if the message was successfully sent, False otherwise.
         """
         payload = {"channel": channel_id}
 
-        if blocks:
+        if isinstance(blocks, str):
+            body = message_payload(channel_id, blocks).encode('utf-8')
+            response = self.session.post(f"{self.base_url}/chat.postMessage", data=body)
+            return self._check_response(response)
+        elif blocks:
             payload["blocks"] = blocks
         elif text:
             payload["text"] = text
@@ -40,36 +57,44 @@ class SlackClient:
 
         response = self.session.post(f"{self.base_url}/chat.postMessage", json=payload)
 
-        if response.status_code == 200 and response.json()['ok']:
+        return self._check_response(response)
+
+    def _check_response(self, response) -> bool:
+        """
+        Check a Slack Web API response for success, printing the error payload if it failed.
+        """
+        data = response_json(response) or {}
+
+        if response.status_code == 200 and data.get('ok'):
             return True
         else:
-            print("Slack Error: ", response.status_code, response.json())
+            print("Slack Error: ", response.status_code, data)
             return False
 
-    def update_message(self, response_url: str, blocks: list) -> bool:
+    def update_message(self, response_url: str, blocks: Union[List, str]) -> bool:
         """
         Update an existing message in Slack with new blocks.
 
         Args:
             response_url (str): The URL to update the message.
-            blocks (list): The updated message blocks.
+            blocks (list or str): The updated message blocks, either as a list or pre-serialized JSON
+                from a BlockTemplate.
 
         Returns:
             bool: True if the message was successfully updated, False otherwise.
         """
-        payload = {"blocks": blocks}
-
-        response = self.session.post(response_url, json=payload)
-
-        if response.status_code == 200 and response.json()['ok']:
-            return True
+        if isinstance(blocks, str):
+            response = self.session.post(response_url, data=f'{{"blocks":{blocks}}}'.encode('utf-8'))
         else:
-            print("Slack Error:", response.status_code, response.json())
-            return False
+            response = self.session.post(response_url, json={"blocks": blocks})
+
+        return self._check_response(response)
 
+    @single_flight
     def find_user_by_email(self, email: str) -> str:
         """
-        Find a Slack user ID associated with an email address.
+        Find a Slack user ID associated with an email address. Concurrent lookups of the same email share
+        one request.
 
         Args:
             email (str): The email address of the user to find.
@@ -81,9 +106,41 @@ class SlackClient:
         params = {"email": email}
         response = self.session.get(url, params=params)
 
-        if response.status_code == 200 and response.json()['ok']:
-            user_id = response.json()['user']['id']
+        data = response_json(response) or {}
+
+        if response.status_code == 200 and data.get('ok'):
+            user_id = data['user']['id']
             return user_id
         else:
-            print(f"Failed to find user by email {email}: {response.status_code}, {response.json()}")
+            print(f"Failed to find user by email {email}: {response.status_code}, {data}")
             return None
+
+    def list_users(self, page_size: int = 200) -> List:
+        """
+        Retrieve every member of the workspace, following users.list cursor pagination.
+
+        Args:
+            page_size (int, optional): Members per request. Slack recommends no more than 200.
+
+        Returns:
+            list: Slack user objects, or None if any page failed.
+        """
+        url = f"{self.base_url}/users.list"
+        params = {"limit": page_size}
+        members = []
+
+        while True:
+            response = self.session.get(url, params=params)
+            data = response_json(response) or {}
+
+            if response.status_code != 200 or not data.get('ok'):
+                print(f"Failed to list Slack users: {response.status_code}, {data}")
+                return None
+
+            members += data.get('members', [])
+
+            cursor = data.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                return members
+
+            params["cursor"] = cursor
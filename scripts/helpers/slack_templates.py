@@ -0,0 +1,85 @@
+import os
+import re
+from functools import lru_cache
+from json.encoder import encode_basestring
+from typing import Any, Dict, Iterable, Iterator, List
+from helpers import json_codec
+
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+PLACEHOLDER = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+
+def _escape(value: Any) -> str:
+    """
+    Escape a value for splicing into the inside of a JSON string literal.
+    """
+    return encode_basestring('' if value is None else str(value))[1:-1]
+
+
+class BlockTemplate:
+    """
+    A Slack Block Kit message compiled once into static JSON segments and named placeholders.
+
+    Placeholders are written as `{name}` inside any string of the block structure. Rendering
+    splices JSON-escaped values between the pre-serialized segments, so no dicts are rebuilt
+    and nothing is re-serialized per recipient.
+    """
+
+    def __init__(self, blocks: List[Dict[str, Any]]):
+        serialized = json_codec.dumps(blocks)
+        self.segments = PLACEHOLDER.split(serialized)
+        self.fields = frozenset(self.segments[1::2])
+
+    @classmethod
+    def from_file(cls, file_path: str) -> 'BlockTemplate':
+        """
+        Compile a template from a JSON file containing a list of blocks.
+        """
+        with open(file_path, 'rb') as file:
+            return cls(json_codec.load(file))
+
+    def render(self, **values: Any) -> str:
+        """
+        Render the template to a JSON-encoded list of blocks.
+
+        Args:
+        values: Placeholder values, e.g. asset='C02XXXXXXX'. Missing values render as empty strings.
+
+        Returns:
+        str: The serialized blocks, suitable for SlackClient.send_message(blocks=...).
+        """
+        parts = self.segments[:]
+        for i in range(1, len(parts), 2):
+            parts[i] = _escape(values.get(parts[i]))
+        return ''.join(parts)
+
+    def render_many(self, rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Lazily render the template once per row of placeholder values.
+        """
+        render = self.render
+        for row in rows:
+            yield render(**row)
+
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> BlockTemplate:
+    """
+    Load and compile a named template from the templates/ directory, once per process.
+
+    Args:
+    name (str): Template name without extension, e.g. 'asset_recovery_prompt'.
+
+    Returns:
+    BlockTemplate: The compiled template.
+    """
+    return BlockTemplate.from_file(os.path.join(TEMPLATE_DIR, f'{name}.json'))
+
+
+def message_payload(channel_id: str, rendered_blocks: str) -> str:
+    """
+    Splice pre-rendered blocks into a chat.postMessage request body.
+    """
+    return f'{{"channel":{encode_basestring(channel_id)},"blocks":{rendered_blocks}}}'
@@ -0,0 +1,156 @@
+import hmac
+import ipaddress
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from helpers import json_codec
+from helpers.decommission_queue import ACKNOWLEDGED, DecommissionQueue
+
+
+# Events that mean a computer has been talking to Jamf Pro, so its pending commands may have run.
+CHECK_IN_EVENTS = ('ComputerCheckIn', 'ComputerInventoryCompleted', 'ComputerPushCapabilityChanged')
+
+# Jamf Pro has no webhook for completed computer commands, so command outcomes come from a custom
+# relay (e.g. a script forwarding MDM command history) posting this event name with a body of
+# {"commandUuid": "...", "status": "Acknowledged" | "Pending" | "NotNow" | "Error"}.
+RELAY_COMMAND_EVENT = 'DecommissionCommandCompleted'
+
+
+def parse_event(payload: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """
+    Split a Jamf Pro webhook payload into its event name and event body.
+
+    Returns:
+    tuple: (event name or None, event body).
+    """
+    webhook = payload.get('webhook') or {}
+    name = webhook.get('webhookEvent') or payload.get('webhookEvent') or payload.get('event_type')
+    return name, payload.get('event') or {}
+
+
+def is_loopback(host: str) -> bool:
+    """
+    Whether `host` only accepts connections from the local machine.
+    """
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def handle_event(queue: DecommissionQueue, name: str, event: Dict[str, Any]) -> Optional[int]:
+    """
+    Apply a webhook event to the decommission queue.
+
+    A relayed command event whose UUID matches an outstanding erase acknowledges that job if its
+    status is Acknowledged, and otherwise makes its status check due. Relayed events without a
+    status are ignored. A check-in from a computer with an outstanding erase makes its status
+    check due immediately.
+
+    Returns:
+    int: The ID of the job the event matched, or None.
+    """
+    if name == RELAY_COMMAND_EVENT:
+        command_uuid = event.get('commandUuid')
+        status = event.get('status')
+        job = queue.find_by_command(command_uuid) if command_uuid and status else None
+        if not job:
+            return None
+        if str(status).lower() == 'acknowledged':
+            queue.update(job['id'], state=ACKNOWLEDGED, next_run_at=time.time())
+        else:
+            queue.update(job['id'], next_run_at=time.time())
+        return job['id']
+
+    computer = event.get('computer') or event
+    computer_id = computer.get('jssID') or computer.get('jssId') or computer.get('id')
+    if name in CHECK_IN_EVENTS and computer_id is not None:
+        job = queue.find_by_computer(computer_id)
+        if job:
+            queue.update(job['id'], next_run_at=time.time())
+            return job['id']
+
+    return None
+
+
+class WebhookReceiver:
+    """
+    Local HTTP receiver for Jamf Pro webhooks that drives the decommission queue.
+
+    Accepts Jamf Pro check-in events and relayed command events (see RELAY_COMMAND_EVENT). A
+    forged "command completed" event leads to a device record being deleted, so the receiver
+    only listens on loopback unless a token is configured.
+    """
+
+    def __init__(self, queue: DecommissionQueue, host: str = '127.0.0.1', port: int = 8080,
+                 token: str = None, on_match: Callable[[int], None] = None):
+        """
+        Args:
+        queue (DecommissionQueue): The job queue events are matched against.
+        host (str, optional): Interface to listen on. Anything but loopback requires `token`.
+        port (int, optional): Port to listen on.
+        token (str, optional): If set, requests must send `Authorization: Bearer <token>`.
+        on_match (callable, optional): Called with the job ID whenever an event matches a job,
+            e.g. DecommissionWorker.wake.
+
+        Raises:
+        ValueError: If `host` is not a loopback address and no token is set.
+        """
+        if not token and not is_loopback(host):
+            raise ValueError(f'Refusing to receive webhooks on {host} without a token; set WEBHOOK_TOKEN.')
+
+        self.queue = queue
+        self.token = token
+        self.on_match = on_match
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server.server_address[:2]
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if receiver.token and not hmac.compare_digest(
+                        self.headers.get('Authorization', ''), f'Bearer {receiver.token}'):
+                    self.send_error(401)
+                    return
+
+                try:
+                    payload = json_codec.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                except ValueError:
+                    self.send_error(400, 'Invalid JSON')
+                    return
+
+                name, event = parse_event(payload if isinstance(payload, dict) else {})
+                job_id = handle_event(receiver.queue, name, event)
+                if job_id is not None:
+                    print(f"Webhook {name} matched decommission job {job_id}")
+                    if receiver.on_match:
+                        receiver.on_match(job_id)
+
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        """
+        Serve in a background thread.
+        """
+        self._thread = threading.Thread(target=self.server.serve_forever, name='jamf-webhooks', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,58 +1,312 @@
-import json
+import argparse
+from typing import Iterable, Iterator, List, Optional
+from helpers import json_codec
 from helpers.jamf_client import JamfClient
 from helpers.airtable_client import AirtableAPI  # Ensure AirtableAPI is properly imported
+from helpers.group_delta import diff_members, load_members, next_members, save_members, state_path
+from helpers.profiling import add_profile_argument, profiling, stage
+from helpers.records import IDENTIFICATION_FIELDS, IdentificationRecord
+from helpers.resilience import CircuitOpenError
+from helpers.sharding import chunk_shards, page_shards, run_sharded
 
 
-def main():
+# Airtable table that tracks identified assets.
+AIRTABLE_TABLE = 'Assets'
+
+# Shard sizes for --workers: inventory pages per snapshot shard, and computer IDs per group shard.
+SHARD_PAGE_SIZE = 200
+SHARD_GROUP_SIZE = 100
+
+# Per-process state for sharded workers, populated by _init_worker.
+_worker = {}
+
+
+def get_group_member_ids(jamf: JamfClient, computer_group_id: int) -> Optional[List[int]]:
+    """
+    Return the computer IDs in a Jamf Pro computer group, or None if the group couldn't be read.
+    """
+    with stage('fetch', what='computer_group'):
+        computer_group = jamf.get_computer_group(id=computer_group_id)
+
+    if 'Error' in computer_group:
+        print(f"Failed to retrieve computer group: {computer_group['Error']}")
+        return None
+
+    members = computer_group.get('computer_group', computer_group).get('computers', [])
+    return [computer['id'] for computer in members]
+
+
+def identify_computers(jamf: JamfClient, computer_ids: Iterable[int]) -> List[IdentificationRecord]:
+    """
+    Build identification records for specific computers from their inventory details.
+
+    Args:
+        jamf (JamfClient): An authenticated Jamf Pro client.
+        computer_ids (iterable): Jamf Pro computer IDs.
+
+    Returns:
+        list of IdentificationRecord: One record per computer whose inventory could be read.
+    """
+    records = []
+
+    for computer_id in computer_ids:
+        with stage('fetch', what='inventory_details'):
+            inventory_details = jamf.get_computer_inventory_details(computer_id, fields=IDENTIFICATION_FIELDS)
+        if inventory_details['success']:
+            with stage('transform'):
+                record = IdentificationRecord.from_inventory_record(inventory_details['data'])
+                record.jamf_id = computer_id
+            records.append(record)
+        else:
+            print(f"Failed to retrieve inventory for computer ID {computer_id}: {inventory_details['message']}")
+
+    return records
+
+
+def identify_from_group(jamf: JamfClient, computer_group_id: int) -> List[IdentificationRecord]:
+    """
+    Identify assets from the members of a Jamf Pro computer group.
+
+    Args:
+        jamf (JamfClient): An authenticated Jamf Pro client.
+        computer_group_id (int): The ID of the computer group to read.
+
+    Returns:
+        list of IdentificationRecord: One record per group member whose inventory could be read.
+    """
+    computer_ids = get_group_member_ids(jamf, computer_group_id)
+    return identify_computers(jamf, computer_ids) if computer_ids else []
+
+
+def identify_from_snapshot(jamf: JamfClient, terminated_emails: Iterable[str],
+                           inactive_days: int = 30) -> List[IdentificationRecord]:
+    """
+    Identify assets by evaluating recovery rules over a local snapshot of the full inventory.
+
+    Args:
+        jamf (JamfClient): An authenticated Jamf Pro client.
+        terminated_emails (iterable): Email addresses of terminated users.
+        inactive_days (int, optional): Days without contact before a computer counts as inactive.
+
+    Returns:
+        list of IdentificationRecord: One record per recovery candidate.
+    """
+    from helpers.fleet import FleetSnapshot, recovery_candidates  # NumPy is only needed for this source
+
+    with stage('fetch', what='inventory_snapshot'):
+        snapshot = FleetSnapshot.from_jamf(jamf)
+
+    with stage('transform'):
+        candidates = snapshot.evaluate(recovery_candidates(terminated_emails, inactive_days))
+        print(f"{len(candidates)} of {len(snapshot)} computers flagged for recovery.")
+
+        return [
+            IdentificationRecord(row['jamf_id'], row['serial'], row['name'], row['model'],
+                                 row['user_name'], row['user_email'])
+            for row in snapshot.rows(candidates)
+        ]
+
+
+def _init_worker(credentials: dict, terminated_emails: List[str], inactive_days: int):
+    """
+    Authenticate one JamfClient per worker process and stash the rule parameters.
+    """
+    jamf = JamfClient(**credentials)
+    if not jamf.authenticate():
+        raise RuntimeError('Worker authentication failed, check credentials or network settings.')
+
+    _worker['jamf'] = jamf
+    _worker['terminated_emails'] = terminated_emails
+    _worker['inactive_days'] = inactive_days
+
+
+def _record_row(record: IdentificationRecord) -> tuple:
+    return (record.jamf_id, record.asset_serial, record.asset_name, record.asset_model,
+            record.user_name, record.user_email)
+
+
+def _snapshot_shard(page: int) -> List[tuple]:
+    """
+    Fetch one inventory page, evaluate the recovery rules over it and return the flagged rows.
+    """
+    from helpers.fleet import FLEET_FIELDS, FleetSnapshot, recovery_candidates
+
+    response = _worker['jamf'].get_computer_inventory_page(page, SHARD_PAGE_SIZE, fields=FLEET_FIELDS)
+    if not response['success']:
+        print(f"Failed to retrieve inventory page {page}: {response['status_code']}")
+        return []
+
+    snapshot = FleetSnapshot.from_records(response['data'])
+    candidates = snapshot.evaluate(recovery_candidates(_worker['terminated_emails'], _worker['inactive_days']))
+    return [(row['jamf_id'], row['serial'], row['name'], row['model'], row['user_name'], row['user_email'])
+            for row in snapshot.rows(candidates)]
+
+
+def _group_shard(computer_ids: List[int]) -> List[tuple]:
+    """
+    Fetch inventory details for one range of group members and return their identification rows.
+    """
+    return [_record_row(record) for record in identify_computers(_worker['jamf'], computer_ids)]
+
+
+def identify_sharded(jamf: JamfClient, credentials: dict, source: str, workers: int, computer_group_id: int = None,
+                     terminated_emails: List[str] = (), inactive_days: int = 30,
+                     computer_ids: List[int] = None) -> Iterator[IdentificationRecord]:
+    """
+    Shard the identification stage across a process pool and stream records back as shards finish.
+
+    The snapshot source is sharded by inventory page; the group source by ranges of member
+    computer IDs. Each worker authenticates its own client, fetches and transforms its shard,
+    and sends back compact rows.
+
+    Args:
+        jamf (JamfClient): An authenticated client, used only to plan the shards.
+        credentials (dict): JamfClient arguments for each worker.
+        source (str): 'snapshot' or 'group'.
+        workers (int): Number of worker processes.
+        computer_group_id (int, optional): Computer group ID for the group source.
+        terminated_emails (list, optional): Terminated user emails for the snapshot source.
+        inactive_days (int, optional): Inactivity threshold for the snapshot source.
+        computer_ids (list, optional): Group members to process, if already known (e.g. only added members).
+
+    Yields:
+        IdentificationRecord: Records in shard completion order.
+    """
+    if source == 'snapshot':
+        first_page = jamf.get_computer_inventory_page(0, 1)
+        if not first_page['success']:
+            print(f"Failed to retrieve inventory: {first_page['status_code']}")
+            return
+        task, shards = _snapshot_shard, page_shards(first_page['total'], SHARD_PAGE_SIZE)
+    else:
+        if computer_ids is None:
+            computer_ids = get_group_member_ids(jamf, computer_group_id)
+        if not computer_ids:
+            return
+        task, shards = _group_shard, chunk_shards(sorted(computer_ids), SHARD_GROUP_SIZE)
+
+    rows = run_sharded(task, shards, workers, initializer=_init_worker,
+                       initargs=(credentials, list(terminated_emails), inactive_days))
+    for row in rows:
+        yield IdentificationRecord(*row)
+
+
+def record_identifications(airtable: AirtableAPI, records: Iterable[IdentificationRecord]) -> List[dict]:
+    """
+    Create an Airtable record for each identified asset.
+
+    Args:
+        airtable (AirtableAPI): Airtable client.
+        records (iterable): Identification records to write.
+
+    Returns:
+        list of dict: The identification rows, including Airtable record IDs where creation succeeded.
+    """
+    all_computer_details = []
+
+    for record in records:
+        computer_data = record.to_dict()
+
+        # Create Airtable record
+        with stage('write', what='airtable'):
+            airtable_record = airtable.create_record(AIRTABLE_TABLE, computer_data)
+        if airtable_record['success']:
+            computer_data['airtable_record_id'] = airtable_record['data']['id']
+            print(f"Airtable record created for computer ID {record.jamf_id}")
+        else:
+            print(f"Failed to create Airtable record for computer ID {record.jamf_id}")
+
+        all_computer_details.append(computer_data)
+
+    return all_computer_details
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Identify assets for recovery.')
+    parser.add_argument('--source', choices=['group', 'snapshot'], default='group',
+                        help='Read candidates from a Jamf Pro computer group, or evaluate rules over a local '
+                             'inventory snapshot.')
+    parser.add_argument('--group-id', type=int, default=999, help='Computer group ID for the group source.')
+    parser.add_argument('--terminated-users', help='File of terminated user emails, one per line (snapshot source).')
+    parser.add_argument('--inactive-days', type=int, default=30,
+                        help='Days without contact before a computer counts as inactive (snapshot source).')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Shard identification across this many worker processes.')
+    parser.add_argument('--delta', action='store_true',
+                        help='Only process group members added since the previous run (group source).')
+    parser.add_argument('--state-dir', default='.identification_state',
+                        help='Where --delta keeps group membership snapshots between runs.')
+    add_profile_argument(parser, 'identification')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    with profiling('identification', args.profile):
+        try:
+            return run(args)
+        except (RuntimeError, CircuitOpenError) as e:
+            print(f"Identification failed: {e}")
+
+
+def run(args):
     username = 'example_username'
     password = 'example_password'
     base_url = 'your.jamf.instance.com'
+    credentials = {'username': username, 'password': password, 'base_url': base_url, 'verify_cert': True}
 
-    jamf = JamfClient(username, password, base_url, verify_cert=True)
+    jamf = JamfClient(**credentials)
     airtable = AirtableAPI(api_key='your_airtable_api_key', base_id='your_airtable_base_id')
 
-    if jamf.authenticate():
+    with stage('auth'):
+        authenticated = jamf.authenticate()
+
+    if authenticated:
         print("Authentication successful!")
     else:
         print("Authentication failed, check credentials or network settings.")
         return
 
-    computer_group_id = 999
-    computer_group = jamf.get_computer_group(id=computer_group_id)
+    terminated_emails = []
+    if args.source == 'snapshot' and args.terminated_users:
+        from helpers.fleet import load_emails
 
-    if 'Error' in computer_group:
-        print(f"Failed to retrieve computer group: {computer_group['Error']}")
-        return
+        terminated_emails = load_emails(args.terminated_users)
 
-    all_computer_details = []
+    computer_ids = None
+    if args.delta and args.source == 'group':
+        current_ids = get_group_member_ids(jamf, args.group_id)
+        if current_ids is None:
+            return
 
-    for computer in computer_group.get('computers', []):
-        inventory_details = jamf.get_computer_inventory_details(computer['id'])
-        if inventory_details['success']:
-            computer_data = {
-                'jamf_id': computer['id'],
-                'asset_serial': inventory_details['data']['serialNumber'],
-                'asset_name': inventory_details['data']['name'],
-                'asset_model': inventory_details['data']['model'],
-                'user_name': inventory_details['data'].get('userName'),
-                'user_email': inventory_details['data'].get('userEmail')
-            }
-
-            # Create Airtable record
-            airtable_record = airtable.create_record(computer_data)  # Assuming you have a "create_record" method
-            if 'id' in airtable_record:
-                computer_data['airtable_record_id'] = airtable_record['id']
-                print(f"Airtable record created for computer ID {computer['id']}")
-            else:
-                print(f"Failed to create Airtable record for computer ID {computer['id']}")
-
-            all_computer_details.append(computer_data)
-        else:
-            print(f"Failed to retrieve inventory for computer ID {computer['id']}: {inventory_details['message']}")
+        members_path = state_path(args.state_dir, args.group_id)
+        previous_ids = load_members(members_path)
+        computer_ids, removed_ids = diff_members(previous_ids, current_ids)
+        print(f"Group {args.group_id}: {len(computer_ids)} added, {len(removed_ids)} removed "
+              f"since the previous run.")
+        for computer_id in removed_ids:
+            print(f"Computer ID {computer_id} left group {args.group_id}")
+
+    if args.workers:
+        records = identify_sharded(jamf, credentials, args.source, args.workers, args.group_id,
+                                   terminated_emails, args.inactive_days, computer_ids)
+    elif args.source == 'snapshot':
+        records = identify_from_snapshot(jamf, terminated_emails, args.inactive_days)
+    elif computer_ids is not None:
+        records = identify_computers(jamf, computer_ids)
+    else:
+        records = identify_from_group(jamf, args.group_id)
+
+    all_computer_details = record_identifications(airtable, records)
+
+    if computer_ids is not None:
+        processed_ids = [row['jamf_id'] for row in all_computer_details if 'airtable_record_id' in row]
+        save_members(members_path, next_members(previous_ids, current_ids, processed_ids))
 
     # Write updated computer details to a JSON file
-    with open('identification.json', 'w') as f:
-        json.dump(all_computer_details, f, indent=4)
+    with stage('write', what='identification.json'), open('identification.json', 'w') as f:
+        json_codec.dump(all_computer_details, f, indent=True)
 
     return all_computer_details
 
@@ -1,6 +1,7 @@
-import json
-from helpers.fedex_client import FedExAPI
-from helpers.slack_client import SlackClient
+import argparse
+from helpers import json_codec
+from helpers.profiling import add_profile_argument, profiling, stage
+from helpers.slack_templates import load_template
 
 
 def read_json_file(file_path: str):
@@ -14,8 +15,8 @@ def read_json_file(file_path: str):
         dict: The contents of the JSON file.
     """
     try:
-        with open(file_path, 'r') as file:
-            return json.load(file)
+        with stage('read'), open(file_path, 'rb') as file:
+            return json_codec.load(file)
     except Exception as e:
         print(f"Error reading JSON file: {e}")
         return {}
@@ -48,6 +49,8 @@ def generate_fedex_return_label(user_id):
     Returns:
         dict: FedEx return information such as tracking number, return label URL, and location.
     """
+    from helpers.fedex_client import FedExAPI  # Imported on first use to keep handler cold starts short
+
     api_key = 'YOUR_FEDEX_API_KEY'
     fedex = FedExAPI(api_key=api_key, environment='production')  # Use 'sandbox' for testing
 
@@ -58,7 +61,8 @@ def generate_fedex_return_label(user_id):
         'Sender': {'Address': 'Company Address'}
     }
 
-    response = fedex.create_shipment(shipment_details)
+    with stage('write', what='fedex_shipment'):
+        response = fedex.create_shipment(shipment_details)
     if response['success']:
         return {
             'tracking_number': response['tracking_number'],
@@ -79,60 +83,33 @@ def update_slack_dm(slack_response, fedex_data):
         slack_response (dict): The response payload from Slack.
         fedex_data (dict): FedEx return information to display in the updated message.
     """
+    from helpers.slack_client import SlackClient  # Imported on first use to keep handler cold starts short
+
     slack_token = "your-slack-api-token"  # Replace with your Slack API token
     slack = SlackClient(slack_token)
 
-    # New Slack blocks to display FedEx return information
-    blocks = [
-        {
-            "type": "header",
-            "block_id": "asset_recovery_header",
-            "text": {
-                "type": "plain_text",
-                "text": "Asset Recovery",
-                "emoji": True
-            }
-        },
-        {
-            "type": "section",
-            "block_id": "asset_recovery_preamble",
-            "text": {
-                "type": "mrkdwn",
-                "text": "Great! Here's your FedEx Return information. Please contact IT if you need further assistance!"
-            }
-        },
-        {
-            "type": "section",
-            "block_id": "return_information",
-            "fields": [
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Tracking Number:* {fedex_data['tracking_number']}"
-                },
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Return Label URL:* {fedex_data['label_url']}"
-                },
-                {
-                    "type": "mrkdwn",
-                    "text": f"*FedEx Location:* {fedex_data['fedex_location']}"
-                },
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Location Address:* {fedex_data['location_address']}"
-                }
-            ]
-        }
-    ]
+    # Slack blocks to display FedEx return information
+    with stage('transform'):
+        blocks = load_template('return_information').render(**fedex_data)
 
     # Use Slack's chat.update API to update the original message
     response_url = slack_response['response_url']
-    slack.update_message(response_url, blocks)
+    with stage('notify'):
+        slack.update_message(response_url, blocks)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Process Slack responses and send FedEx return information.')
+    add_profile_argument(parser, 'reclamation')
+    return parser.parse_args(argv)
+
 
+def main(argv=None):
+    args = parse_args(argv)
 
-def main():
-    slack_response = read_json_file('sample_slack_response.json')
-    handle_slack_response(slack_response)
+    with profiling('reclamation', args.profile):
+        slack_response = read_json_file('sample_slack_response.json')
+        handle_slack_response(slack_response)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+import io
+import os
+import sys
+import requests
+from requests.adapters import BaseAdapter
+
+# The scripts import their helpers as top-level modules, the way they are run from scripts/.
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
+
+
+def make_response(status_code: int = 200, body: bytes = b'', url: str = 'https://example.test/',
+                  headers: dict = None) -> requests.Response:
+    """
+    Build a requests.Response with a fixed body, as returned by a transport adapter.
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = 'OK' if status_code < 400 else 'Error'
+    response.url = url
+    response._content = body
+    response.raw = io.BytesIO(body)
+    response.headers.update(headers or {})
+    return response
+
+
+class FakeAdapter(BaseAdapter):
+    """
+    Transport adapter that answers from a handler instead of the network and records each request.
+
+    `handler(request)` returns a Response, or raises to simulate a transport failure.
+    """
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.requests = []
+        self.kwargs = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        self.kwargs.append(kwargs)
+        response = self.handler(request)
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,171 @@
+import time
+import pytest
+from requests.exceptions import ConnectionError
+from helpers.airtable_buffer import AirtableWriteBuffer
+
+
+class FakeAirtable:
+    def __init__(self):
+        self.calls = []
+        self.fail_with = None
+
+    def update_records(self, table_name, records):
+        self.calls.append(records)
+        if isinstance(self.fail_with, Exception):
+            raise self.fail_with
+        if self.fail_with:
+            return {'success': False, 'status_code': self.fail_with}
+        return {'success': True, 'data': {'records': [dict(record) for record in records]}}
+
+
+@pytest.fixture
+def airtable():
+    return FakeAirtable()
+
+
+def make_buffer(airtable, **kwargs):
+    buffer = AirtableWriteBuffer(airtable, 'Assets', requests_per_second=1000, **kwargs)
+    buffer.prime([{'id': f'rec{i}', 'fields': {'Status': 'Open'}} for i in range(30)])
+    return buffer
+
+
+def test_no_op_updates_are_skipped(airtable):
+    buffer = make_buffer(airtable)
+    assert buffer.update('rec0', {'Status': 'Open'}) == {}
+    # Airtable omits empty fields, so None, False, '' and [] all match a missing field.
+    assert buffer.update('rec0', {'Notes': None, 'Returned': False, 'Tags': [], 'Carrier': ''}) == {}
+    assert buffer.flush() == 0
+    assert airtable.calls == []
+    assert buffer.stats()['skipped'] == 2
+
+
+def test_updates_to_unprimed_records_are_never_skipped(airtable):
+    buffer = make_buffer(airtable)
+    assert buffer.update('recX', {'Label URL': '', 'Wiped': False}) == {'Label URL': '', 'Wiped': False}
+    assert buffer.flush() == 1
+    assert airtable.calls == [[{'id': 'recX', 'fields': {'Label URL': '', 'Wiped': False}}]]
+
+
+def test_update_during_a_flush_is_compared_with_the_in_flight_value(airtable):
+    buffer = make_buffer(airtable)
+    buffer.update('rec0', {'Status': 'Wiped'})
+    update_records = airtable.update_records
+
+    def slow_update_records(table_name, records):
+        # Reverting to the primed value mid-flight must still overwrite the value being sent.
+        if len(airtable.calls) == 0:
+            assert buffer.update('rec0', {'Status': 'Open'}) == {'Status': 'Open'}
+            assert buffer.update('rec0', {'Status': 'Wiped'}) == {}
+            assert buffer.update('rec0', {'Status': 'Open'}) == {'Status': 'Open'}
+        return update_records(table_name, records)
+
+    airtable.update_records = slow_update_records
+    assert buffer.flush() == 1
+    assert buffer.pending() == {'rec0': {'Status': 'Open'}}
+    assert buffer.flush() == 1
+    assert airtable.calls[-1] == [{'id': 'rec0', 'fields': {'Status': 'Open'}}]
+
+
+def test_zero_is_not_treated_as_empty(airtable):
+    assert make_buffer(airtable).update('rec0', {'Count': 0}) == {'Count': 0}
+
+
+def test_pending_changes_to_a_record_are_merged(airtable):
+    buffer = make_buffer(airtable)
+    buffer.update('rec0', {'Status': 'Shipped'})
+    buffer.update('rec0', {'Notes': 'label sent'})
+    buffer.update('rec0', {'Status': 'Delivered'})
+    assert buffer.pending() == {'rec0': {'Status': 'Delivered', 'Notes': 'label sent'}}
+
+    assert buffer.flush() == 1
+    assert airtable.calls == [[{'id': 'rec0', 'fields': {'Status': 'Delivered', 'Notes': 'label sent'}}]]
+
+
+def test_reverting_to_the_known_value_cancels_the_change(airtable):
+    buffer = make_buffer(airtable)
+    buffer.update('rec0', {'Status': 'Shipped'})
+    buffer.update('rec0', {'Status': 'Open'})
+    assert buffer.pending() == {}
+
+
+def test_flush_sends_batches_of_ten(airtable):
+    buffer = make_buffer(airtable)
+    for i in range(25):
+        buffer.update(f'rec{i}', {'Status': 'Done'})
+    assert buffer.flush() == 25
+    assert [len(call) for call in airtable.calls] == [10, 10, 5]
+    # The confirmed values become the known values, so repeating the update is a no-op.
+    assert buffer.update('rec0', {'Status': 'Done'}) == {}
+
+
+def test_buffer_flushes_when_full(airtable):
+    buffer = make_buffer(airtable, max_pending=10)
+    for i in range(10):
+        buffer.update(f'rec{i}', {'Status': 'Done'})
+    assert [len(call) for call in airtable.calls] == [10]
+    assert buffer.pending() == {}
+
+
+def test_failed_batch_is_requeued_with_newer_values_winning(airtable):
+    buffer = make_buffer(airtable)
+    buffer.update('rec0', {'Status': 'Shipped', 'Notes': 'first'})
+    airtable.fail_with = 503
+    assert buffer.flush() == 0
+    assert buffer.pending() == {'rec0': {'Status': 'Shipped', 'Notes': 'first'}}
+    assert buffer.errors == [{'success': False, 'status_code': 503}]
+
+    buffer.update('rec0', {'Notes': 'second'})
+    airtable.fail_with = None
+    assert buffer.flush() == 1
+    assert airtable.calls[-1] == [{'id': 'rec0', 'fields': {'Status': 'Shipped', 'Notes': 'second'}}]
+
+
+def test_request_that_raises_requeues_every_unsent_batch(airtable):
+    buffer = make_buffer(airtable)
+    for i in range(25):
+        buffer.update(f'rec{i}', {'Status': 'Done'})
+
+    airtable.fail_with = ConnectionError('connection reset')
+    assert buffer.flush() == 0
+    assert len(airtable.calls) == 1
+    assert len(buffer.pending()) == 25
+    assert 'connection reset' in buffer.errors[0]['message']
+    assert buffer.stats()['failed'] == 10
+
+    airtable.fail_with = None
+    assert buffer.flush() == 25
+    assert buffer.pending() == {}
+
+
+def test_timer_keeps_flushing_after_a_request_raises(airtable):
+    buffer = make_buffer(airtable, flush_interval=0.01)
+    airtable.fail_with = ConnectionError('connection reset')
+    with buffer:
+        buffer.update('rec0', {'Status': 'Done'})
+        time.sleep(0.05)
+        airtable.fail_with = None
+        deadline = time.time() + 2
+        while buffer.pending() and time.time() < deadline:
+            time.sleep(0.01)
+        assert buffer.pending() == {}
+
+
+def test_update_records_sends_one_patch(monkeypatch):
+    from conftest import make_response
+    from helpers.airtable_client import AirtableAPI
+    from helpers import json_codec
+
+    client = AirtableAPI('key', 'appBASE')
+    sent = []
+
+    def patch(url, headers=None, data=None):
+        sent.append((url, json_codec.loads(data)))
+        return make_response(200, data.encode('utf-8'))
+
+    monkeypatch.setattr(client.session, 'patch', patch)
+    records = [{'id': 'rec1', 'fields': {'Status': 'Done'}}]
+    assert client.update_records('Assets', records) == {'success': True, 'data': {'records': records}}
+    assert sent == [('https://api.airtable.com/v0/appBASE/Assets', {'records': records})]
+
+    with pytest.raises(ValueError):
+        client.update_records('Assets', records * 11)
@@ -0,0 +1,105 @@
+from conftest import FakeAdapter, make_response
+from helpers.app_installers import BulkDeploymentManager, DeploymentStatus
+from helpers.jamf_client import JamfClient
+
+
+class FakeJamf:
+    """
+    Deployments whose summaries advance one scripted step per poll.
+    """
+
+    def __init__(self, summaries, fail_titles=()):
+        self.summaries = summaries
+        self.fail_titles = set(fail_titles)
+        self.polls = {}
+        self.retried = []
+
+    def deploy_app_installer(self, name, title_id, smart_group_id, **options):
+        if title_id in self.fail_titles:
+            return {'Error': f'{name} could not be deployed'}
+        return {'id': f'dep-{title_id}'}
+
+    def get_installation_summary(self, deployment_id):
+        steps = self.summaries[deployment_id]
+        i = self.polls[deployment_id] = self.polls.get(deployment_id, -1) + 1
+        return steps[min(i, len(steps) - 1)]
+
+    def retry_failed_deployment(self, deployment_id):
+        self.retried.append(deployment_id)
+        return True
+
+
+def summary(total, installed, failed, pending):
+    return {'totalInstallations': total, 'totalInstalled': installed, 'totalFailed': failed, 'totalPending': pending}
+
+
+def manager(jamf, **kwargs):
+    return BulkDeploymentManager(jamf, min_interval=0, max_interval=0, **kwargs)
+
+
+def test_deploy_records_ids_and_errors():
+    jamf = FakeJamf({}, fail_titles={'2'})
+    statuses = manager(jamf).deploy([{'id': '1', 'name': 'Firefox'}, {'id': '2', 'name': 'Zoom'}], '10')
+    assert [s.deployment_id for s in statuses] == ['dep-1', None]
+    assert statuses[1].error == 'Zoom could not be deployed'
+
+
+def test_poll_until_every_deployment_finishes():
+    jamf = FakeJamf({
+        'dep-1': [summary(2, 0, 0, 2), summary(2, 1, 0, 1), summary(2, 2, 0, 0)],
+        'dep-2': [summary(1, 1, 0, 0)],
+    })
+    rounds = []
+    bulk = manager(jamf)
+    statuses = bulk.poll(bulk.deploy([{'id': '1', 'name': 'A'}, {'id': '2', 'name': 'B'}], '10'),
+                         on_progress=rounds.append)
+    assert all(s.finished for s in statuses)
+    assert rounds[-1]['installed'] == 3 and rounds[-1]['finished'] == 2
+    assert jamf.polls == {'dep-1': 2, 'dep-2': 0}
+
+
+def test_a_failure_the_server_keeps_reporting_is_retried_once():
+    jamf = FakeJamf({'dep-1': [summary(1, 0, 1, 0)]})
+    bulk = manager(jamf, max_retries=2)
+    statuses = bulk.poll(bulk.deploy([{'id': '1', 'name': 'A'}], '10'), on_progress=lambda totals: None)
+    assert jamf.retried == ['dep-1']
+    assert statuses[0].retries == 1
+    assert statuses[0].finished and statuses[0].failed == 1
+
+
+def test_new_failures_are_retried_up_to_max_retries():
+    jamf = FakeJamf({'dep-1': [summary(3, 0, 1, 2), summary(3, 0, 1, 2), summary(3, 0, 2, 1),
+                               summary(3, 0, 3, 0)]})
+    bulk = manager(jamf, max_retries=2)
+    statuses = bulk.poll(bulk.deploy([{'id': '1', 'name': 'A'}], '10'), on_progress=lambda totals: None)
+    assert jamf.retried == ['dep-1', 'dep-1']
+    assert statuses[0].retries == 2
+    assert statuses[0].finished and statuses[0].failed == 3
+
+
+def test_deployment_to_an_empty_group_finishes():
+    jamf = FakeJamf({'dep-1': [summary(0, 0, 0, 0)]})
+    bulk = manager(jamf)
+    statuses = bulk.poll(bulk.deploy([{'id': '1', 'name': 'A'}], '10'), on_progress=lambda totals: None)
+    assert statuses[0].finished
+    assert jamf.polls == {'dep-1': 0}
+
+
+def test_poll_stops_at_timeout():
+    jamf = FakeJamf({'dep-1': [summary(1, 0, 0, 1)]})
+    bulk = manager(jamf)
+    statuses = bulk.poll(bulk.deploy([{'id': '1', 'name': 'A'}], '10'), timeout=0, on_progress=lambda totals: None)
+    assert not statuses[0].finished
+
+
+def test_status_update_reports_changes():
+    status = DeploymentStatus('1', 'A')
+    assert not status.finished
+    assert status.update(summary(1, 0, 0, 1))
+    assert not status.update(summary(1, 0, 0, 1))
+
+
+def test_jamf_client_accepts_201_for_created_deployments():
+    jamf = JamfClient('user', 'secret', 'jamf.example.test')
+    jamf.transport.base.base = FakeAdapter(lambda request: make_response(201, b'{"id": "42"}'))
+    assert jamf.deploy_app_installer('Firefox', '1', '10') == {'id': '42'}
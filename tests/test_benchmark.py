@@ -0,0 +1,26 @@
+import benchmark
+from benchmark import MIN_SECONDS_DELTA, compare
+
+
+BASELINE = {'slack_blocks[1000]': {'seconds': 0.010, 'relative': 1.0, 'peak_bytes': 1000}}
+
+
+def test_relative_time_regression_is_reported():
+    results = {'slack_blocks[1000]': {'seconds': 0.010 + MIN_SECONDS_DELTA * 2, 'relative': 1.5, 'peak_bytes': 1000}}
+    assert compare(results, BASELINE, 0.2) == ['slack_blocks[1000] relative: 1.0 -> 1.5 (+50%)']
+
+
+def test_tiny_absolute_slowdowns_only_compare_memory():
+    results = {'slack_blocks[1000]': {'seconds': 0.011, 'relative': 1.5, 'peak_bytes': 2000}}
+    assert compare(results, BASELINE, 0.2) == ['slack_blocks[1000] peak_bytes: 1000 -> 2000 (+100%)']
+
+
+def test_results_missing_from_baseline_are_skipped():
+    assert compare({'new_case[10]': {'seconds': 1.0, 'relative': 9.0, 'peak_bytes': 1}}, BASELINE, 0.2) == []
+
+
+def test_run_measures_every_case():
+    results = benchmark.run([10], repeat=1)
+    assert set(results) == {f'{name}[10]' for name in ('parse_inventory_pages', 'identification_rows',
+                                                        'read_identification_json', 'slack_blocks', 'error_dicts')}
+    assert all(result['seconds'] >= 0 and result['peak_bytes'] > 0 for result in results.values())
@@ -0,0 +1,115 @@
+import base64
+import hashlib
+import hmac
+import json
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+import pytest
+import cli
+from conftest import SCRIPTS
+
+
+def test_importing_cli_loads_no_clients():
+    code = 'import sys, cli; print(sorted(m for m in sys.modules if m == "requests" or m.startswith("helpers")))'
+    output = subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == '[]'
+
+
+def test_measure_import_time_works_from_any_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    total, imports = cli.measure_import_time('notify', repeat=1)
+    assert total > 0
+    assert 'communication' in dict(imports)
+
+
+def test_handler_rejects_unknown_commands():
+    assert cli.handler({'command': 'explode'})['statusCode'] == 400
+
+
+def signed_event(body, secret='signing-secret', timestamp=None):
+    timestamp = str(int(time.time() if timestamp is None else timestamp))
+    signature = 'v0=' + hmac.new(secret.encode('utf-8'), f'v0:{timestamp}:{body}'.encode('utf-8'),
+                                 hashlib.sha256).hexdigest()
+    return {'body': body, 'headers': {'X-Slack-Request-Timestamp': timestamp, 'X-Slack-Signature': signature}}
+
+
+@pytest.fixture
+def deferred(monkeypatch):
+    monkeypatch.setenv('SLACK_SIGNING_SECRET', 'signing-secret')
+    calls = []
+    monkeypatch.setattr(cli, 'defer_slack_response', lambda payload, context=None: calls.append(payload))
+    return calls
+
+
+def test_handler_acknowledges_signed_slack_requests_and_defers_the_work(deferred):
+    payload = {'type': 'block_actions', 'actions': [{'value': 'yes'}]}
+    response = cli.handler(signed_event(urlencode({'payload': json.dumps(payload)})))
+    assert response['statusCode'] == 200
+    assert deferred == [payload]
+
+
+@pytest.mark.parametrize('event', [
+    {'body': 'payload=%7B%7D'},
+    dict(signed_event('payload=%7B%7D', secret='wrong')),
+    dict(signed_event('payload=%7B%7D', timestamp=time.time() - 600)),
+    dict(signed_event('payload=%7B%7D'), body='payload=%7B%22forged%22%3A1%7D'),
+])
+def test_handler_rejects_unsigned_forged_and_stale_requests(deferred, event):
+    assert cli.handler(event)['statusCode'] == 401
+    assert deferred == []
+
+
+def test_handler_refuses_slack_requests_without_a_signing_secret(monkeypatch):
+    monkeypatch.delenv('SLACK_SIGNING_SECRET', raising=False)
+    assert cli.handler(signed_event('payload=%7B%7D'))['statusCode'] == 500
+
+
+def test_handler_rejects_signed_non_slack_events(deferred):
+    assert cli.handler(signed_event('hello=world'))['statusCode'] == 400
+
+
+def test_signature_covers_the_decoded_base64_body():
+    body = 'payload=%7B%7D'
+    event = dict(signed_event(body), body=base64.b64encode(body.encode('utf-8')).decode('ascii'), isBase64Encoded=True)
+    assert cli.verify_slack_signature(event, 'signing-secret')
+
+
+def test_deferred_response_runs_reclamation_off_the_request_thread(monkeypatch):
+    done = threading.Event()
+
+    class Reclamation:
+        @staticmethod
+        def handle_slack_response(payload):
+            time.sleep(0.1)
+            done.set()
+
+    monkeypatch.setattr(cli, 'load', lambda command: Reclamation)
+    cli.defer_slack_response({'type': 'block_actions'})
+    assert not done.is_set()
+    assert done.wait(2)
+
+
+def test_deferred_invocation_event_runs_reclamation(monkeypatch):
+    handled = []
+
+    class Reclamation:
+        handle_slack_response = staticmethod(handled.append)
+
+    monkeypatch.setattr(cli, 'load', lambda command: Reclamation)
+    assert cli.handler({'slack_payload': {'type': 'block_actions'}})['statusCode'] == 200
+    assert handled == [{'type': 'block_actions'}]
+
+
+def test_slack_payload_decodes_base64_form_bodies():
+    payload = {'type': 'block_actions', 'actions': [{'value': 'yes'}]}
+    body = urlencode({'payload': json.dumps(payload)})
+    event = {'body': base64.b64encode(body.encode('utf-8')).decode('ascii'), 'isBase64Encoded': True}
+    assert cli.slack_payload(event) == payload
+
+
+def test_main_usage():
+    assert cli.main(['--help']) == 0
+    assert cli.main([]) == 2
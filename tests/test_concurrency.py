@@ -0,0 +1,103 @@
+import time
+import pytest
+import requests
+from requests.exceptions import ConnectionError
+from conftest import FakeAdapter, make_response
+from helpers.concurrency import AdaptiveAdapter, AdaptiveLimiter, LimiterRegistry, RateLimiter
+
+
+def saturate(limiter, latency=0.01):
+    """
+    Fill every slot, then complete the requests.
+    """
+    slots = int(limiter.limit)
+    for _ in range(slots):
+        limiter.acquire()
+    for _ in range(slots):
+        limiter.release(latency, 200)
+
+
+def test_limit_grows_additively_while_saturated():
+    limiter = AdaptiveLimiter('jamf', initial=4)
+    for _ in range(40):
+        saturate(limiter)
+    assert 5 <= limiter.limit <= 16
+
+
+def test_limit_does_not_grow_when_unused():
+    limiter = AdaptiveLimiter('jamf', initial=4)
+    for _ in range(40):
+        limiter.acquire()
+        limiter.release(0.01, 200)
+    assert limiter.limit == 4
+
+
+def test_throttling_cuts_the_limit_once_per_burst():
+    limiter = AdaptiveLimiter('jamf', initial=16)
+    for _ in range(10):
+        limiter.acquire()
+    for _ in range(10):
+        limiter.release(0.01, 429)
+    assert limiter.limit == 8
+    assert limiter.throttled == 10
+
+
+def test_limit_never_drops_below_min():
+    limiter = AdaptiveLimiter('jamf', initial=2, min_limit=1)
+    for _ in range(5):
+        limiter._last_cut = 0
+        limiter.acquire()
+        limiter.release(0.01, 503)
+    assert limiter.limit == 1
+
+
+def test_latency_above_tolerance_cuts_the_limit():
+    limiter = AdaptiveLimiter('jamf', initial=8, window=20)
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(0.01, 200)
+    assert limiter.baseline_p95 == pytest.approx(0.01)
+    limiter._last_cut = 0
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(1.0, 200)
+    assert limiter.limit == 4
+
+
+def test_acquire_times_out_when_full():
+    limiter = AdaptiveLimiter('jamf', initial=1)
+    assert limiter.acquire(timeout=0.01)
+    assert not limiter.acquire(timeout=0.01)
+
+
+def test_adapter_releases_slots_on_errors_and_counts_them():
+    registry = LimiterRegistry(initial=4)
+
+    def handler(request):
+        raise ConnectionError('reset')
+
+    session = requests.Session()
+    session.mount('https://', AdaptiveAdapter(registry, base=FakeAdapter(handler)))
+    with pytest.raises(ConnectionError):
+        session.get('https://jamf.example.test/api/v1/departments')
+
+    state = registry.limits()['jamf.example.test']
+    assert state['in_flight'] == 0
+    assert state['throttled'] == 1 and state['limit'] == 2
+
+
+def test_adapter_uses_one_limiter_per_host():
+    registry = LimiterRegistry()
+    session = requests.Session()
+    session.mount('https://', AdaptiveAdapter(registry, base=FakeAdapter(lambda request: make_response(200))))
+    session.get('https://jamf.example.test/')
+    session.get('https://slack.example.test/')
+    assert set(registry.limits()) == {'jamf.example.test', 'slack.example.test'}
+
+
+def test_rate_limiter_paces_after_the_burst():
+    limiter = RateLimiter(rate=100, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.035
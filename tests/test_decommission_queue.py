@@ -0,0 +1,184 @@
+import time
+import pytest
+from requests.exceptions import ReadTimeout
+from helpers.decommission_queue import (ACKNOWLEDGED, DELETED, ERASE_SENDING, ERASE_SENT, FAILED, NEEDS_REVIEW,
+                                        PENDING, PRIORITY_TERMINATED, DecommissionQueue, DecommissionWorker)
+from helpers.resilience import CircuitOpenError
+
+FAR_FUTURE = time.time() + 10 ** 6
+
+
+class FakeJamf:
+    def __init__(self, erase=None, status='Acknowledged'):
+        self.erase = erase
+        self.status = status
+        self.erases = []
+        self.deletes = []
+
+    def get_computer_by_serial(self, serial):
+        return {'general': {'id': 7}}
+
+    def erase_device(self, computer_id, passcode):
+        self.erases.append(computer_id)
+        if self.erase is not None:
+            return self.erase()
+        return {'success': True, 'data': {'computer_command': {'command': {'command_uuid': 'uuid-1'}}}}
+
+    def check_mdm_command_status(self, uuid):
+        return {'success': True, 'data': {'computer_command': {'status': self.status}}}
+
+    def delete_device(self, computer_id):
+        self.deletes.append(computer_id)
+        return {'success': True}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = DecommissionQueue(str(tmp_path / 'decommission.db'))
+    yield queue
+    queue.close()
+
+
+def run_all(worker, queue, passes=5):
+    """
+    Run every active job's next step regardless of its backoff, `passes` times.
+    """
+    for _ in range(passes):
+        for job in queue.due(now=FAR_FUTURE):
+            worker.step(job)
+
+
+def test_job_runs_through_to_deleted(queue):
+    jamf = FakeJamf()
+    job_id = queue.enqueue('C02A')
+    run_all(DecommissionWorker(jamf, queue, '123456', poll_interval=0), queue)
+
+    job = queue.get(job_id)
+    assert job['state'] == DELETED
+    assert (job['computer_id'], job['command_uuid']) == ('7', 'uuid-1')
+    assert jamf.erases == ['7'] and jamf.deletes == ['7']
+
+
+def test_enqueue_refuses_a_second_open_job_for_a_serial(queue):
+    assert queue.enqueue('C02A') is not None
+    assert queue.enqueue('C02A') is None
+
+
+def test_due_orders_by_priority_then_deadline(queue):
+    low = queue.enqueue('LOW')
+    late = queue.enqueue('LATE', priority=PRIORITY_TERMINATED, deadline=2000)
+    soon = queue.enqueue('SOON', priority=PRIORITY_TERMINATED, deadline=1000)
+    assert [job['id'] for job in queue.due(now=FAR_FUTURE)] == [soon, late, low]
+
+
+@pytest.mark.parametrize('failure', [ReadTimeout('read timed out'), ConnectionResetError('reset')])
+def test_erase_that_raises_is_parked_and_never_resent(queue, failure):
+    def erase():
+        raise failure
+
+    jamf = FakeJamf(erase=erase)
+    job_id = queue.enqueue('C02A')
+    run_all(DecommissionWorker(jamf, queue, '123456'), queue)
+
+    job = queue.get(job_id)
+    assert job['state'] == NEEDS_REVIEW
+    assert 'verify in Jamf Pro' in job['last_error']
+    assert jamf.erases == ['7']
+
+
+def test_unreadable_erase_response_is_parked_and_never_resent(queue):
+    jamf = FakeJamf(erase=lambda: {'success': True, 'data': None})
+    job_id = queue.enqueue('C02A')
+    run_all(DecommissionWorker(jamf, queue, '123456'), queue)
+
+    assert queue.get(job_id)['state'] == NEEDS_REVIEW
+    assert jamf.erases == ['7']
+
+
+def test_open_circuit_is_retried_because_nothing_was_sent(queue):
+    def erase():
+        raise CircuitOpenError('Circuit open')
+
+    job_id = queue.enqueue('C02A')
+    worker = DecommissionWorker(FakeJamf(erase=erase), queue, '123456', max_attempts=5)
+    worker.step(queue.due()[0])
+
+    job = queue.get(job_id)
+    assert (job['state'], job['attempts']) == (PENDING, 1)
+    assert job['next_run_at'] > time.time()
+
+
+def test_rejected_erase_is_retried_then_fails(queue):
+    jamf = FakeJamf(erase=lambda: {'success': False, 'status_code': 400, 'message': 'Bad Request'})
+    job_id = queue.enqueue('C02A')
+    run_all(DecommissionWorker(jamf, queue, '123456', max_attempts=3), queue)
+
+    job = queue.get(job_id)
+    assert job['state'] == FAILED
+    assert len(jamf.erases) == 3
+
+
+@pytest.mark.parametrize('status_code', [500, 502, 503, 504, 408])
+def test_erase_failing_server_side_is_parked_and_never_resent(queue, status_code):
+    jamf = FakeJamf(erase=lambda: {'success': False, 'status_code': status_code, 'message': 'Unavailable'})
+    job_id = queue.enqueue('C02A')
+    run_all(DecommissionWorker(jamf, queue, '123456'), queue)
+
+    job = queue.get(job_id)
+    assert job['state'] == NEEDS_REVIEW
+    assert 'verify in Jamf Pro' in job['last_error']
+    assert jamf.erases == ['7']
+
+
+def test_job_claimed_by_another_worker_is_not_erased(queue):
+    job_id = queue.enqueue('C02A', computer_id='7')
+    job = queue.due()[0]
+    assert queue.transition(job_id, PENDING, ERASE_SENDING)
+
+    jamf = FakeJamf()
+    DecommissionWorker(jamf, queue, '123456').step(job)
+    assert jamf.erases == []
+    assert queue.get(job_id)['state'] == ERASE_SENDING
+
+
+def test_recover_parks_only_jobs_stuck_mid_erase(queue):
+    stale = queue.enqueue('C02A')
+    queue.update(stale, state=ERASE_SENDING)
+    live = queue.enqueue('C02B')
+    queue.update(live, state=ERASE_SENDING)
+    queue._db.execute('UPDATE jobs SET updated_at = ? WHERE id = ?', (time.time() - 3600, stale))
+
+    assert queue.recover() == 1
+    assert queue.get(stale)['state'] == NEEDS_REVIEW
+    assert queue.get(live)['state'] == ERASE_SENDING
+    assert queue.due(now=FAR_FUTURE) == []
+
+
+def test_run_once_for_one_job_leaves_other_jobs_alone(queue):
+    jamf = FakeJamf()
+    queue.enqueue('C02A', computer_id='1')
+    mine = queue.enqueue('C02B', computer_id='2')
+    DecommissionWorker(jamf, queue, '123456').run_once(mine)
+
+    assert jamf.erases == ['2']
+    assert queue.get(mine)['state'] == ERASE_SENT
+
+
+@pytest.mark.parametrize('delete_unacknowledged, final_state', [(True, DELETED), (False, FAILED)])
+def test_unacknowledged_erase_after_max_status_checks(queue, delete_unacknowledged, final_state):
+    jamf = FakeJamf(status='Pending')
+    job_id = queue.enqueue('C02A')
+    worker = DecommissionWorker(jamf, queue, '123456', max_status_checks=3,
+                                delete_unacknowledged=delete_unacknowledged)
+    run_all(worker, queue, passes=6)
+    assert queue.get(job_id)['state'] == final_state
+
+
+def test_acknowledge_moves_job_to_delete_step(queue):
+    job_id = queue.enqueue('C02A')
+    queue.update(job_id, state=ERASE_SENT, command_uuid='uuid-1', computer_id='7')
+    assert queue.find_by_command('uuid-1')['id'] == job_id
+    assert queue.find_by_computer(7)['id'] == job_id
+
+    DecommissionWorker(FakeJamf(), queue, '123456').acknowledge(job_id)
+    assert queue.get(job_id)['state'] == ACKNOWLEDGED
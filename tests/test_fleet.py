@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from helpers.fleet import (FleetSnapshot, all_of, any_of, column_in, inactive_for, load_emails, negate,  # noqa: E402
+                           recovery_candidates, unassigned, user_in)
+from helpers.records import InventoryRecord  # noqa: E402
+
+NOW = datetime(2024, 6, 30, tzinfo=timezone.utc)
+
+
+def record(jamf_id, email, last_contact, model='MacBook Air'):
+    return InventoryRecord(jamf_id=jamf_id, serial=f'C02{jamf_id}', name=f'mac-{jamf_id}', model=model,
+                           user_email=email, last_contact_time=last_contact)
+
+
+@pytest.fixture
+def snapshot():
+    return FleetSnapshot.from_records([
+        record('1', 'Gone@Example.com', '2024-01-01T12:00:00.000Z'),
+        record('2', 'gone@example.com', '2024-06-29T12:00:00Z'),
+        record('3', 'stays@example.com', '2024-01-01T12:00:00Z', model='iMac'),
+        record('4', None, None),
+    ])
+
+
+def ids(snapshot, rule):
+    return [row['jamf_id'] for row in snapshot.rows(snapshot.evaluate(rule))]
+
+
+def test_inactive_treats_missing_contact_as_inactive(snapshot):
+    assert ids(snapshot, inactive_for(30, now=NOW)) == ['1', '3', '4']
+
+
+def test_user_in_is_case_insensitive(snapshot):
+    assert ids(snapshot, user_in([' GONE@example.com '])) == ['1', '2']
+
+
+def test_rule_combinators(snapshot):
+    assert ids(snapshot, unassigned()) == ['4']
+    assert ids(snapshot, column_in('model', ['iMac'])) == ['3']
+    assert ids(snapshot, any_of(unassigned(), column_in('model', ['iMac']))) == ['3', '4']
+    assert ids(snapshot, negate(unassigned())) == ['1', '2', '3']
+    assert ids(snapshot, all_of(inactive_for(30, now=NOW), negate(unassigned()))) == ['1', '3']
+
+
+def test_recovery_candidates(snapshot):
+    snapshot.taken_at = NOW
+    assert ids(snapshot, recovery_candidates(['gone@example.com'])) == ['1']
+
+
+def test_rows_return_plain_values(snapshot):
+    row = next(snapshot.rows([0]))
+    assert row['serial'] == 'C021'
+    assert row['last_contact_time'] == datetime(2024, 1, 1, 12, 0)
+
+
+def test_columns_must_have_equal_length():
+    with pytest.raises(ValueError):
+        FleetSnapshot({'a': np.array([1, 2]), 'b': np.array([1])})
+
+
+def test_load_emails_skips_blanks_and_comments(tmp_path):
+    path = tmp_path / 'terminated.txt'
+    path.write_text('# terminated\na@example.com\n\nb@example.com\n')
+    assert load_emails(str(path)) == ['a@example.com', 'b@example.com']
@@ -0,0 +1,21 @@
+from helpers.group_delta import diff_members, load_members, next_members, save_members, state_path
+
+
+def test_first_run_adds_every_member():
+    assert diff_members(None, [3, 1, 2]) == ([1, 2, 3], [])
+
+
+def test_diff_reports_added_and_removed():
+    assert diff_members({1, 2, 3}, [2, 3, 4, 5]) == ([4, 5], [1])
+
+
+def test_unprocessed_additions_are_retried_next_run():
+    # 4 and 5 joined, but only 4 was processed; 1 left the group.
+    assert next_members({1, 2, 3}, [2, 3, 4, 5], processed=[4]) == {2, 3, 4}
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = state_path(str(tmp_path / 'state'), 999)
+    assert load_members(path) is None
+    save_members(path, {3, 1})
+    assert load_members(path) == {1, 3}
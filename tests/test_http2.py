@@ -0,0 +1,92 @@
+import pytest
+import requests
+from requests.exceptions import ConnectionError, ReadTimeout
+from helpers import http2
+from helpers.http2 import HTTP2Adapter
+from conftest import FakeAdapter, make_response
+
+
+def test_falls_back_to_http1_adapter_without_httpx(monkeypatch):
+    monkeypatch.setattr(http2, 'AVAILABLE', False)
+    fallback = FakeAdapter(lambda request: make_response(body=b'{}', url=request.url))
+    adapter = HTTP2Adapter(fallback=fallback)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    response = session.get('https://jamf.example.com/api/v1/jamf-pro-version')
+
+    assert response.status_code == 200
+    assert len(fallback.requests) == 1
+    assert adapter.stats()['available'] is False
+    assert adapter.stats()['requests'] == 0
+
+
+def test_default_fallback_is_http_adapter(monkeypatch):
+    monkeypatch.setattr(http2, 'AVAILABLE', False)
+    assert isinstance(HTTP2Adapter().fallback, requests.adapters.HTTPAdapter)
+
+
+@pytest.fixture
+def mock_adapter():
+    """
+    An HTTP2Adapter whose httpx client is served by the `handler` attribute of the fixture.
+    """
+    httpx = pytest.importorskip('httpx')
+    if not http2.AVAILABLE:
+        pytest.skip('httpx[http2] is not installed')
+
+    adapter = HTTP2Adapter()
+    client = httpx.Client(transport=httpx.MockTransport(lambda request: adapter.handler(request)))
+    adapter._client = lambda verify, cert: client
+    session = requests.Session()
+    session.mount('https://', adapter)
+    adapter.session = session
+    yield adapter
+    client.close()
+
+
+def test_http2_path_returns_requests_responses(mock_adapter):
+    import httpx
+
+    mock_adapter.handler = lambda request: httpx.Response(200, json={'ok': True})
+    response = mock_adapter.session.get('https://jamf.example.com/api/v1/jamf-pro-version')
+    assert response.json() == {'ok': True}
+    stats = mock_adapter.stats()
+    assert (stats['requests'], stats['in_flight'], stats['HTTP/1.1']) == (1, 0, 1)
+
+
+def test_timeouts_are_raised_as_requests_exceptions(mock_adapter):
+    import httpx
+
+    def handler(request):
+        raise httpx.ReadTimeout('timed out', request=request)
+
+    mock_adapter.handler = handler
+    with pytest.raises(ReadTimeout):
+        mock_adapter.session.get('https://jamf.example.com/api/v1/jamf-pro-version')
+    assert mock_adapter.stats()['in_flight'] == 0
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_errors_while_reading_the_body_are_raised_as_requests_exceptions(mock_adapter, stream):
+    import httpx
+
+    class ResetStream(httpx.SyncByteStream):
+        def __iter__(self):
+            yield b'{"results": ['
+            raise httpx.ReadError('connection reset')
+
+    mock_adapter.handler = lambda request: httpx.Response(200, stream=ResetStream())
+    with pytest.raises(ConnectionError):
+        response = mock_adapter.session.get('https://jamf.example.com/api/v1/computers-inventory', stream=stream)
+        b''.join(response.iter_content(4))
+
+
+def test_requests_with_a_proxy_go_through_http1(mock_adapter):
+    proxied = FakeAdapter(lambda request: make_response(body=b'{}', url=request.url))
+    mock_adapter._proxied = proxied
+    mock_adapter.handler = None
+    response = mock_adapter.session.get('https://jamf.example.com/api/v1/jamf-pro-version',
+                                        proxies={'https': 'http://proxy.example.com:3128'})
+    assert response.status_code == 200
+    assert len(proxied.requests) == 1
@@ -0,0 +1,68 @@
+from conftest import FakeAdapter, make_response
+from helpers.http_cache import CacheEntry, ResponseCache
+from helpers.jamf_client import JamfClient
+
+GROUPS_URL = 'https://jamf.example.test/api/v1/computer-groups'
+OTHER_URL = 'https://jamf.example.test/api/v1/departments'
+
+
+def client_with_cache(cache, handler):
+    jamf = JamfClient('user', 'secret', 'jamf.example.test', cache=cache)
+    adapter = FakeAdapter(handler)
+    jamf.transport.base.base = adapter
+    return jamf, adapter
+
+
+def etag_server(request):
+    if request.headers.get('If-None-Match') == '"v1"':
+        return make_response(304)
+    return make_response(200, b'{"groups": [1]}', headers={'ETag': '"v1"'})
+
+
+def test_fresh_entries_are_served_without_a_request():
+    jamf, adapter = client_with_cache(ResponseCache(), etag_server)
+    assert jamf._cached_get(GROUPS_URL).content == b'{"groups": [1]}'
+    response = jamf._cached_get(GROUPS_URL)
+    assert response.headers['X-Cache'] == 'HIT'
+    assert len(adapter.requests) == 1
+
+
+def test_expired_entries_are_revalidated_with_a_conditional_get():
+    jamf, adapter = client_with_cache(ResponseCache(ttls={}), etag_server)
+    jamf._cached_get(OTHER_URL)
+    response = jamf._cached_get(OTHER_URL)
+    assert response.status_code == 200 and response.content == b'{"groups": [1]}'
+    assert adapter.requests[1].headers['If-None-Match'] == '"v1"'
+
+
+def test_responses_without_validators_or_ttl_are_not_cached():
+    jamf, adapter = client_with_cache(ResponseCache(ttls={}), lambda request: make_response(200, b'{}'))
+    jamf._cached_get(OTHER_URL)
+    jamf._cached_get(OTHER_URL)
+    assert 'If-None-Match' not in adapter.requests[1].headers
+    assert len(adapter.requests) == 2
+
+
+def test_ttl_uses_the_longest_matching_fragment():
+    cache = ResponseCache(ttls={'/computers': 10, '/computers/id': 60})
+    assert cache.ttl_for('https://jamf.test/JSSResource/computers/id/1') == 60
+    assert cache.ttl_for('https://jamf.test/api/v1/departments') == 0
+
+
+def test_key_depends_on_params():
+    assert ResponseCache.key(GROUPS_URL, {'page': 1}) != ResponseCache.key(GROUPS_URL, {'page': 2})
+    assert ResponseCache.key(GROUPS_URL, {'page': 1, 'x': None}) == ResponseCache.key(GROUPS_URL, {'page': 1})
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    ResponseCache(directory=str(tmp_path)).put('k', CacheEntry(b'{"a": 1}', etag='"v1"', ttl=60))
+    entry = ResponseCache(directory=str(tmp_path)).get('k')
+    assert (entry.body, entry.etag, entry.fresh) == (b'{"a": 1}', '"v1"', True)
+
+
+def test_tiers_are_lru_bounded(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path), max_entries=2, max_disk_entries=3)
+    for i in range(5):
+        cache.put(f'k{i}', CacheEntry(b'{}', ttl=60))
+    assert len(cache._memory) == 2
+    assert len(list(tmp_path.glob('*.json'))) == 3
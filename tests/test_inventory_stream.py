@@ -0,0 +1,65 @@
+import json
+from urllib.parse import parse_qs, urlsplit
+import pytest
+from conftest import FakeAdapter, make_response
+from helpers.jamf_client import JamfClient
+from helpers.record_replay import Cassette, record, replay
+from helpers.records import InventoryRecord
+
+FLEET = [{'id': str(i), 'general': {'name': f'mac-{i}'}, 'hardware': {'serialNumber': f'C02{i:05d}'},
+          'userAndLocation': {'email': f'user{i}@example.com'}} for i in range(5)]
+
+
+def inventory_pages(request):
+    params = parse_qs(urlsplit(request.url).query)
+    page, size = int(params['page'][0]), int(params['page-size'][0])
+    body = {'totalCount': len(FLEET), 'results': FLEET[page * size:(page + 1) * size]}
+    return make_response(200, json.dumps(body).encode('utf-8'))
+
+
+def client_over(adapter) -> JamfClient:
+    jamf = JamfClient('user', 'secret', 'jamf.example.test')
+    jamf.transport.base.base = adapter  # innermost transport under the limiter and breakers
+    return jamf
+
+
+@pytest.mark.parametrize('prefetch_pages', [1, 2])
+def test_iter_computer_inventory_streams_every_page(prefetch_pages):
+    adapter = FakeAdapter(inventory_pages)
+    records = list(client_over(adapter).iter_computer_inventory(page_size=2, prefetch_pages=prefetch_pages))
+    assert records == FLEET
+    assert len(adapter.requests) == 3
+
+
+def test_iter_computer_inventory_projects_fields():
+    records = list(client_over(FakeAdapter(inventory_pages)).iter_computer_inventory(
+        page_size=2, fields=['jamf_id', 'serial']))
+    assert all(isinstance(record, InventoryRecord) for record in records)
+    assert [record.serial for record in records] == [item['hardware']['serialNumber'] for item in FLEET]
+
+
+def test_iter_computer_inventory_raises_on_failed_page():
+    def handler(request):
+        if parse_qs(urlsplit(request.url).query)['page'][0] == '1':
+            return make_response(500, b'')
+        return inventory_pages(request)
+
+    with pytest.raises(RuntimeError):
+        list(client_over(FakeAdapter(handler)).iter_computer_inventory(page_size=2))
+
+
+def test_get_computer_inventory_returns_error_entry_on_failure():
+    result = client_over(FakeAdapter(lambda request: make_response(503, b''))).get_computer_inventory(page_size=2)
+    assert 'Error' in result[0]
+
+
+def test_streamed_inventory_replays_from_a_cassette(tmp_path):
+    cassette = Cassette(str(tmp_path / 'inventory.ndjson'))
+    recording = client_over(FakeAdapter(inventory_pages))
+    record(cassette, recording.session)
+    assert list(recording.iter_computer_inventory(page_size=2)) == FLEET
+
+    offline = JamfClient('user', 'secret', 'jamf.example.test')
+    adapter = replay(cassette, offline.session)
+    assert list(offline.iter_computer_inventory(page_size=2)) == FLEET
+    assert adapter.remaining() == 0
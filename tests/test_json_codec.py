@@ -0,0 +1,54 @@
+import pytest
+from conftest import make_response
+from helpers import json_codec
+from helpers.jamf_client import JamfClient
+
+
+def test_round_trip():
+    obj = {'id': '1', 'general': {'name': 'mac', 'managed': True}, 'sizes': [1, 2.5, None]}
+    assert json_codec.loads(json_codec.dumps(obj)) == obj
+    assert json_codec.loads(json_codec.dumps(obj, indent=True).encode('utf-8')) == obj
+
+
+def test_response_json_parses_once():
+    response = make_response(body=b'{"token": "abc"}')
+    first = json_codec.response_json(response)
+    response._content = b'{"token": "changed"}'
+    assert json_codec.response_json(response) is first
+
+
+@pytest.mark.parametrize('body', [b'', b'<html>maintenance</html>'])
+def test_response_json_returns_none_for_empty_or_invalid_body(body):
+    assert json_codec.response_json(make_response(body=body)) is None
+
+
+@pytest.mark.parametrize('method', ['authenticate', 'authenticate_api_client'])
+@pytest.mark.parametrize('body', [b'', b'not json', b'[]', b'{}'])
+def test_authenticate_fails_cleanly_without_token(monkeypatch, method, body):
+    client = JamfClient('user', 'secret', 'jamf.example.test')
+    monkeypatch.setattr(client.session, 'post', lambda *args, **kwargs: make_response(body=body))
+    assert getattr(client, method)() is False
+    assert 'Authorization' not in client.session.headers
+
+
+def test_authenticate_sets_bearer_token(monkeypatch):
+    client = JamfClient('user', 'secret', 'jamf.example.test')
+    monkeypatch.setattr(client.session, 'post', lambda *args, **kwargs: make_response(body=b'{"token": "abc"}'))
+    assert client.authenticate() is True
+    assert client.session.headers['Authorization'] == 'Bearer abc'
+
+
+@pytest.mark.parametrize('body', [b'', b'<html>maintenance</html>', b'[]'])
+def test_unreadable_200_bodies_become_error_results(monkeypatch, body):
+    from helpers.airtable_client import AirtableAPI
+
+    client = JamfClient('user', 'secret', 'jamf.example.test')
+    monkeypatch.setattr(client.session, 'get', lambda *args, **kwargs: make_response(body=body))
+    for result in (client.get_computer_inventory_page(0, 10),
+                   client.get_computer_inventory_details('7', fields=['serial'])):
+        assert result['success'] is False
+        assert result['status_code'] == 200
+
+    airtable = AirtableAPI('key', 'appBASE')
+    monkeypatch.setattr(airtable.session, 'get', lambda *args, **kwargs: make_response(body=body))
+    assert airtable.list_all_records('Assets')['success'] is False
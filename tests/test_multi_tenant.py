@@ -0,0 +1,60 @@
+import time
+from helpers.multi_tenant import MultiJamfClient
+from helpers.records import InventoryRecord
+
+
+class FakeTenant:
+    def __init__(self, name, delay=0.0, broken=False):
+        self.name = name
+        self.delay = delay
+        self.broken = broken
+
+    def authenticate(self):
+        if self.broken:
+            raise ConnectionError('unreachable')
+        return True
+
+    def get_computer_inventory(self, **kwargs):
+        time.sleep(self.delay)
+        if self.broken:
+            return [{'Error': 'Failed to retrieve records'}]
+        return [InventoryRecord(jamf_id='1', serial=f'{self.name}-1')]
+
+    def get_computer_by_serial(self, serial):
+        return {'id': 1, 'serial': serial} if self.name == 'eu' else None
+
+    def erase_device(self, computer_id, passcode):
+        if self.broken:
+            raise ConnectionError('unreachable')
+        return {'success': True, 'computer_id': computer_id}
+
+
+def test_fan_out_runs_tenants_in_parallel_and_tags_records():
+    multi = MultiJamfClient({'us': FakeTenant('us', delay=0.2), 'eu': FakeTenant('eu', delay=0.2)})
+    start = time.monotonic()
+    records = multi.get_computer_inventory()
+    assert time.monotonic() - start < 0.35
+    assert sorted((r.tenant, r.serial) for r in records) == [('eu', 'eu-1'), ('us', 'us-1')]
+
+
+def test_failing_tenants_are_reported_without_aborting_the_sweep():
+    multi = MultiJamfClient({'us': FakeTenant('us'), 'apac': FakeTenant('apac', broken=True)})
+    assert multi.authenticate() == {'us': True, 'apac': False}
+    assert 'apac' in multi.errors
+
+    records = multi.get_computer_inventory()
+    assert [r.tenant for r in records] == ['us']
+    assert multi.errors == {'apac': 'Failed to retrieve records'}
+
+
+def test_find_computer_by_serial_across_tenants():
+    multi = MultiJamfClient({'us': FakeTenant('us'), 'eu': FakeTenant('eu')})
+    assert multi.find_computer_by_serial('C02A') == [{'id': 1, 'serial': 'C02A', 'tenant': 'eu'}]
+
+
+def test_erase_devices_keeps_input_order_and_tags_failures():
+    multi = MultiJamfClient({'us': FakeTenant('us'), 'apac': FakeTenant('apac', broken=True)})
+    responses = multi.erase_devices([('us', '1'), ('apac', '2'), ('us', '3')], '123456')
+    assert [(r['tenant'], r['success']) for r in responses] == [('us', True), ('apac', False), ('us', True)]
+    assert responses[2]['computer_id'] == '3'
+    assert list(multi.errors) == ['apac[1]']
@@ -0,0 +1,64 @@
+from requests.exceptions import ConnectionError
+from conftest import make_response
+from helpers.patch_titles import PatchTitleOnboarder, created_id, render_patch_title
+
+
+class FakeJamf:
+    def __init__(self, body=b'<patch_software_title><id>42</id></patch_software_title>', status_code=201,
+                 dashboard_error=None):
+        self.body = body
+        self.status_code = status_code
+        self.dashboard_error = dashboard_error
+        self.dashboard_calls = []
+
+    def add_patch_title(self, name, name_id):
+        return make_response(self.status_code, self.body)
+
+    def add_patch_title_dashboard(self, patch_title_id):
+        self.dashboard_calls.append(patch_title_id)
+        if self.dashboard_error:
+            raise self.dashboard_error
+        return True
+
+
+def test_render_patch_title_escapes_values():
+    xml = render_patch_title('Foo & <Bar>', 'foo"bar')
+    assert '<name>Foo &amp; &lt;Bar&gt;</name>' in xml
+    assert '<name_id>foo"bar</name_id>' in xml
+
+
+def test_created_id():
+    assert created_id(make_response(201, b'<patch_software_title><id>7</id></patch_software_title>')) == '7'
+    assert created_id(make_response(201, b'{"id": 7}')) is None
+
+
+def test_onboard_registers_created_titles_on_the_dashboard():
+    jamf = FakeJamf()
+    results = PatchTitleOnboarder(jamf, requests_per_second=100).onboard([{'name': 'Firefox', 'name_id': 'firefox'}])
+    assert results[0]['success'] and results[0]['dashboard'] and results[0]['error'] is None
+    assert jamf.dashboard_calls == ['42']
+
+
+def test_onboard_reports_a_created_title_without_an_id():
+    jamf = FakeJamf(body=b'<html>OK</html>')
+    result = PatchTitleOnboarder(jamf, requests_per_second=100).onboard([{'name': 'Zoom', 'name_id': 'zoom'}])[0]
+    assert result['patch_title_id'] is None
+    assert result['dashboard'] is False
+    assert result['error']
+    assert jamf.dashboard_calls == []
+
+
+def test_onboard_reports_failed_creation():
+    onboarder = PatchTitleOnboarder(FakeJamf(status_code=409), requests_per_second=100)
+    results = onboarder.onboard([{'name': 'Slack', 'name_id': 'slack'}])
+    assert results[0]['error'] == 'Patch title creation failed - 409'
+    assert PatchTitleOnboarder.summary(results) == {'titles': 1, 'created': 0, 'dashboard': 0, 'failed': 1}
+
+
+def test_dashboard_exception_is_reported_per_title():
+    jamf = FakeJamf(dashboard_error=ConnectionError('connection reset'))
+    titles = [{'name': 'Firefox', 'name_id': 'firefox'}, {'name': 'Zoom', 'name_id': 'zoom'}]
+    results = PatchTitleOnboarder(jamf, requests_per_second=100).onboard(titles)
+    assert [result['name'] for result in results] == ['Firefox', 'Zoom']
+    assert all(result['success'] and not result['dashboard'] for result in results)
+    assert all('connection reset' in result['error'] for result in results)
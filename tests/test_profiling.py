@@ -0,0 +1,31 @@
+import json
+from helpers import profiling
+from helpers.profiling import profiling as profiled, stage
+
+
+def test_stage_is_a_no_op_without_an_active_profile():
+    assert profiling._active is None
+    with stage('fetch', what='inventory'):
+        pass
+    with profiled('identification', None) as profiler:
+        assert profiler is None
+
+
+def test_profile_artifact_has_stage_totals_and_spans(tmp_path):
+    path = tmp_path / 'profile.json'
+    with profiled('identification', str(path)):
+        with stage('fetch', what='inventory'):
+            pass
+        with stage('fetch'):
+            pass
+        with stage('write'):
+            pass
+    assert profiling._active is None
+
+    report = json.loads(path.read_text())
+    assert report['script'] == 'identification'
+    assert report['stages']['fetch']['count'] == 2
+    assert report['stages']['write']['count'] == 1
+    assert [span['stage'] for span in report['spans']] == ['fetch', 'fetch', 'write']
+    assert report['spans'][0]['attrs'] == {'what': 'inventory'}
+    assert report['functions']
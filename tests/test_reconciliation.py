@@ -0,0 +1,69 @@
+import pytest
+from helpers.reconciliation import index_slack_users, load_and_reconcile, reconcile, report_rows
+from helpers.records import InventoryRecord
+
+INVENTORY = [
+    InventoryRecord(jamf_id='1', serial='c02aaa ', name='mac-a', user_email='A@example.com'),
+    InventoryRecord(jamf_id='2', serial='C02BBB', name='mac-b', user_email='b@example.com'),
+    InventoryRecord(jamf_id='3', serial='C02CCC', name='mac-c', user_email='nobody@example.com'),
+    InventoryRecord(jamf_id='4', serial=None, name='mac-d', user_email=None),
+]
+AIRTABLE = [
+    {'id': 'rec1', 'fields': {'asset_serial': 'C02AAA', 'user_email': 'a@example.com'}},
+    {'id': 'rec2', 'fields': {'asset_serial': 'C02BBB', 'user_email': 'old@example.com'}},
+    {'id': 'rec3', 'fields': {'asset_serial': 'C02BBB', 'user_email': 'b@example.com'}},
+    {'id': 'rec4', 'fields': {'asset_serial': 'C02ZZZ'}},
+    {'id': 'rec5', 'fields': {}},
+]
+SLACK = [
+    {'id': 'UA', 'profile': {'email': 'a@example.com'}},
+    {'id': 'UB', 'profile': {'email': 'B@Example.com'}},
+    {'id': 'UX', 'deleted': True, 'profile': {'email': 'nobody@example.com'}},
+    {'id': 'BOT', 'is_bot': True, 'profile': {}},
+]
+
+
+def test_index_slack_users_skips_deleted_users_and_bots():
+    assert index_slack_users(SLACK) == {'a@example.com': 'UA', 'b@example.com': 'UB'}
+
+
+def test_reconcile_reports_each_kind_of_mismatch():
+    report = reconcile(INVENTORY, AIRTABLE, SLACK)
+    assert report.summary() == {'missing_from_airtable': 1, 'orphaned_airtable_rows': 1,
+                                'duplicate_airtable_serials': 1, 'email_mismatches': 1,
+                                'users_without_slack': 1, 'matched': 2}
+    assert report.missing_from_airtable[0]['serial'] == 'C02CCC'
+    assert report.orphaned_airtable_rows == [{'serial': 'C02ZZZ', 'airtable_record_id': 'rec4'}]
+    assert report.duplicate_airtable_serials == [{'serial': 'C02BBB', 'airtable_record_id': 'rec3'}]
+    assert report.email_mismatches[0]['airtable_email'] == 'old@example.com'
+    assert report.users_without_slack == [{'user_email': 'nobody@example.com', 'serial': 'C02CCC'}]
+    assert {row['kind'] for row in report_rows(report)} == set(report.KINDS)
+
+
+class Source:
+    def __init__(self, inventory=INVENTORY, airtable=None, slack=SLACK):
+        self.inventory = inventory
+        self.airtable = airtable or {'success': True, 'data': AIRTABLE}
+        self.slack = slack
+
+    def get_computer_inventory(self, fields):
+        return self.inventory
+
+    def list_all_records(self, table_name, view=None, fields=None):
+        return self.airtable
+
+    def list_users(self):
+        return self.slack
+
+
+def test_load_and_reconcile():
+    source = Source()
+    assert load_and_reconcile(source, source, source, 'Assets').matched == 2
+
+
+@pytest.mark.parametrize('source', [Source(inventory=[{'Error': 'boom'}]),
+                                    Source(airtable={'success': False, 'message': 'boom'}),
+                                    Source(slack=None)])
+def test_load_and_reconcile_raises_when_a_source_fails(source):
+    with pytest.raises(RuntimeError):
+        load_and_reconcile(source, source, source, 'Assets')
@@ -0,0 +1,74 @@
+import pytest
+import requests
+from conftest import FakeAdapter, make_response
+from helpers.record_replay import (REDACTED, Cassette, CassetteMiss, exchange_key, record, redact_body,
+                                   redact_headers, redact_url, replay)
+
+ERASE_URL = 'https://jamf.test/JSSResource/computercommands/command/EraseDevice/passcode/246810/id/7'
+
+
+def test_redact_url_query_and_path_secrets():
+    assert redact_url(ERASE_URL) == \
+        f'https://jamf.test/JSSResource/computercommands/command/EraseDevice/passcode/{REDACTED}/id/7'
+    assert 'abc' not in redact_url('https://jamf.test/x?token=abc&page=1')
+    assert 'page=1' in redact_url('https://jamf.test/x?token=abc&page=1')
+    assert redact_url('https://jamf.test/api/v1/auth/token') == 'https://jamf.test/api/v1/auth/token'
+    assert redact_url('https://jamf.test/api/v1/computers/id/7') == 'https://jamf.test/api/v1/computers/id/7'
+
+
+def test_exchange_key_matches_redacted_url():
+    assert exchange_key('post', ERASE_URL) == ('POST', redact_url(ERASE_URL))
+
+
+def test_redact_headers_and_bodies():
+    assert redact_headers({'Authorization': 'Bearer x', 'Accept': 'application/json'}) == \
+        {'Authorization': REDACTED, 'Accept': 'application/json'}
+    assert 'hunter2' not in redact_body(b'{"client_secret": "hunter2", "grant_type": "client_credentials"}')
+    assert 'hunter2' not in redact_body('client_secret=hunter2&grant_type=client_credentials')
+    assert redact_body(b'\xff\xfe') is None
+
+
+def recorded_session(tmp_path, handler):
+    cassette = Cassette(str(tmp_path / 'run.ndjson'))
+    session = requests.Session()
+    session.mount('https://', FakeAdapter(handler))
+    record(cassette, session)
+    return cassette, session
+
+
+def test_recorded_cassette_never_contains_the_wipe_passcode(tmp_path):
+    cassette, session = recorded_session(tmp_path, lambda request: make_response(201, b'{"command_uuid": "u1"}'))
+    session.post(ERASE_URL, auth=('admin', 'password123'))
+
+    text = (tmp_path / 'run.ndjson').read_text()
+    assert '246810' not in text
+    assert 'password123' not in text and 'YWRtaW46' not in text  # basic auth header
+
+
+def test_replay_serves_recorded_exchanges_in_order(tmp_path):
+    bodies = iter([b'{"n": 1}', b'{"n": 2}', b'{"command_uuid": "u1"}'])
+    cassette, session = recorded_session(tmp_path, lambda request: make_response(200, next(bodies)))
+    session.get('https://jamf.test/api/v1/departments')
+    session.get('https://jamf.test/api/v1/departments')
+    session.post(ERASE_URL)
+
+    offline = requests.Session()
+    adapter = replay(cassette, offline)
+    assert offline.get('https://jamf.test/api/v1/departments').json() == {'n': 1}
+    assert offline.get('https://jamf.test/api/v1/departments').json() == {'n': 2}
+    # Replay with a different passcode still matches, since both sides are redacted.
+    assert offline.post(ERASE_URL.replace('246810', '000000')).json() == {'command_uuid': 'u1'}
+    assert adapter.remaining() == 0
+
+    with pytest.raises(CassetteMiss):
+        offline.get('https://jamf.test/api/v1/departments')
+
+
+def test_binary_bodies_round_trip(tmp_path):
+    payload = bytes(range(256))
+    cassette, session = recorded_session(tmp_path, lambda request: make_response(200, payload))
+    session.get('https://jamf.test/api/v1/icon')
+
+    offline = requests.Session()
+    replay(cassette, offline)
+    assert offline.get('https://jamf.test/api/v1/icon').content == payload
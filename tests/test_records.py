@@ -0,0 +1,43 @@
+import pytest
+from helpers.records import (IDENTIFICATION_FIELDS, IdentificationRecord, InventoryRecord, sections_for)
+
+ITEM = {
+    'id': '42',
+    'udid': 'ABC',
+    'general': {'name': 'jdoe-mac', 'lastContactTime': '2024-01-01T00:00:00Z', 'platform': 'Mac'},
+    'hardware': {'serialNumber': 'C02XYZ', 'model': 'MacBook Air', 'processorType': 'Apple M2'},
+    'userAndLocation': {'username': 'jdoe', 'email': 'jdoe@example.com'},
+}
+
+
+def test_sections_for_projected_fields():
+    assert sections_for(['jamf_id', 'serial', 'name']) == ['HARDWARE', 'GENERAL']
+    assert sections_for(['jamf_id']) == []
+
+
+def test_projection_keeps_only_requested_fields():
+    record = InventoryRecord.from_inventory(ITEM, frozenset(IDENTIFICATION_FIELDS))
+    assert (record.jamf_id, record.serial, record.name, record.user_email) == \
+        ('42', 'C02XYZ', 'jdoe-mac', 'jdoe@example.com')
+    assert record.udid is None and record.last_contact_time is None
+
+
+def test_missing_sections_project_to_none():
+    record = InventoryRecord.from_inventory({'id': '1', 'general': None})
+    assert record.jamf_id == '1'
+    assert record.name is None and record.serial is None
+
+
+def test_records_are_slotted():
+    record = InventoryRecord.from_inventory(ITEM)
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+
+def test_identification_row_shape():
+    row = IdentificationRecord.from_inventory_record(InventoryRecord.from_inventory(ITEM)).to_dict()
+    assert row == {'jamf_id': '42', 'asset_serial': 'C02XYZ', 'asset_name': 'jdoe-mac',
+                   'asset_model': 'MacBook Air', 'user_name': 'jdoe', 'user_email': 'jdoe@example.com'}
+
+    record = IdentificationRecord('42', airtable_record_id='rec1')
+    assert record.to_dict()['airtable_record_id'] == 'rec1'
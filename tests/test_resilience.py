@@ -0,0 +1,125 @@
+import threading
+import time
+import pytest
+import requests
+from conftest import FakeAdapter, make_response
+from helpers.resilience import CircuitBreaker, CircuitOpenError, ResilientAdapter, endpoint_key
+
+
+def session_with(adapter):
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return session
+
+
+def test_endpoint_key_collapses_identifiers():
+    assert endpoint_key('GET', 'https://jamf.test/JSSResource/computers/id/42') == 'GET /JSSResource/computers/id/*'
+    assert (endpoint_key('POST', 'https://jamf.test/JSSResource/computercommands/command/EraseDevice/passcode/123456/id/7')
+            == 'POST /JSSResource/computercommands/command/EraseDevice/passcode/*/id/*')
+
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast():
+    base = FakeAdapter(lambda request: make_response(503))
+    adapter = ResilientAdapter(base=base, failure_threshold=3, reset_timeout=60)
+    session = session_with(adapter)
+
+    for _ in range(3):
+        assert session.get('https://jamf.test/api/v1/computers-inventory').status_code == 503
+    with pytest.raises(CircuitOpenError):
+        session.get('https://jamf.test/api/v1/computers-inventory')
+
+    assert len(base.requests) == 3
+    # Other endpoints have their own breakers.
+    assert session.get('https://jamf.test/api/v1/departments').status_code == 503
+
+
+def test_breaker_half_opens_after_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial call while half-open
+    breaker.record_success()
+    assert breaker.snapshot() == {'state': CircuitBreaker.CLOSED, 'failures': 0}
+
+
+def test_unexpected_exception_releases_the_half_open_trial():
+    base = FakeAdapter(lambda request: make_response(503))
+    adapter = ResilientAdapter(base=base, failure_threshold=1, reset_timeout=0.01)
+    session = session_with(adapter)
+    session.get('https://jamf.test/api/v1/computers-inventory')  # opens the breaker
+    time.sleep(0.02)
+
+    def broken(request):
+        raise RuntimeError('not a RequestException')
+
+    base.handler = broken
+    with pytest.raises(RuntimeError):
+        session.get('https://jamf.test/api/v1/computers-inventory')  # the half-open trial
+    time.sleep(0.02)
+
+    base.handler = lambda request: make_response(200, b'{}')
+    assert session.get('https://jamf.test/api/v1/computers-inventory').status_code == 200
+    assert adapter.breaker_states()['GET /api/v1/computers-inventory']['state'] == CircuitBreaker.CLOSED
+
+
+def test_default_timeout_applies_only_to_requests_without_one():
+    base = FakeAdapter(lambda request: make_response(200, b'{}'))
+    session = session_with(ResilientAdapter(base=base, timeout=(1, 2)))
+    session.get('https://jamf.test/api/v1/computers-inventory')
+    session.get('https://jamf.test/api/v1/computers-inventory', timeout=5)
+    assert [kwargs['timeout'] for kwargs in base.kwargs] == [(1, 2), 5]
+
+
+def test_jamf_client_sets_a_default_timeout():
+    from helpers.jamf_client import DEFAULT_TIMEOUT, JamfClient
+
+    assert JamfClient('user', 'secret', 'jamf.example.test').transport.timeout == DEFAULT_TIMEOUT
+
+
+def slow_ok(request):
+    time.sleep(0.02)
+    return make_response(200, b'{}')
+
+
+def test_slow_successful_calls_do_not_open_the_breaker_by_default():
+    adapter = ResilientAdapter(base=FakeAdapter(slow_ok), failure_threshold=2)
+    session = session_with(adapter)
+    for _ in range(4):
+        assert session.get('https://jamf.test/api/v1/computers-inventory').status_code == 200
+    assert adapter.breaker_states()['GET /api/v1/computers-inventory']['state'] == CircuitBreaker.CLOSED
+
+
+def test_slow_call_threshold_is_opt_in():
+    adapter = ResilientAdapter(base=FakeAdapter(slow_ok), failure_threshold=2, slow_call_threshold=0.001)
+    session = session_with(adapter)
+    for _ in range(2):
+        session.get('https://jamf.test/api/v1/computers-inventory')
+    with pytest.raises(CircuitOpenError):
+        session.get('https://jamf.test/api/v1/computers-inventory')
+
+
+def test_hedged_get_returns_the_faster_copy():
+    calls = []
+    lock = threading.Lock()
+
+    def handler(request):
+        with lock:
+            calls.append(request)
+            first = len(calls) == 1
+        time.sleep(0.5 if first else 0)
+        return make_response(200, b'first' if first else b'hedge')
+
+    adapter = ResilientAdapter(base=FakeAdapter(handler), hedge_after=0.05)
+    response = session_with(adapter).get('https://jamf.test/api/v1/computers-inventory')
+    assert response.content == b'hedge'
+    assert (adapter.hedged, adapter.hedge_wins) == (1, 1)
+    adapter.close()
+
+
+def test_non_idempotent_requests_are_not_hedged():
+    adapter = ResilientAdapter(base=FakeAdapter(slow_ok), hedge_after=0.001)
+    session_with(adapter).post('https://jamf.test/api/v1/auth/token')
+    assert adapter.hedged == 0
+    adapter.close()
@@ -0,0 +1,30 @@
+import os
+from helpers.sharding import chunk_shards, page_shards, run_sharded
+
+_state = {}
+
+
+def _init(offset):
+    _state['offset'] = offset
+
+
+def _square_shard(numbers):
+    return [(n * n + _state['offset'], os.getpid()) for n in numbers]
+
+
+def test_page_shards():
+    assert page_shards(0, 200) == [0]
+    assert page_shards(200, 200) == [0]
+    assert page_shards(401, 200) == [0, 1, 2]
+
+
+def test_chunk_shards():
+    assert chunk_shards([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+    assert chunk_shards([], 2) == []
+
+
+def test_run_sharded_streams_every_row_from_worker_processes():
+    rows = list(run_sharded(_square_shard, chunk_shards(list(range(20)), 3), workers=2,
+                            initializer=_init, initargs=(1,)))
+    assert sorted(value for value, _ in rows) == [n * n + 1 for n in range(20)]
+    assert os.getpid() not in {pid for _, pid in rows}
@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from helpers.single_flight import SingleFlight, single_flight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def lookup(serial):
+        calls.append(serial)
+        release.wait(5)
+        return {'serial': serial}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(flight.do, 'C02A', lookup, 'C02A') for _ in range(8)]
+        deadline = time.time() + 5
+        while flight.coalesced < 7 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert calls == ['C02A']
+    assert all(result is results[0] for result in results)
+    assert flight.coalesced == 7
+
+
+def test_nothing_is_cached_after_completion():
+    flight = SingleFlight()
+    calls = []
+    flight.do('k', calls.append, 1)
+    flight.do('k', calls.append, 2)
+    assert calls == [1, 2]
+
+
+def test_waiters_receive_the_leaders_exception():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError('boom')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, 'k', failing)
+        started.wait(5)
+        waiter = executor.submit(flight.do, 'k', failing)
+        while flight.coalesced < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, waiter):
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_decorator_keys_on_instance_and_arguments():
+    class Client:
+        def __init__(self):
+            self.calls = []
+
+        @single_flight
+        def get(self, serial, verbose=False):
+            self.calls.append((serial, verbose))
+            return serial
+
+    a, b = Client(), Client()
+    assert a.get('X') == 'X' and a.get('Y', verbose=True) == 'Y' and b.get('X') == 'X'
+    assert a.calls == [('X', False), ('Y', True)] and b.calls == [('X', False)]
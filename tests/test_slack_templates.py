@@ -0,0 +1,39 @@
+import json
+from helpers.slack_templates import BlockTemplate, load_template, message_payload
+
+BLOCKS = [{'type': 'section', 'text': {'type': 'mrkdwn', 'text': 'Please return {asset} to {site}.'}},
+          {'type': 'actions', 'elements': [{'type': 'button', 'value': '{asset}'}]}]
+
+
+def test_render_matches_building_the_blocks_directly():
+    template = BlockTemplate(BLOCKS)
+    assert template.fields == {'asset', 'site'}
+    rendered = json.loads(template.render(asset='C02XYZ', site='HQ'))
+    assert rendered[0]['text']['text'] == 'Please return C02XYZ to HQ.'
+    assert rendered[1]['elements'][0]['value'] == 'C02XYZ'
+
+
+def test_values_are_json_escaped():
+    value = 'quote " backslash \\ newline \n unicode ☃'
+    rendered = json.loads(BlockTemplate(BLOCKS).render(asset=value))
+    assert rendered[1]['elements'][0]['value'] == value
+    assert rendered[0]['text']['text'] == f'Please return {value} to .'
+
+
+def test_render_many():
+    rows = [{'asset': 'A'}, {'asset': 'B'}]
+    values = [json.loads(blocks)[1]['elements'][0]['value'] for blocks in BlockTemplate(BLOCKS).render_many(rows)]
+    assert values == ['A', 'B']
+
+
+def test_shipped_templates_render_to_valid_blocks():
+    for name in ('asset_recovery_prompt', 'return_information'):
+        template = load_template(name)
+        assert isinstance(json.loads(template.render(asset='C02XYZ')), list)
+    assert load_template('asset_recovery_prompt') is load_template('asset_recovery_prompt')
+
+
+def test_message_payload():
+    payload = json.loads(message_payload('U123', BlockTemplate(BLOCKS).render(asset='A')))
+    assert payload['channel'] == 'U123'
+    assert payload['blocks'][1]['elements'][0]['value'] == 'A'
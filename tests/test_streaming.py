@@ -0,0 +1,87 @@
+import io
+import json
+import pytest
+from helpers import json_codec
+
+DOCUMENT = [
+    {'id': 1, 'name': 'mac "one"', 'ratio': -2.5e10, 'tags': ['a', 'b'], 'nested': {'x': None, 'y': True}},
+    {'id': 22, 'name': 'café ☃', 'ratio': 0.125, 'tags': [], 'nested': {}},
+    12345678901234567890,
+    -0.5,
+    'plain string',
+    [],
+]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64 * 1024])
+def test_iter_array_matches_json_loads_at_any_chunk_size(chunk_size):
+    text = json.dumps(DOCUMENT, indent=2)
+    assert list(json_codec.iter_array(io.StringIO(text), chunk_size=chunk_size)) == DOCUMENT
+
+
+@pytest.mark.parametrize('text', ['[]', '  [ ]  '])
+def test_iter_array_empty(text):
+    assert list(json_codec.iter_array(io.StringIO(text), chunk_size=1)) == []
+
+
+@pytest.mark.parametrize('text', ['{"a": 1}', '[1, 2', '[1 2]'])
+def test_iter_array_rejects_malformed_documents(text):
+    with pytest.raises(ValueError):
+        list(json_codec.iter_array(io.StringIO(text), chunk_size=2))
+
+
+def test_iter_ndjson_skips_blank_lines():
+    fp = io.StringIO('{"a": 1}\n\n{"a": 2}\n')
+    assert list(json_codec.iter_ndjson(fp)) == [{'a': 1}, {'a': 2}]
+
+
+@pytest.mark.parametrize('text', [json.dumps(DOCUMENT[:2]), '\n'.join(json.dumps(d) for d in DOCUMENT[:2]),
+                                  '\n\n  ' + json.dumps(DOCUMENT[:2])])
+def test_iter_records_detects_array_or_ndjson(text):
+    assert list(json_codec.iter_records(io.StringIO(text))) == DOCUMENT[:2]
+
+
+def test_iter_records_empty_file():
+    assert list(json_codec.iter_records(io.StringIO('   \n'))) == []
+
+
+def test_iter_array_is_lazy():
+    class CountingReader(io.StringIO):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return super().read(size)
+
+    fp = CountingReader(json.dumps([{'n': i} for i in range(10000)]))
+    first = next(json_codec.iter_array(fp, chunk_size=64))
+    assert first == {'n': 0}
+    assert fp.reads < 5
+
+
+def test_read_identification_json_accepts_both_row_shapes(tmp_path):
+    from communication import read_identification_json
+
+    rows = [
+        {'user_email': 'a@example.com', 'asset_serial': 'C02A'},
+        {'userAndLocation': {'email': 'b@example.com'}, 'hardware': {'serialNumber': 'C02B'}},
+    ]
+    array_path = tmp_path / 'identification.json'
+    array_path.write_text(json.dumps(rows))
+    ndjson_path = tmp_path / 'identification.ndjson'
+    ndjson_path.write_text('\n'.join(json.dumps(row) for row in rows))
+
+    expected = [{'email': 'a@example.com', 'serial_number': 'C02A'},
+                {'email': 'b@example.com', 'serial_number': 'C02B'}]
+    assert read_identification_json(str(array_path)) == expected
+    assert read_identification_json(str(ndjson_path)) == expected
+
+
+def test_identification_rows_carry_their_airtable_record_id(tmp_path):
+    from communication import read_identification_json
+
+    path = tmp_path / 'identification.json'
+    path.write_text(json.dumps([{'user_email': 'a@example.com', 'asset_serial': 'C02A',
+                                 'airtable_record_id': 'rec1'}]))
+    assert read_identification_json(str(path)) == [
+        {'email': 'a@example.com', 'serial_number': 'C02A', 'airtable_record_id': 'rec1'}]
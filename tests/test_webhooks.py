@@ -0,0 +1,106 @@
+import json
+import time
+import urllib.error
+import urllib.request
+import pytest
+from helpers.decommission_queue import ACKNOWLEDGED, ERASE_SENT, DecommissionQueue
+from helpers.webhooks import RELAY_COMMAND_EVENT, WebhookReceiver, handle_event, is_loopback, parse_event
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = DecommissionQueue(str(tmp_path / 'decommission.db'))
+    job_id = queue.enqueue('C02A')
+    queue.update(job_id, state=ERASE_SENT, command_uuid='uuid-1', computer_id='7', next_run_at=time.time() + 600)
+    yield queue
+    queue.close()
+
+
+def command_completed(uuid='uuid-1', status='Acknowledged'):
+    event = {'commandUuid': uuid, 'computer': {'jssID': 7}}
+    if status is not None:
+        event['status'] = status
+    return {'webhook': {'webhookEvent': RELAY_COMMAND_EVENT}, 'event': event}
+
+
+def test_parse_event():
+    assert parse_event(command_completed())[0] == RELAY_COMMAND_EVENT
+    assert parse_event({}) == (None, {})
+
+
+def test_command_completed_acknowledges_the_matching_job(queue):
+    name, event = parse_event(command_completed())
+    job_id = handle_event(queue, name, event)
+    assert queue.get(job_id)['state'] == ACKNOWLEDGED
+
+
+def test_command_event_without_a_status_leaves_the_job_alone(queue):
+    name, event = parse_event(command_completed(status=None))
+    assert handle_event(queue, name, event) is None
+
+    job = queue.find_by_command('uuid-1')
+    assert job['state'] == ERASE_SENT
+    assert job['next_run_at'] > time.time()
+
+
+def test_command_event_that_is_not_acknowledged_makes_the_status_check_due(queue):
+    name, event = parse_event(command_completed(status='NotNow'))
+    job = queue.get(handle_event(queue, name, event))
+    assert job['state'] == ERASE_SENT
+    assert job['next_run_at'] <= time.time()
+
+
+def test_check_in_makes_the_status_check_due(queue):
+    job_id = handle_event(queue, 'ComputerCheckIn', {'computer': {'jssID': 7}})
+    job = queue.get(job_id)
+    assert job['state'] == ERASE_SENT
+    assert job['next_run_at'] <= time.time()
+    assert handle_event(queue, 'ComputerCheckIn', {'computer': {'jssID': 99}}) is None
+
+
+@pytest.mark.parametrize('host, expected', [('127.0.0.1', True), ('::1', True), ('localhost', True),
+                                            ('0.0.0.0', False), ('10.0.0.5', False), ('jamf.example.com', False)])
+def test_is_loopback(host, expected):
+    assert is_loopback(host) is expected
+
+
+def test_receiver_refuses_non_loopback_without_token(queue):
+    with pytest.raises(ValueError):
+        WebhookReceiver(queue, host='0.0.0.0', port=0)
+
+
+def post(receiver, payload, token=None):
+    host, port = receiver.address
+    request = urllib.request.Request(f'http://{host}:{port}/', data=json.dumps(payload).encode('utf-8'),
+                                     method='POST', headers={'Content-Type': 'application/json'})
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    try:
+        return urllib.request.urlopen(request, timeout=5).status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_receiver_defaults_to_loopback_and_drives_the_queue(queue):
+    matched = []
+    receiver = WebhookReceiver(queue, port=0, on_match=matched.append)
+    assert receiver.address[0] == '127.0.0.1'
+    receiver.start()
+    try:
+        assert post(receiver, command_completed()) == 204
+    finally:
+        receiver.stop()
+    assert queue.get(matched[0])['state'] == ACKNOWLEDGED
+
+
+def test_receiver_with_token_rejects_unauthenticated_events(queue):
+    receiver = WebhookReceiver(queue, host='0.0.0.0', port=0, token='s3cret')
+    receiver.start()
+    try:
+        assert post(receiver, command_completed()) == 401
+        assert post(receiver, command_completed(), token='wrong') == 401
+        assert queue.find_by_command('uuid-1') is not None
+        assert post(receiver, command_completed(), token='s3cret') == 204
+    finally:
+        receiver.stop()
+    assert queue.find_by_command('uuid-1') is None